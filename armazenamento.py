@@ -0,0 +1,565 @@
+"""
+Banco de dados local dos leilões (SQLite).
+
+Substitui o leiloes_completo.json: cada leilão e cada lote é uma linha indexada pela URL,
+então salvar, excluir ou abrir um leilão mexe só nas linhas dele. O JSON antigo é
+importado uma única vez, na primeira abertura do banco.
+
+A busca de lotes por palavras usa um índice FTS5 sobre título e descrição, mantido por
+gatilhos a cada gravação de lotes (sem acentos e sem diferenciar maiúsculas). Se o SQLite
+não tiver FTS5, a busca cai para uma varredura com LIKE.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+
+from modelos import CAMPOS_LOTE, CAMPOS_DERIVADOS, Lote, campos_derivados, centavos_digitados
+
+ARQUIVO_BANCO = 'leiloes.db'
+ARQUIVO_JSON_LEGADO = 'leiloes_completo.json'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS leiloes (
+    url TEXT PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    comitente_logo TEXT,
+    total_lotes INTEGER NOT NULL DEFAULT 0,
+    atualizado_em TEXT
+);
+CREATE TABLE IF NOT EXISTS lotes (
+    leilao_url TEXT NOT NULL REFERENCES leiloes(url) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    posicao INTEGER NOT NULL,
+    codigo_lote TEXT,
+    numero_lote TEXT,
+    titulo TEXT,
+    descricao TEXT,
+    valor_leilao TEXT,
+    valor_minimo TEXT,
+    simbolo_lote TEXT,
+    imagem_lote TEXT,
+    retirado INTEGER NOT NULL DEFAULT 0,
+    extras TEXT,
+    titulo_limpo TEXT,
+    numero INTEGER,
+    imagem_url TEXT,
+    simbolo_url TEXT,
+    valor_centavos INTEGER,
+    PRIMARY KEY (leilao_url, url)
+);
+CREATE INDEX IF NOT EXISTS lotes_codigo ON lotes(codigo_lote);
+CREATE TABLE IF NOT EXISTS avaliacoes (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL,
+    atualizado_em TEXT
+);
+CREATE TABLE IF NOT EXISTS impressoes_lotes (
+    url TEXT PRIMARY KEY,
+    leilao_url TEXT NOT NULL,
+    cartao TEXT,
+    conteudo TEXT,
+    extraido_em REAL,
+    visto_em REAL
+);
+CREATE INDEX IF NOT EXISTS impressoes_leilao ON impressoes_lotes(leilao_url);
+CREATE TABLE IF NOT EXISTS coleta_leiloes (
+    url TEXT PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    posicao INTEGER NOT NULL,
+    concluido INTEGER NOT NULL DEFAULT 0,
+    total_lotes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS coleta_lotes (
+    leilao_url TEXT NOT NULL,
+    url TEXT NOT NULL,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (leilao_url, url)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Índice invertido dos lotes. Usa as próprias colunas da tabela lotes (content='lotes'),
+# então o índice guarda só os termos; os gatilhos o mantêm a cada INSERT/DELETE de lotes.
+ESQUEMA_BUSCA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_lotes USING fts5(
+    titulo, descricao, content='lotes', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS busca_lotes_inserir AFTER INSERT ON lotes BEGIN
+    INSERT INTO busca_lotes (rowid, titulo, descricao) VALUES (new.rowid, new.titulo, new.descricao);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_lotes_excluir AFTER DELETE ON lotes BEGIN
+    INSERT INTO busca_lotes (busca_lotes, rowid, titulo, descricao) VALUES ('delete', old.rowid, old.titulo, old.descricao);
+END;
+CREATE TRIGGER IF NOT EXISTS busca_lotes_alterar AFTER UPDATE OF titulo, descricao ON lotes BEGIN
+    INSERT INTO busca_lotes (busca_lotes, rowid, titulo, descricao) VALUES ('delete', old.rowid, old.titulo, old.descricao);
+    INSERT INTO busca_lotes (rowid, titulo, descricao) VALUES (new.rowid, new.titulo, new.descricao);
+END;
+"""
+
+def sem_acentos(texto):
+    """Minúsculas sem acentos (mesma normalização do índice de busca)"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+def termos_da_busca(texto):
+    """Palavras da busca já normalizadas: "BMW 2015 PÁTIO PB" -> ['bmw', '2015', 'patio', 'pb']"""
+    return re.findall(r'\w+', sem_acentos(texto))
+
+def _agora():
+    return datetime.now().isoformat(timespec='seconds')
+
+class ArmazemLeiloes:
+    """
+    Acesso ao banco de leilões. Uma conexão por instância, protegida por lock para
+    poder ser usada pelas threads do app (interface, scraper, timers).
+    """
+    def __init__(self, caminho=ARQUIVO_BANCO):
+        self.caminho = caminho
+        self._lock = threading.RLock()
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        # WAL: o app pode ler enquanto o scraper grava
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute("PRAGMA foreign_keys=ON")
+        # INSERT OR REPLACE também dispara o gatilho de exclusão (mantém o índice de busca certo)
+        self.conexao.execute("PRAGMA recursive_triggers=ON")
+        self.conexao.executescript(ESQUEMA)
+        self._preparar_campos_derivados()
+        self.conexao.create_function('sem_acentos', 1, sem_acentos, deterministic=True)
+        self.busca_fts = self._preparar_busca()
+
+    def _preparar_campos_derivados(self):
+        """Bancos criados antes dos campos derivados ganham as colunas e têm os lotes recalculados"""
+        colunas = {linha['name'] for linha in self.conexao.execute("PRAGMA table_info(lotes)")}
+        faltando = [c for c in CAMPOS_DERIVADOS if c not in colunas]
+        if not faltando:
+            return
+        tipos = {'numero': 'INTEGER', 'valor_centavos': 'INTEGER'}
+        with self._lock, self.conexao:
+            for coluna in faltando:
+                self.conexao.execute(f"ALTER TABLE lotes ADD COLUMN {coluna} {tipos.get(coluna, 'TEXT')}")
+            self.recalcular_campos_derivados()
+
+    def recalcular_campos_derivados(self):
+        """Recalcula os campos derivados de todos os lotes gravados (após mudar as regras de limpeza)"""
+        with self._lock, self.conexao:
+            titulos = dict(self.conexao.execute("SELECT url, titulo FROM leiloes").fetchall())
+            linhas = self.conexao.execute("SELECT rowid, * FROM lotes").fetchall()
+            self.conexao.executemany(
+                f"UPDATE lotes SET {', '.join(f'{c} = ?' for c in CAMPOS_DERIVADOS)} WHERE rowid = ?",
+                [self._valores_derivados(self._lote_da_linha(linha), titulos.get(linha['leilao_url'], '')) + (linha['rowid'],)
+                 for linha in linhas]
+            )
+
+    def _valores_derivados(self, lote, titulo_leilao):
+        derivados = campos_derivados(lote, titulo_leilao)
+        return tuple(derivados[c] for c in CAMPOS_DERIVADOS)
+
+    def _preparar_busca(self):
+        """Cria o índice de busca (e o preenche a partir dos lotes já gravados na primeira vez)"""
+        try:
+            with self.conexao:
+                self.conexao.executescript(ESQUEMA_BUSCA)
+        except sqlite3.OperationalError as e:
+            print(f"⚠ SQLite sem FTS5 ({e}); a busca de lotes vai varrer a tabela")
+            return False
+        indexado = self.conexao.execute("SELECT valor FROM meta WHERE chave = 'busca_indexada'").fetchone()
+        if not indexado:
+            self.reconstruir_indice_busca()
+        return True
+
+    def reconstruir_indice_busca(self):
+        """Refaz o índice de busca do zero a partir da tabela de lotes"""
+        with self._lock, self.conexao:
+            self.conexao.execute("INSERT INTO busca_lotes (busca_lotes) VALUES ('rebuild')")
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('busca_indexada', ?)", (_agora(),)
+            )
+
+    # --- Leilões ---
+
+    def _gravar_leilao(self, leilao):
+        url = leilao.get('leilao_url') or leilao.get('url')
+        lotes = leilao.get('lotes', [])
+        self.conexao.execute(
+            """INSERT INTO leiloes (url, titulo, comitente_logo, total_lotes, atualizado_em)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(url) DO UPDATE SET titulo=excluded.titulo, comitente_logo=excluded.comitente_logo,
+                   total_lotes=excluded.total_lotes, atualizado_em=excluded.atualizado_em""",
+            (url, leilao.get('leilao_titulo', ''), leilao.get('comitente_logo', ''),
+             leilao.get('total_lotes', len(lotes)), _agora())
+        )
+        # Os lotes do leilão são substituídos em bloco: lotes que saíram do site somem também
+        self.conexao.execute("DELETE FROM lotes WHERE leilao_url = ?", (url,))
+        titulo = leilao.get('leilao_titulo', '')
+        self.conexao.executemany(
+            """INSERT OR REPLACE INTO lotes (leilao_url, url, posicao, codigo_lote, numero_lote, titulo, descricao,
+                   valor_leilao, valor_minimo, simbolo_lote, imagem_lote, retirado, extras,
+                   titulo_limpo, numero, imagem_url, simbolo_url, valor_centavos)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [self._linha_lote(url, posicao, lote, titulo) for posicao, lote in enumerate(lotes)]
+        )
+        return url
+
+    def _linha_lote(self, leilao_url, posicao, lote, titulo_leilao):
+        # Os campos derivados são sempre recalculados na gravação, nunca vêm do dicionário
+        extras = {k: v for k, v in lote.items() if k not in CAMPOS_LOTE and k not in CAMPOS_DERIVADOS}
+        return (
+            leilao_url, lote.get('url') or f"{leilao_url}#{posicao}", posicao,
+            lote.get('codigo_lote'), lote.get('numero_lote'), lote.get('titulo'), lote.get('descricao'),
+            lote.get('valor_leilao'), lote.get('valor_minimo'), lote.get('simbolo_lote'), lote.get('imagem_lote'),
+            1 if lote.get('retirado') else 0,
+            json.dumps(extras, ensure_ascii=False) if extras else None
+        ) + self._valores_derivados(lote, titulo_leilao)
+
+    def _lote_da_linha(self, linha, derivados=True):
+        lote = {campo: linha[campo] for campo in CAMPOS_LOTE}
+        lote['retirado'] = bool(lote['retirado'])
+        if linha['extras']:
+            lote.update(json.loads(linha['extras']))
+        if derivados and linha['titulo_limpo'] is not None:
+            lote.update({campo: linha[campo] for campo in CAMPOS_DERIVADOS})
+        return lote
+
+    def salvar_leilao(self, leilao):
+        """Insere ou atualiza um leilão e os lotes dele (só as linhas desse leilão)"""
+        with self._lock, self.conexao:
+            return self._gravar_leilao(leilao)
+
+    def excluir_leilao(self, url):
+        with self._lock, self.conexao:
+            self.conexao.execute("DELETE FROM leiloes WHERE url = ?", (url,))
+            self.conexao.execute("DELETE FROM impressoes_lotes WHERE leilao_url = ?", (url,))
+
+    def listar_leiloes(self):
+        """Índice dos leilões (sem os lotes): [{'leilao_url', 'leilao_titulo', 'comitente_logo', 'total_lotes'}]"""
+        with self._lock:
+            linhas = self.conexao.execute(
+                "SELECT url, titulo, comitente_logo, total_lotes FROM leiloes ORDER BY url"
+            ).fetchall()
+        return [{
+            'leilao_titulo': linha['titulo'],
+            'leilao_url': linha['url'],
+            'comitente_logo': linha['comitente_logo'] or '',
+            'total_lotes': linha['total_lotes']
+        } for linha in linhas]
+
+    def carregar_lotes(self, leilao_url, derivados=True):
+        """Lotes do leilão na ordem do site; derivados=False devolve só os campos lidos pelo scraper"""
+        with self._lock:
+            linhas = self.conexao.execute(
+                "SELECT * FROM lotes WHERE leilao_url = ? ORDER BY posicao", (leilao_url,)
+            ).fetchall()
+        return [self._lote_da_linha(linha, derivados) for linha in linhas]
+
+    def carregar_lotes_modelo(self, leilao_url):
+        """Lotes do leilão como modelos.Lote (forma compacta usada pelo app)"""
+        return [Lote.from_dict(lote) for lote in self.carregar_lotes(leilao_url)]
+
+    def carregar_leilao(self, url, derivados=False):
+        """Leilão completo (mesmo formato do antigo JSON) ou None se não existir"""
+        with self._lock:
+            linha = self.conexao.execute(
+                "SELECT url, titulo, comitente_logo, total_lotes FROM leiloes WHERE url = ?", (url,)
+            ).fetchone()
+        if linha is None:
+            return None
+        return {
+            'leilao_titulo': linha['titulo'],
+            'leilao_url': linha['url'],
+            'comitente_logo': linha['comitente_logo'] or '',
+            'total_lotes': linha['total_lotes'],
+            'lotes': self.carregar_lotes(url, derivados)
+        }
+
+    def carregar_todos(self):
+        return [self.carregar_leilao(leilao['leilao_url']) for leilao in self.listar_leiloes()]
+
+    # --- Busca de lotes ---
+
+    def buscar_lotes(self, texto, limite=100):
+        """
+        Lotes de todos os leilões que têm todas as palavras da busca no título ou na
+        descrição (a última palavra vale como prefixo), os mais relevantes primeiro.
+        Cada lote vem com 'leilao_url' e 'leilao_titulo'.
+        """
+        termos = termos_da_busca(texto)
+        if not termos:
+            return []
+        with self._lock:
+            if self.busca_fts:
+                # Título pesa mais que descrição no bm25
+                consulta = ' '.join(f'"{t}"' for t in termos[:-1]) + f' "{termos[-1]}"*'
+                linhas = self.conexao.execute(
+                    """SELECT lotes.*, leiloes.titulo AS leilao_titulo
+                       FROM busca_lotes
+                       JOIN lotes ON lotes.rowid = busca_lotes.rowid
+                       JOIN leiloes ON leiloes.url = lotes.leilao_url
+                       WHERE busca_lotes MATCH ?
+                       ORDER BY bm25(busca_lotes, 10.0, 1.0)
+                       LIMIT ?""",
+                    (consulta.strip(), limite)
+                ).fetchall()
+            else:
+                condicoes = ' AND '.join(
+                    "sem_acentos(coalesce(lotes.titulo, '') || ' ' || coalesce(lotes.descricao, '')) LIKE ?" for _ in termos
+                )
+                linhas = self.conexao.execute(
+                    f"""SELECT lotes.*, leiloes.titulo AS leilao_titulo
+                        FROM lotes JOIN leiloes ON leiloes.url = lotes.leilao_url
+                        WHERE {condicoes}
+                        ORDER BY lotes.leilao_url, lotes.posicao
+                        LIMIT ?""",
+                    [f"%{t}%" for t in termos] + [limite]
+                ).fetchall()
+        resultados = []
+        for linha in linhas:
+            lote = self._lote_da_linha(linha)
+            lote['leilao_url'] = linha['leilao_url']
+            lote['leilao_titulo'] = linha['leilao_titulo']
+            resultados.append(lote)
+        return resultados
+
+    # --- Impressões digitais dos lotes (reextração incremental) ---
+
+    def impressoes_do_leilao(self, leilao_url):
+        """{url: {'cartao', 'conteudo', 'extraido_em', 'visto_em'}} dos lotes do leilão"""
+        with self._lock:
+            linhas = self.conexao.execute(
+                "SELECT url, cartao, conteudo, extraido_em, visto_em FROM impressoes_lotes WHERE leilao_url = ?",
+                (leilao_url,)
+            ).fetchall()
+        return {linha['url']: dict(linha) for linha in linhas}
+
+    def salvar_impressoes(self, leilao_url, impressoes):
+        """Grava as impressões [{'url', 'cartao', 'conteudo', 'extraido_em', 'visto_em'}] de um leilão"""
+        if not impressoes:
+            return
+        with self._lock, self.conexao:
+            self.conexao.executemany(
+                """INSERT OR REPLACE INTO impressoes_lotes (url, leilao_url, cartao, conteudo, extraido_em, visto_em)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [(i['url'], leilao_url, i['cartao'], i['conteudo'], i['extraido_em'], i['visto_em']) for i in impressoes]
+            )
+
+    # --- Avaliações manuais ---
+
+    def salvar_avaliacoes(self, avaliacoes):
+        """Grava várias avaliações {chave: centavos} numa única transação (None ou vazio remove)"""
+        with self._lock, self.conexao:
+            for chave, valor in avaliacoes.items():
+                if valor is not None and valor != '':
+                    self.conexao.execute(
+                        """INSERT INTO avaliacoes (chave, valor, atualizado_em) VALUES (?, ?, ?)
+                           ON CONFLICT(chave) DO UPDATE SET valor=excluded.valor, atualizado_em=excluded.atualizado_em""",
+                        (chave, valor, _agora())
+                    )
+                else:
+                    self.conexao.execute("DELETE FROM avaliacoes WHERE chave = ?", (chave,))
+
+    def carregar_avaliacoes(self):
+        """Avaliações gravadas {chave: centavos}"""
+        with self._lock:
+            linhas = self.conexao.execute("SELECT chave, valor FROM avaliacoes").fetchall()
+        avaliacoes = {}
+        for linha in linhas:
+            centavos = centavos_digitados(str(linha['valor']))
+            if centavos is not None:
+                avaliacoes[linha['chave']] = centavos
+        return avaliacoes
+
+    def gravacao_avaliacoes(self, espera=2.0):
+        """Gravação adiada (write-behind) das avaliações neste banco"""
+        return GravacaoAvaliacoes(self, espera)
+
+    # --- Checkpoint da coleta completa ---
+    # Cada lote extraído e cada leilão concluído ficam registrados assim que terminam,
+    # para que uma coleta interrompida possa ser retomada sem refazer o que já foi feito.
+
+    def iniciar_coleta(self, leiloes):
+        """Começa uma coleta nova com a lista [{'url', 'titulo'}] (descarta checkpoint anterior)"""
+        with self._lock, self.conexao:
+            self.conexao.execute("DELETE FROM coleta_leiloes")
+            self.conexao.execute("DELETE FROM coleta_lotes")
+            self.conexao.executemany(
+                "INSERT OR IGNORE INTO coleta_leiloes (url, titulo, posicao) VALUES (?, ?, ?)",
+                [(leilao['url'], leilao['titulo'], posicao) for posicao, leilao in enumerate(leiloes)]
+            )
+
+    def coleta_pendente(self):
+        """Lista [{'url', 'titulo', 'concluido'}] da coleta interrompida, ou [] se não houver"""
+        with self._lock:
+            linhas = self.conexao.execute(
+                "SELECT url, titulo, concluido FROM coleta_leiloes ORDER BY posicao"
+            ).fetchall()
+        return [{'url': l['url'], 'titulo': l['titulo'], 'concluido': bool(l['concluido'])} for l in linhas]
+
+    def lotes_da_coleta(self, leilao_url):
+        """Lotes já extraídos de um leilão ainda não concluído: {url: lote}"""
+        with self._lock:
+            linhas = self.conexao.execute(
+                "SELECT url, dados FROM coleta_lotes WHERE leilao_url = ?", (leilao_url,)
+            ).fetchall()
+        return {linha['url']: json.loads(linha['dados']) for linha in linhas}
+
+    def registrar_lote_da_coleta(self, leilao_url, lote):
+        with self._lock, self.conexao:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO coleta_lotes (leilao_url, url, dados) VALUES (?, ?, ?)",
+                (leilao_url, lote['url'], json.dumps(lote, ensure_ascii=False))
+            )
+
+    def concluir_leilao_da_coleta(self, leilao_url, leilao=None):
+        """Salva o leilão concluído (None se não teve lotes) e marca no checkpoint, numa só transação"""
+        with self._lock, self.conexao:
+            if leilao:
+                self._gravar_leilao(leilao)
+            self.conexao.execute(
+                "UPDATE coleta_leiloes SET concluido = 1, total_lotes = ? WHERE url = ?",
+                (len(leilao['lotes']) if leilao else 0, leilao_url)
+            )
+            self.conexao.execute("DELETE FROM coleta_lotes WHERE leilao_url = ?", (leilao_url,))
+
+    def finalizar_coleta(self):
+        """
+        Encerra a coleta se todos os leilões foram concluídos: remove do banco os leilões que
+        não vieram nela e apaga o checkpoint. Retorna quantos leilões ficaram pendentes.
+        """
+        with self._lock, self.conexao:
+            pendentes = self.conexao.execute(
+                "SELECT COUNT(*) FROM coleta_leiloes WHERE concluido = 0"
+            ).fetchone()[0]
+            com_lotes = self.conexao.execute(
+                "SELECT COUNT(*) FROM coleta_leiloes WHERE total_lotes > 0"
+            ).fetchone()[0]
+            if pendentes:
+                return pendentes
+            if com_lotes:
+                self.conexao.execute(
+                    "DELETE FROM leiloes WHERE url NOT IN (SELECT url FROM coleta_leiloes WHERE total_lotes > 0)"
+                )
+                self.conexao.execute(
+                    "DELETE FROM impressoes_lotes WHERE leilao_url NOT IN (SELECT url FROM leiloes)"
+                )
+            self.conexao.execute("DELETE FROM coleta_leiloes")
+            self.conexao.execute("DELETE FROM coleta_lotes")
+            return 0
+
+    # --- Importação do JSON antigo ---
+
+    def importar_json(self, caminho):
+        """Importa um leiloes_completo.json (leilões já existentes são atualizados). Retorna quantos leilões"""
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        with self._lock, self.conexao:
+            for leilao in dados:
+                self._gravar_leilao(leilao)
+        return len(dados)
+
+    def importar_json_legado(self, caminho=ARQUIVO_JSON_LEGADO):
+        """Importa o JSON antigo uma única vez (na primeira abertura do banco). Retorna quantos leilões"""
+        with self._lock:
+            ja_importado = self.conexao.execute(
+                "SELECT valor FROM meta WHERE chave = 'json_importado'"
+            ).fetchone()
+            if ja_importado or not os.path.exists(caminho):
+                return 0
+            try:
+                total = self.importar_json(caminho)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Não foi possível importar {caminho}: {e}")
+                return 0
+            with self.conexao:
+                self.conexao.execute(
+                    "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('json_importado', ?)", (_agora(),)
+                )
+            print(f"✓ {total} leilões importados de {caminho} para {self.caminho}")
+            return total
+
+    def exportar_json(self, caminho):
+        """Gera um arquivo no formato do antigo leiloes_completo.json"""
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.carregar_todos(), f, ensure_ascii=False, indent=4)
+
+    def fechar(self):
+        with self._lock:
+            self.conexao.close()
+
+class GravacaoAvaliacoes:
+    """
+    Avaliações digitadas no app são gravadas em segundo plano: as alterações se acumulam
+    em memória e, no máximo `espera` segundos depois da primeira, vão para o banco numa
+    única transação (a última alteração de cada chave vale). fechar() grava o que faltar.
+    """
+    def __init__(self, armazem, espera=2.0):
+        self.armazem = armazem
+        self.espera = espera
+        self.pendentes = {}
+        self.timer = None
+        self._lock = threading.Lock()
+
+    def alterar(self, chave, centavos):
+        """Registra a avaliação de um lote (None remove); pode ser chamado de qualquer thread"""
+        with self._lock:
+            self.pendentes[chave] = centavos
+            if self.timer is None:
+                self.timer = threading.Timer(self.espera, self.gravar)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def gravar(self):
+        """Grava agora as alterações pendentes"""
+        with self._lock:
+            pendentes, self.pendentes = self.pendentes, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not pendentes:
+            return
+        try:
+            self.armazem.salvar_avaliacoes(pendentes)
+        except Exception as e:
+            print(f"⚠ Não foi possível gravar as avaliações: {e}")
+            # Volta para a fila sem sobrescrever alterações feitas nesse meio tempo
+            with self._lock:
+                for chave, valor in pendentes.items():
+                    self.pendentes.setdefault(chave, valor)
+
+    def fechar(self):
+        self.gravar()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='Banco local de leilões')
+    parser.add_argument('acao', choices=['importar', 'exportar', 'buscar', 'reindexar'],
+                        help='Importar um JSON para o banco, exportar o banco para JSON, buscar lotes ou refazer o índice de busca')
+    parser.add_argument('arquivo', nargs='?', help='Arquivo JSON no formato do antigo leiloes_completo.json (ou o texto, em buscar)')
+    parser.add_argument('--banco', default=ARQUIVO_BANCO, help=f'Arquivo do banco (padrão: {ARQUIVO_BANCO})')
+    args = parser.parse_args()
+
+    armazem = ArmazemLeiloes(args.banco)
+    try:
+        if args.acao in ('importar', 'exportar', 'buscar') and not args.arquivo:
+            parser.error(f"{args.acao} precisa do argumento arquivo")
+        if args.acao == 'importar':
+            print(f"✓ {armazem.importar_json(args.arquivo)} leilões importados")
+        elif args.acao == 'buscar':
+            for lote in armazem.buscar_lotes(args.arquivo, limite=20):
+                print(f"{lote['numero_lote'] or '':<10} {lote['titulo'] or ''}  [{lote['leilao_titulo']}]")
+        elif args.acao == 'reindexar':
+            armazem.reconstruir_indice_busca()
+            print("✓ Índice de busca refeito")
+        else:
+            armazem.exportar_json(args.arquivo)
+            print(f"✓ Banco exportado para {args.arquivo}")
+    finally:
+        armazem.fechar()
@@ -0,0 +1,312 @@
+"""
+Medições de desempenho do sistema, sem abrir a interface nem acessar o site.
+
+Uso: python benchmark.py <medição>   (sem argumento roda todas)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from modelos import Lote, campos_derivados, formatar_centavos
+
+def _lotes_ficticios(quantidade):
+    return [{
+        'codigo_lote': str(100000 + i),
+        'numero_lote': f"LOTE {i + 1}",
+        'titulo': f"VEÍCULO MARCA MODELO {i + 1} - PLACA ABC{i:04d}",
+        'descricao': f"Lote {i + 1}. " + "Veículo em estado de conservação regular, sem garantia de funcionamento. " * 4,
+        'valor_leilao': f"R$ {formatar_centavos((i + 1) * 100000)}",
+        'valor_minimo': "Sob Consulta",
+        'simbolo_lote': "",
+        'imagem_lote': f"https://www.leiloespb.com.br/imagens/{i}.jpg",
+        'retirado': i % 20 == 0,
+        'url': f"https://www.leiloespb.com.br/eventos/leilao/1/lote/{i + 1}/veiculo-{i + 1}"
+    } for i in range(quantidade)]
+
+def medir_tabela():
+    """Tempo até a primeira pintura da tabela de lotes: todas as linhas x paginada"""
+    from sistema_leiloes import TabelaLotes, LINHAS_POR_PAGINA
+
+    print("Tabela de lotes (montagem dos controles da primeira tela e troca de página)")
+    print(f"{'lotes':>7}  {'modo':<16} {'linhas':>7} {'montagem':>10} {'trocar pág.':>12}")
+    for quantidade in (100, 1000, 10000):
+        lotes = [Lote.from_dict(lote) for lote in _lotes_ficticios(quantidade)]
+        for modo, por_pagina in (('todas as linhas', quantidade), ('paginada', LINHAS_POR_PAGINA)):
+            inicio = time.perf_counter()
+            tabela = TabelaLotes({}, lambda e, lote: None, linhas_por_pagina=por_pagina)
+            tabela.carregar(lotes, lambda lote: lote.titulo)
+            montagem = time.perf_counter() - inicio
+
+            # Troca de página sem enviar à tela (só o reaproveitamento das linhas)
+            troca = ''
+            if tabela.total_paginas() > 1:
+                inicio = time.perf_counter()
+                tabela.pagina = 1
+                tabela._preencher()
+                troca = f"{(time.perf_counter() - inicio) * 1000:9.1f} ms"
+            print(f"{quantidade:>7}  {modo:<16} {len(tabela.tabela.rows):>7} "
+                  f"{montagem * 1000:7.1f} ms {troca:>12}")
+    print("O envio para a tela (page.update) é proporcional ao número de linhas montadas.")
+
+def medir_lista():
+    """Custo por tecla do filtro da lista lateral com os cards já montados"""
+    from sistema_leiloes import CartaoLeilao
+
+    print("Lista de leilões (filtro por visibilidade dos cards reaproveitados)")
+    print(f"{'leilões':>8} {'montagem':>10} {'por tecla':>10} {'cards mudados':>14}")
+    for quantidade in (100, 1000, 5000):
+        inicio = time.perf_counter()
+        cartoes = []
+        for i in range(quantidade):
+            cartao = CartaoLeilao(f"https://www.leiloespb.com.br/eventos/leilao/{i}", print, print, print)
+            cartao.atualizar({'leilao_titulo': f"LEILÃO {i} - DETRAN PB VEÍCULOS", 'total_lotes': i % 300})
+            cartoes.append(cartao)
+        montagem = time.perf_counter() - inicio
+
+        # Digitação de "leilão 12" uma tecla por vez
+        termos = ["leilão 12"[:n] for n in range(1, 10)]
+        mudados = 0
+        inicio = time.perf_counter()
+        for termo in termos:
+            mudados += sum(1 for c in cartoes if c.filtrar(termo))
+        por_tecla = (time.perf_counter() - inicio) / len(termos)
+        print(f"{quantidade:>8} {montagem * 1000:7.1f} ms {por_tecla * 1000:7.2f} ms {mudados // len(termos):>14}")
+    print("Só os cards que mudaram de visibilidade são enviados à tela.")
+
+def medir_busca():
+    """Busca por palavras em 100 mil lotes: índice FTS5 x varredura com LIKE"""
+    from armazenamento import ArmazemLeiloes
+
+    marcas = ["FIAT UNO", "VW GOL", "HONDA CG 160", "BMW 320I", "TOYOTA COROLLA", "CHEVROLET ONIX"]
+    patios = ["PÁTIO DETRAN PB", "PÁTIO PRF CAMPINA GRANDE", "DEPÓSITO JOÃO PESSOA"]
+    sorteio = random.Random(42)
+    with tempfile.TemporaryDirectory() as pasta:
+        armazem = ArmazemLeiloes(os.path.join(pasta, 'busca.db'))
+        inicio = time.perf_counter()
+        for n in range(1000):
+            lotes = _lotes_ficticios(100)
+            for i, lote in enumerate(lotes):
+                lote['url'] = f"{lote['url']}-{n}"
+                lote['titulo'] = f"{sorteio.choice(marcas)} {sorteio.randint(2005, 2022)}"
+                lote['descricao'] = f"{lote['descricao']} Local: {sorteio.choice(patios)}."
+            armazem.salvar_leilao({'leilao_url': f"leilao-{n}", 'leilao_titulo': f"LEILÃO {n}", 'lotes': lotes})
+        print(f"100000 lotes gravados e indexados em {time.perf_counter() - inicio:.1f}s")
+
+        print(f"{'busca':<26} {'modo':<6} {'lotes':>6} {'tempo':>10}")
+        for texto in ("BMW 2015 PÁTIO PB", "honda campina", "corolla joao pessoa 2010"):
+            for modo, fts in (('FTS5', True), ('LIKE', False)):
+                armazem.busca_fts = fts
+                inicio = time.perf_counter()
+                resultados = armazem.buscar_lotes(texto, limite=200)
+                print(f"{texto:<26} {modo:<6} {len(resultados):>6} {(time.perf_counter() - inicio) * 1000:7.1f} ms")
+        armazem.fechar()
+
+def medir_memoria():
+    """Memória de 100 mil lotes como dicionários de textos x modelos.Lote, e ordenar/somar"""
+    import gc
+    import json
+    import tracemalloc
+
+    # Passa pelo JSON para cada lote ter strings próprias, como ao ler do banco
+    texto = json.dumps([dict(lote, **campos_derivados(lote, "LEILÃO")) for lote in _lotes_ficticios(100000)])
+
+    def medir(construir):
+        gc.collect()
+        tracemalloc.start()
+        lotes = construir()
+        gc.collect()
+        memoria = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return lotes, memoria
+
+    dicionarios, mem_dict = medir(lambda: json.loads(texto))
+    modelos_, mem_lote = medir(lambda: [Lote.from_dict(lote) for lote in json.loads(texto)])
+
+    print("100000 lotes em memória")
+    print(f"{'forma':<14} {'total':>9} {'por lote':>9} {'ordenar':>9} {'somar':>9}")
+    for forma, lotes, memoria, numero, valor in (
+        ('dicionários', dicionarios, mem_dict, lambda l: l['numero'], lambda l: l['valor_centavos'] or 0),
+        ('Lote', modelos_, mem_lote, lambda l: l.numero, lambda l: l.valor_centavos or 0),
+    ):
+        inicio = time.perf_counter()
+        sorted(lotes, key=numero, reverse=True)
+        ordenar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        sum(map(valor, lotes))
+        somar = time.perf_counter() - inicio
+        print(f"{forma:<14} {memoria / 2**20:6.1f} MB {memoria / len(lotes):6.0f} B "
+              f"{ordenar * 1000:6.1f} ms {somar * 1000:6.1f} ms")
+
+def medir_log():
+    """Custo das descargas do log para 20 mil linhas de progresso chegando em rajadas"""
+    import queue
+    import flet as ft
+    from sistema_leiloes import BufferLog, LINHAS_LOG
+
+    mensagens = [f"Lote {i}: extraído via HTTP (0.{i % 10}s)" for i in range(20000)]
+    print("Log da interface: 20000 mensagens, descargas a cada 200 mensagens")
+    print(f"{'modo':<28} {'tempo total':>12} {'por descarga':>13}")
+
+    # Como era: a cada descarga o texto inteiro era quebrado em linhas, cortado e refeito
+    fila = queue.Queue()
+    inicio = time.perf_counter()
+    valor = ""
+    for bloco in range(0, len(mensagens), 200):
+        for msg in mensagens[bloco:bloco + 200]:
+            fila.put(msg)
+        linhas = valor.split('\n') if valor else []
+        while not fila.empty():
+            linhas.append(f"[00:00:00] {fila.get_nowait()}")
+        valor = '\n'.join(linhas[-LINHAS_LOG:])
+    antes = time.perf_counter() - inicio
+
+    log = BufferLog(ft.TextField())
+    inicio = time.perf_counter()
+    for bloco in range(0, len(mensagens), 200):
+        for msg in mensagens[bloco:bloco + 200]:
+            log.adicionar(msg)
+        log.descarregar()
+    depois = time.perf_counter() - inicio
+
+    descargas = len(mensagens) // 200
+    for modo, tempo in (('split/join do texto inteiro', antes), ('BufferLog (deque)', depois)):
+        print(f"{modo:<28} {tempo * 1000:9.1f} ms {tempo * 1000 / descargas:10.2f} ms")
+    print("Além disso, antes cada descarga fazia page.update() da página inteira; agora só o campo do log.")
+
+def _relatorio_como_antes(caminho_template, titulo, logo_url, registros):
+    """Montagem antiga: lê o template a cada vez e aplica a cadeia de re.sub/replace"""
+    import base64
+    import json
+    import re
+    from datetime import datetime
+
+    with open(caminho_template, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    json_lotes = json.dumps(registros, ensure_ascii=False).replace('\\', '\\\\')
+    html_content = re.sub(r'const lotes = \[.*?\];', f'const lotes = {json_lotes};', html_content, flags=re.DOTALL)
+    html_content = html_content.replace('>Leilão Exemplo<', f'>{titulo}<')
+    html_content = re.sub(r'<span id="totalLotes">.*?</span>', f'<span id="totalLotes">{len(registros)}</span>', html_content)
+    data_hoje = datetime.now().strftime("%d/%m/%Y %H:%M")
+    html_content = re.sub(r'<span id="dataAbertura">.*?</span>', f'<span id="dataAbertura">{data_hoje}</span>', html_content)
+    html_content = html_content.replace('https://via.placeholder.com/50x50?text=Logo', logo_url)
+    html_content = html_content.replace('https://via.placeholder.com/30x30?text=C', logo_url)
+    if os.path.exists('logo_leiloespb'):
+        with open('logo_leiloespb', 'rb') as img_file:
+            logo_base64 = base64.b64encode(img_file.read()).decode('utf-8')
+            html_content = html_content.replace('https://www.leiloespb.com.br/client/logo.png?v=2',
+                                                f'data:image/png;base64,{logo_base64}')
+    return html_content
+
+def medir_relatorio():
+    """Geração do HTML do relatório: cadeia de re.sub x template compilado x cache"""
+    from relatorio import GeradorRelatorios, logo_do_comitente, registros_dos_lotes
+    from sistema_leiloes import ARQUIVO_TEMPLATE
+
+    print("Relatório HTML (sem imagem de retirado; os registros dos lotes entram nos dois lados)")
+    print(f"{'lotes':>7} {'re.sub':>10} {'compilado':>10} {'cache':>10} {'tamanho':>10}")
+    for quantidade in (10, 1000, 10000):
+        lotes = [Lote.from_dict(lote, "LEILÃO") for lote in _lotes_ficticios(quantidade)]
+        avaliacoes = {lotes[0].chave: 150000}
+
+        inicio = time.perf_counter()
+        logo_url = logo_do_comitente('/logo.png', lotes)
+        html = _relatorio_como_antes(ARQUIVO_TEMPLATE, "LEILÃO", logo_url,
+                                     registros_dos_lotes(lotes, avaliacoes, logo_url))
+        antes = time.perf_counter() - inicio
+
+        gerador = GeradorRelatorios(ARQUIVO_TEMPLATE)
+        gerador._modelo()  # Compilação do template fica fora: acontece uma vez por execução
+        inicio = time.perf_counter()
+        gerador.gerar("LEILÃO", '/logo.png', lotes, avaliacoes)
+        compilado = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        gerador.gerar("LEILÃO", '/logo.png', lotes, avaliacoes)
+        cache = time.perf_counter() - inicio
+        print(f"{quantidade:>7} {antes * 1000:7.1f} ms {compilado * 1000:7.1f} ms {cache * 1000:7.1f} ms "
+              f"{len(html.encode('utf-8')) / 1024:7.0f} KB")
+
+def _tempos_navegador(html):
+    """
+    (abertura, PDF) em segundos no navegador compartilhado: abertura é o set_content até o
+    load (parse + scripts + layout); None se não houver Chromium aqui.
+    """
+    try:
+        from servico_navegador import ServicoNavegador
+        navegador = ServicoNavegador()
+    except Exception:
+        return None
+
+    def medir(browser):
+        context = browser.new_context()
+        try:
+            page = context.new_page()
+            inicio = time.perf_counter()
+            page.set_content(html, wait_until="load")
+            abertura = time.perf_counter() - inicio
+            with tempfile.TemporaryDirectory() as pasta:
+                inicio = time.perf_counter()
+                page.pdf(path=os.path.join(pasta, 'relatorio.pdf'), format="A4", print_background=True)
+            return abertura, time.perf_counter() - inicio
+        finally:
+            context.close()
+
+    try:
+        medir_navegador = lambda: navegador.executar(medir)
+        medir_navegador()  # Aquecimento: abre o navegador
+        return medir_navegador()
+    except Exception as e:
+        print(f"  (navegador não medido: {str(e).splitlines()[0]})")
+        return None
+    finally:
+        navegador.encerrar()
+
+def _texto_tempo(segundos):
+    return f"{segundos * 1000:7.0f} ms" if segundos is not None else f"{'-':>10}"
+
+def medir_retirados():
+    """Tamanho do HTML com a foto de retirado embutida em cada lote x uma constante só"""
+    from relatorio import GeradorRelatorios, logo_do_comitente, registros_dos_lotes
+    from sistema_leiloes import ARQUIVO_TEMPLATE
+
+    with open('lote_retirado_base64.txt', 'r', encoding='utf-8') as f:
+        imagem_retirado = f.read().strip()
+    lotes = [Lote.from_dict(lote, "LEILÃO") for lote in _lotes_ficticios(1000)]
+    for lote in lotes[::10]:
+        lote.retirado = True
+    avaliacoes = {}
+
+    logo_url = logo_do_comitente('/logo.png', lotes)
+    registros = registros_dos_lotes(lotes, avaliacoes, logo_url)
+    for registro in registros:
+        if registro['retirado']:
+            registro['imagem'] = f"data:image/jpeg;base64,{imagem_retirado}"
+    html_antes = _relatorio_como_antes(ARQUIVO_TEMPLATE, "LEILÃO", logo_url, registros)
+    html_depois = GeradorRelatorios(ARQUIVO_TEMPLATE, imagem_retirado).gerar("LEILÃO", '/logo.png', lotes, avaliacoes)
+
+    print(f"Relatório com 1000 lotes, 100 retirados (foto de retirado: {len(imagem_retirado) / 1024:.0f} KB em base64)")
+    print(f"{'':>22} {'tamanho':>10} {'PDF':>10}")
+    for nome, html in (("foto em cada lote", html_antes), ("constante única", html_depois)):
+        _, pdf = _tempos_navegador(html) or (None, None)
+        print(f"{nome:>22} {len(html.encode('utf-8')) / 1024:7.0f} KB {_texto_tempo(pdf)}")
+
+MEDICOES = {
+    'tabela': medir_tabela,
+    'lista': medir_lista,
+    'busca': medir_busca,
+    'memoria': medir_memoria,
+    'log': medir_log,
+    'relatorio': medir_relatorio,
+    'retirados': medir_retirados,
+}
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:] or list(MEDICOES)
+    for nome in nomes:
+        if nome not in MEDICOES:
+            print(f"Medição desconhecida: {nome} (opções: {', '.join(MEDICOES)})")
+            continue
+        MEDICOES[nome]()
+        print()
@@ -0,0 +1,324 @@
+"""
+Cache local das imagens dos lotes (fotos, símbolos e logos dos comitentes).
+
+As imagens são baixadas uma vez, em paralelo, durante a coleta, reduzidas a miniaturas
+(o relatório mostra as fotos com uns 100 px) e guardadas em disco pelo hash do conteúdo:
+endereços diferentes com a mesma imagem ocupam um arquivo só. O cache tem tamanho máximo
+e descarta primeiro as imagens usadas há mais tempo. Os relatórios embutem as cópias
+locais, então abrir o HTML ou gerar o PDF não baixa nada.
+
+Sem o Pillow as imagens são guardadas como vieram (sem miniatura).
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import modelos
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    SESSAO_HTTP = True
+except ImportError:
+    SESSAO_HTTP = False
+
+try:
+    from PIL import Image
+    MINIATURAS = True
+except ImportError:
+    MINIATURAS = False
+
+PASTA_CACHE_IMAGENS = 'cache_imagens'
+ARQUIVO_INDICE = 'indice.json'
+# Tamanho máximo do cache em disco
+TAMANHO_MAXIMO_CACHE = 200 * 1024 * 1024
+# Lado maior das miniaturas: ~2x o tamanho exibido, para a impressão sair nítida
+LADO_MINIATURA = 240
+QUALIDADE_JPEG = 80
+CONEXOES_IMAGENS = 8
+TIMEOUT_IMAGEM = 20
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Tipo da imagem pelos primeiros bytes (para quando não há Pillow)
+ASSINATURAS_TIPO = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG', 'image/png'),
+    (b'GIF8', 'image/gif'),
+    (b'RIFF', 'image/webp'),
+    (b'<svg', 'image/svg+xml'),
+    (b'<?xml', 'image/svg+xml'),
+]
+EXTENSOES = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif',
+             'image/webp': '.webp', 'image/svg+xml': '.svg'}
+
+def tipo_da_imagem(conteudo):
+    for inicio, tipo in ASSINATURAS_TIPO:
+        if conteudo.startswith(inicio):
+            return tipo
+    return None
+
+def miniatura(conteudo):
+    """(bytes, tipo) da imagem reduzida; com transparência fica PNG, senão JPEG"""
+    with Image.open(io.BytesIO(conteudo)) as img:
+        img.thumbnail((LADO_MINIATURA, LADO_MINIATURA))
+        saida = io.BytesIO()
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            img.save(saida, format='PNG', optimize=True)
+            return saida.getvalue(), 'image/png'
+        img.convert('RGB').save(saida, format='JPEG', quality=QUALIDADE_JPEG, optimize=True)
+        return saida.getvalue(), 'image/jpeg'
+
+def enderecos_das_imagens(comitente_logo, lotes):
+    """URLs absolutas do logo e das imagens dos lotes (modelos.Lote)"""
+    enderecos = [modelos.url_absoluta(comitente_logo)]
+    for lote in lotes:
+        enderecos.append(lote.imagem_url)
+        enderecos.append(lote.simbolo_url)
+    return enderecos
+
+def enderecos_do_leilao(leilao):
+    """URLs das imagens de um leilão no formato do scraper/banco"""
+    modelo = modelos.Leilao.from_dict(leilao)
+    return enderecos_das_imagens(modelo.comitente_logo, modelo.lotes)
+
+class CacheImagens:
+    """
+    Imagens em disco: arquivos com o nome do SHA-1 do conteúdo e um índice em JSON
+    {url: [hash, tipo, bytes]} na ordem de uso (o mais antigo primeiro, como nos caches LRU
+    do aplicativo). Pode ser usado de várias threads.
+    """
+    def __init__(self, pasta=PASTA_CACHE_IMAGENS, tamanho_maximo=TAMANHO_MAXIMO_CACHE,
+                 conexoes=CONEXOES_IMAGENS):
+        self.pasta = pasta
+        self.tamanho_maximo = tamanho_maximo
+        self.conexoes = conexoes
+        self.indice = OrderedDict()
+        self.tamanho = 0  # Bytes em disco (cada hash contado uma vez)
+        self.referencias = {}  # {hash: quantas URLs apontam para o arquivo}
+        self.versao = 0  # Muda a cada imagem nova ou descartada (entra na assinatura dos relatórios)
+        self.falhas = set()  # URLs que não baixaram nesta execução
+        self._trava = threading.RLock()
+        self._executor = None
+        self._pendentes = set()
+        self._sessao = None
+        self._carregar_indice()
+
+    def _caminho_arquivo(self, hash_conteudo, tipo):
+        return os.path.join(self.pasta, hash_conteudo[:2], hash_conteudo + EXTENSOES.get(tipo, ''))
+
+    def _carregar_indice(self):
+        try:
+            with open(os.path.join(self.pasta, ARQUIVO_INDICE), 'r', encoding='utf-8') as f:
+                entradas = json.load(f)
+        except (OSError, ValueError):
+            return
+        for url, hash_conteudo, tipo, tamanho in entradas:
+            if os.path.exists(self._caminho_arquivo(hash_conteudo, tipo)):
+                self._apontar(url, (hash_conteudo, tipo, tamanho))
+
+    def salvar_indice(self):
+        with self._trava:
+            entradas = [[url, *dados] for url, dados in self.indice.items()]
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = os.path.join(self.pasta, ARQUIVO_INDICE)
+        with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(entradas, f)
+        os.replace(caminho + '.tmp', caminho)
+
+    def _apontar(self, url, dados):
+        """Liga a URL ao arquivo (dados = (hash, tipo, bytes)), contando o arquivo uma vez"""
+        antigo = self.indice.get(url)
+        if antigo == dados:
+            return
+        self.indice[url] = dados
+        if dados[0] not in self.referencias:
+            self.referencias[dados[0]] = 0
+            self.tamanho += dados[2]
+        self.referencias[dados[0]] += 1
+        if antigo is not None:
+            self._soltar(antigo)
+
+    def _soltar(self, dados):
+        """Desfaz uma ligação; o arquivo é apagado quando nenhuma URL aponta mais para ele"""
+        hash_conteudo, tipo, tamanho = dados
+        self.referencias[hash_conteudo] -= 1
+        if self.referencias[hash_conteudo]:
+            return
+        del self.referencias[hash_conteudo]
+        self.tamanho -= tamanho
+        try:
+            os.remove(self._caminho_arquivo(hash_conteudo, tipo))
+        except OSError:
+            pass
+
+    def _descartar_antigas(self):
+        """Remove as imagens usadas há mais tempo até caber no tamanho máximo"""
+        while self.tamanho > self.tamanho_maximo and len(self.indice) > 1:
+            _, dados = self.indice.popitem(last=False)
+            self._soltar(dados)
+            self.versao += 1
+
+    def guardar(self, url, conteudo, tipo=None):
+        """Guarda a imagem (reduzida, se houver Pillow) para a URL"""
+        if MINIATURAS:
+            try:
+                conteudo, tipo = miniatura(conteudo)
+            except Exception:
+                pass  # Formato que o Pillow não abre (SVG, por exemplo): fica o original
+        tipo = tipo_da_imagem(conteudo) or tipo or 'image/jpeg'
+        hash_conteudo = hashlib.sha1(conteudo).hexdigest()
+        caminho = self._caminho_arquivo(hash_conteudo, tipo)
+        with self._trava:
+            if hash_conteudo not in self.referencias:
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                with open(caminho, 'wb') as f:
+                    f.write(conteudo)
+            self._apontar(url, (hash_conteudo, tipo, len(conteudo)))
+            self.indice.move_to_end(url)
+            self.versao += 1
+            self._descartar_antigas()
+
+    def caminho(self, url):
+        """Arquivo local da imagem da URL (None se não estiver no cache)"""
+        with self._trava:
+            dados = self.indice.get(url)
+            if dados is None:
+                return None
+            self.indice.move_to_end(url)
+        return self._caminho_arquivo(dados[0], dados[1])
+
+    def data_uri(self, url):
+        """Imagem da URL como data URI (None se não estiver no cache)"""
+        with self._trava:
+            dados = self.indice.get(url)
+            if dados is None:
+                return None
+            self.indice.move_to_end(url)
+        try:
+            with open(self._caminho_arquivo(dados[0], dados[1]), 'rb') as f:
+                return f"data:{dados[1]};base64,{base64.b64encode(f.read()).decode('ascii')}"
+        except OSError:
+            with self._trava:
+                if url in self.indice:
+                    self._soltar(self.indice.pop(url))
+            return None
+
+    def _baixar_conteudo(self, url):
+        if SESSAO_HTTP:
+            if self._sessao is None:
+                self._sessao = requests.Session()
+                self._sessao.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=self.conexoes))
+                self._sessao.headers['User-Agent'] = USER_AGENT
+            resposta = self._sessao.get(url, timeout=TIMEOUT_IMAGEM)
+            resposta.raise_for_status()
+            return resposta.content, resposta.headers.get('Content-Type', '').split(';')[0] or None
+        requisicao = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        with urllib.request.urlopen(requisicao, timeout=TIMEOUT_IMAGEM) as resposta:
+            return resposta.read(), resposta.headers.get_content_type()
+
+    def baixar(self, url):
+        """Baixa e guarda uma imagem; True se ela está no cache no final"""
+        with self._trava:
+            if url in self.indice:
+                self._pendentes.discard(url)
+                return True
+        try:
+            conteudo, tipo = self._baixar_conteudo(url)
+            self.guardar(url, conteudo, tipo)
+            return True
+        except Exception as e:
+            with self._trava:
+                self.falhas.add(url)
+            print(f"   ⚠ Imagem não baixada ({url}): {e}")
+            return False
+        finally:
+            with self._trava:
+                self._pendentes.discard(url)
+
+    def _a_baixar(self, enderecos):
+        """Endereços http(s) únicos que ainda não estão no cache nem a caminho"""
+        novos = []
+        with self._trava:
+            for url in dict.fromkeys(enderecos):
+                if (url and url.startswith('http') and url not in self.indice
+                        and url not in self._pendentes and url not in self.falhas):
+                    self._pendentes.add(url)
+                    novos.append(url)
+        return novos
+
+    def agendar(self, enderecos):
+        """Começa a baixar em segundo plano as imagens que faltam; devolve quantas"""
+        novos = self._a_baixar(enderecos)
+        if not novos:
+            return 0
+        with self._trava:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.conexoes)
+            executor = self._executor
+            try:
+                for i, url in enumerate(novos):
+                    executor.submit(self.baixar, url)
+            except RuntimeError:
+                # Executor encerrado: os que não entraram voltam a poder ser agendados
+                self._pendentes.difference_update(novos[i:])
+                return i
+        return len(novos)
+
+    def baixar_varios(self, enderecos):
+        """Baixa em paralelo as imagens que faltam e espera terminar; devolve quantas baixou"""
+        novos = self._a_baixar(enderecos)
+        if not novos:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.conexoes) as executor:
+            resultados = list(executor.map(self.baixar, novos))
+        self.salvar_indice()
+        return sum(resultados)
+
+    def aguardar(self):
+        """Espera os downloads agendados e grava o índice"""
+        with self._trava:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+        self.salvar_indice()
+
+    def fechar(self):
+        self.aguardar()
+        if self._sessao is not None:
+            self._sessao.close()
+            self._sessao = None
+
+if __name__ == "__main__":
+    import argparse
+    from armazenamento import ArmazemLeiloes, ARQUIVO_BANCO
+    parser = argparse.ArgumentParser(description='Cache local das imagens dos lotes')
+    parser.add_argument('acao', choices=['baixar', 'limpar'],
+                        help='Baixar as imagens que faltam de todos os leilões do banco, ou apagar o cache')
+    parser.add_argument('--banco', default=ARQUIVO_BANCO, help=f'Arquivo do banco (padrão: {ARQUIVO_BANCO})')
+    parser.add_argument('--pasta', default=PASTA_CACHE_IMAGENS, help=f'Pasta do cache (padrão: {PASTA_CACHE_IMAGENS})')
+    args = parser.parse_args()
+
+    if args.acao == 'limpar':
+        import shutil
+        shutil.rmtree(args.pasta, ignore_errors=True)
+        print(f"✓ Cache {args.pasta} apagado")
+    else:
+        if not MINIATURAS:
+            print("⚠ Pillow não instalado: as imagens serão guardadas sem reduzir")
+        cache = CacheImagens(args.pasta)
+        armazem = ArmazemLeiloes(args.banco)
+        try:
+            enderecos = []
+            for leilao in armazem.listar_leiloes():
+                enderecos.extend(enderecos_do_leilao(armazem.carregar_leilao(leilao['leilao_url'])))
+            print(f"✓ {cache.baixar_varios(enderecos)} imagens baixadas ({cache.tamanho / 1024 / 1024:.1f} MB em cache)")
+        finally:
+            cache.fechar()
+            armazem.fechar()
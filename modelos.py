@@ -0,0 +1,285 @@
+"""
+Modelo dos lotes e leilões e os campos derivados dos lotes.
+
+O que a interface e o relatório precisam além do que o scraper lê (título limpo, número
+do lote para ordenar, URLs absolutas, valor em centavos) é calculado uma vez, quando o
+lote é gravado, e fica guardado junto com ele.
+
+Em memória o app usa Lote/Leilao (com __slots__, valores em centavos) em vez dos
+dicionários de textos do scraper; from_dict/para_dict convertem nos dois sentidos.
+"""
+import re
+
+BASE_URL = "https://www.leiloespb.com.br"
+
+# Campos do lote na ordem em que o scraper monta o dicionário
+CAMPOS_LOTE = [
+    'codigo_lote', 'numero_lote', 'titulo', 'descricao', 'valor_leilao', 'valor_minimo',
+    'simbolo_lote', 'imagem_lote', 'retirado', 'url'
+]
+
+# Campos calculados por campos_derivados (guardados em colunas próprias no banco)
+CAMPOS_DERIVADOS = ['titulo_limpo', 'numero', 'imagem_url', 'simbolo_url', 'valor_centavos']
+
+# Palavras-chave para ignorar no início das linhas da descrição
+IGNORAR_NO_TITULO = [
+    "DESCRIÇÃO", "AVALIAÇÃO", "LEILOEIRO", "COMITENTE", "CÓDIGO LEILÃO",
+    "CÓDIGO LOTE", "NÚMERO LOTE", "HABILITADOS", "TIPO", "RECEBIMENTO DE LANCES",
+    "LOCALIZAÇÃO", "VISITAÇÃO", "PAGAMENTO", "RETIRADA"
+]
+TITULOS_GENERICOS = {"", "Título não encontrado", "LOTE"}
+
+_VALOR_ISOLADO = re.compile(r'^R\$\s?[\d\.,]+$')
+_NAO_DIGITO = re.compile(r'\D')
+# "R$ 299.500,00" -> ('299.500', '00')
+_VALOR = re.compile(r'(\d[\d\.]*)(?:,(\d{1,2}))?')
+
+def url_absoluta(url):
+    """Completa com o endereço do site as URLs relativas (data: e http ficam como estão)"""
+    if not url or url.startswith('http') or url.startswith('data:'):
+        return url or ''
+    return BASE_URL + url
+
+def numero_do_lote(numero_lote):
+    """'LOTE 12' -> 12 (0 se não houver número)"""
+    try:
+        num_str = (numero_lote or '0').replace('LOTE', '').strip()
+        return int(_NAO_DIGITO.sub('', num_str)) if num_str else 0
+    except:
+        return 0
+
+def valor_em_centavos(texto):
+    """'R$ 299.500,00' -> 29950000; None para textos sem valor ("Sob Consulta", "N/A")"""
+    encontrado = _VALOR.search(texto or '')
+    if not encontrado:
+        return None
+    reais, centavos = encontrado.groups()
+    return int(reais.replace('.', '')) * 100 + int((centavos or '0').ljust(2, '0'))
+
+def formatar_centavos(centavos):
+    """29950000 -> '299.500,00'"""
+    valor_formatado = f"{centavos / 100:,.2f}"
+    return valor_formatado.replace(',', 'TEMP').replace('.', ',').replace('TEMP', '.')
+
+def centavos_digitados(texto):
+    """
+    Valor digitado só com números, lido como centavos: "150000" -> 150000 (R$ 1.500,00).
+    Outros caracteres são ignorados; None se não houver dígitos.
+    """
+    apenas_digitos = ''.join(filter(str.isdigit, texto or ''))
+    return int(apenas_digitos) if apenas_digitos else None
+
+def limpar_titulo(lote, titulo_leilao):
+    """Melhora o título do lote se ele for genérico ou igual ao do leilão"""
+    titulo = lote.get('titulo') or ''
+    num_str = (lote.get('numero_lote') or '').replace('LOTE', '').strip()
+
+    # Se o título do lote for genérico ou igual ao do leilão, tenta extrair da descrição ou da URL
+    if titulo in TITULOS_GENERICOS or titulo == titulo_leilao:
+        descricao = lote.get('descricao') or ''
+        for linha in (l.strip() for l in descricao.split('\n')):
+            linha_upper = linha.upper()
+            # Se a linha for apenas uma palavra-chave, ignora
+            if any(linha_upper == kw or linha_upper.startswith(f"{kw}:") for kw in IGNORAR_NO_TITULO):
+                continue
+
+            # Se a linha contiver "LOTE:" e "DATA:", ignora (cabeçalho padrão)
+            if "LOTE:" in linha_upper and "DATA:" in linha_upper:
+                continue
+
+            # Se a linha for um valor monetário isolado, ignora
+            if _VALOR_ISOLADO.match(linha):
+                continue
+
+            # Linhas vazias ou muito curtas (menos de 3 chars) não servem
+            if len(linha) < 3:
+                continue
+
+            # Achamos um candidato!
+            return linha
+
+        # Fallback para URL: a última parte (slug) formatada
+        url = lote.get('url') or ''
+        if url:
+            return url.rstrip('/').split('/')[-1].replace('-', ' ').upper()
+
+        # Se tudo falhar, retorna LOTE X
+        if num_str:
+            return f"LOTE {num_str}"
+
+    return titulo
+
+def campos_derivados(lote, titulo_leilao):
+    """Calcula os campos derivados de um lote (o dicionário do lote não é alterado)"""
+    titulo_limpo = limpar_titulo(lote, titulo_leilao)
+    if titulo_limpo.upper() == "LOTE" or not titulo_limpo.strip():
+        numero_lote = (lote.get('numero_lote') or '0').upper().strip()
+        titulo_limpo = numero_lote if "LOTE" in numero_lote else f"LOTE {numero_lote}"
+    return {
+        'titulo_limpo': titulo_limpo,
+        'numero': numero_do_lote(lote.get('numero_lote')),
+        'imagem_url': url_absoluta(lote.get('imagem_lote')),
+        'simbolo_url': url_absoluta(lote.get('simbolo_lote')),
+        'valor_centavos': valor_em_centavos(lote.get('valor_leilao') or lote.get('valor_minimo')),
+    }
+
+def _texto_do_valor(centavos):
+    return f"R$ {formatar_centavos(centavos)}" if centavos is not None else None
+
+def _texto_do_numero(numero):
+    return f"LOTE {numero}"
+
+class Lote:
+    """
+    Lote em memória com __slots__: valores em centavos (int), número do lote (int) e
+    retirado (bool). Os textos originais só são guardados quando não podem ser refeitos
+    a partir dos números ("Sob Consulta", "N/A", "LOTE 12A"), então para_dict devolve
+    exatamente o dicionário de origem.
+    """
+    __slots__ = ('url', 'codigo_lote', 'numero', 'titulo', 'titulo_limpo', 'descricao',
+                 'valor_leilao', 'valor_minimo', 'simbolo_lote', 'imagem_lote', 'retirado',
+                 'extras', '_textos')
+
+    def __init__(self, url=None, codigo_lote=None, numero=0, titulo=None, titulo_limpo='', descricao=None,
+                 valor_leilao=None, valor_minimo=None, simbolo_lote=None, imagem_lote=None, retirado=False,
+                 extras=None, textos=None):
+        self.url = url
+        self.codigo_lote = codigo_lote
+        self.numero = numero
+        self.titulo = titulo
+        self.titulo_limpo = titulo_limpo
+        self.descricao = descricao
+        self.valor_leilao = valor_leilao
+        self.valor_minimo = valor_minimo
+        self.simbolo_lote = simbolo_lote
+        self.imagem_lote = imagem_lote
+        self.retirado = retirado
+        self.extras = extras or None
+        self._textos = textos or None
+
+    @classmethod
+    def from_dict(cls, dados, titulo_leilao=''):
+        """
+        Converte o dicionário do scraper/banco. Campos derivados já calculados (vindos do
+        banco) são aproveitados; os que faltarem são calculados agora.
+        """
+        numero = dados.get('numero')
+        if numero is None:
+            numero = numero_do_lote(dados.get('numero_lote'))
+        titulo_limpo = dados.get('titulo_limpo')
+        if titulo_limpo is None:
+            titulo_limpo = campos_derivados(dados, titulo_leilao)['titulo_limpo']
+        valor_leilao = valor_em_centavos(dados.get('valor_leilao'))
+        valor_minimo = valor_em_centavos(dados.get('valor_minimo'))
+
+        # Guarda só os textos que não são refeitos iguais a partir dos números
+        textos = {}
+        for campo, refeito in (('numero_lote', _texto_do_numero(numero)),
+                               ('valor_leilao', _texto_do_valor(valor_leilao)),
+                               ('valor_minimo', _texto_do_valor(valor_minimo))):
+            if dados.get(campo) != refeito:
+                textos[campo] = dados.get(campo)
+
+        extras = {k: v for k, v in dados.items() if k not in CAMPOS_LOTE and k not in CAMPOS_DERIVADOS}
+        return cls(
+            url=dados.get('url'), codigo_lote=dados.get('codigo_lote'), numero=numero,
+            titulo=dados.get('titulo'), titulo_limpo=titulo_limpo, descricao=dados.get('descricao'),
+            valor_leilao=valor_leilao, valor_minimo=valor_minimo,
+            simbolo_lote=dados.get('simbolo_lote'), imagem_lote=dados.get('imagem_lote'),
+            retirado=bool(dados.get('retirado')), extras=extras, textos=textos
+        )
+
+    def _texto(self, campo):
+        if self._textos and campo in self._textos:
+            return self._textos[campo]
+        if campo == 'numero_lote':
+            return _texto_do_numero(self.numero)
+        return _texto_do_valor(getattr(self, campo))
+
+    @property
+    def numero_lote(self):
+        return self._texto('numero_lote')
+
+    @property
+    def texto_valor_leilao(self):
+        return self._texto('valor_leilao')
+
+    @property
+    def texto_valor_minimo(self):
+        return self._texto('valor_minimo')
+
+    @property
+    def valor_centavos(self):
+        """Valor do leilão, ou o mínimo de venda quando o lote não tem valor de leilão"""
+        if self.valor_leilao is not None:
+            return self.valor_leilao
+        # Texto sem valor no lugar do valor do leilão ("Sob Consulta") não cai para o mínimo
+        if self._textos and self._textos.get('valor_leilao'):
+            return None
+        return self.valor_minimo
+
+    @property
+    def chave(self):
+        """Chave das avaliações manuais (URL do lote; código do lote se não houver URL)"""
+        return self.url or self.codigo_lote
+
+    @property
+    def imagem_url(self):
+        return url_absoluta(self.imagem_lote)
+
+    @property
+    def simbolo_url(self):
+        return url_absoluta(self.simbolo_lote)
+
+    def assinatura(self):
+        """Tupla com todos os dados do lote (para hash/comparação), sem montar textos"""
+        return (self.url, self.codigo_lote, self.numero, self.titulo, self.titulo_limpo, self.descricao,
+                self.valor_leilao, self.valor_minimo, self.simbolo_lote, self.imagem_lote, self.retirado,
+                tuple(self._textos.items()) if self._textos else None)
+
+    def para_dict(self, derivados=False):
+        """Dicionário no formato do scraper/JSON (com derivados=True inclui os campos derivados)"""
+        dados = {
+            'codigo_lote': self.codigo_lote,
+            'numero_lote': self.numero_lote,
+            'titulo': self.titulo,
+            'descricao': self.descricao,
+            'valor_leilao': self.texto_valor_leilao,
+            'valor_minimo': self.texto_valor_minimo,
+            'simbolo_lote': self.simbolo_lote,
+            'imagem_lote': self.imagem_lote,
+            'retirado': self.retirado,
+            'url': self.url
+        }
+        if self.extras:
+            dados.update(self.extras)
+        if derivados:
+            dados.update(titulo_limpo=self.titulo_limpo, numero=self.numero, imagem_url=self.imagem_url,
+                         simbolo_url=self.simbolo_url, valor_centavos=self.valor_centavos)
+        return dados
+
+class Leilao:
+    """Leilão em memória com __slots__ e a lista de Lote"""
+    __slots__ = ('url', 'titulo', 'comitente_logo', 'total_lotes', 'lotes')
+
+    def __init__(self, url, titulo='', comitente_logo='', total_lotes=0, lotes=None):
+        self.url = url
+        self.titulo = titulo
+        self.comitente_logo = comitente_logo
+        self.total_lotes = total_lotes
+        self.lotes = lotes if lotes is not None else []
+
+    @classmethod
+    def from_dict(cls, dados):
+        titulo = dados.get('leilao_titulo', '')
+        lotes = [Lote.from_dict(lote, titulo) for lote in dados.get('lotes', [])]
+        return cls(dados.get('leilao_url') or dados.get('url'), titulo, dados.get('comitente_logo', ''),
+                   dados.get('total_lotes', len(lotes)), lotes)
+
+    def indice(self):
+        """Entrada do índice de leilões (sem os lotes), como ArmazemLeiloes.listar_leiloes"""
+        return {'leilao_titulo': self.titulo, 'leilao_url': self.url,
+                'comitente_logo': self.comitente_logo, 'total_lotes': self.total_lotes}
+
+    def para_dict(self):
+        return dict(self.indice(), lotes=[lote.para_dict() for lote in self.lotes])
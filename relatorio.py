@@ -0,0 +1,252 @@
+"""
+Montagem do relatório HTML de um leilão a partir do template "Relatório Leilões.html".
+
+O template é lido e compilado uma única vez: o texto é dividido em partes fixas e
+espaços com nome (lotes, título, total, data, logos), e cada relatório é gerado só por
+concatenação. Os valores dos espaços ficam num cache LRU pela assinatura dos dados do
+leilão + avaliações, então gerar de novo um relatório que não mudou não refaz nada
+(só a data de geração é atualizada).
+
+Imagens embutidas aparecem uma vez só no HTML: a foto de "lote retirado" vira uma
+constante JS usada por todos os lotes retirados, e o logo do site é codificado em
+base64 uma vez por execução. Com o cache de imagens (imagens.CacheImagens), as fotos e
+logos que já estão em disco entram como data URI numa tabela por endereço (o logo do
+comitente fica só no cabeçalho, e os lotes o leem de lá), e o relatório abre (e vira
+PDF) sem baixar nada.
+"""
+import base64
+import json
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime
+
+import modelos
+
+# Relatórios mantidos prontos no cache
+TAMANHO_CACHE_RELATORIOS = 4
+
+LOGO_SITE_ORIGINAL = 'https://www.leiloespb.com.br/client/logo.png?v=2'
+# Imagem do cabeçalho que recebe o logo do comitente (espaço logo_comitente)
+SELETOR_LOGO_COMITENTE = 'img[alt="Logo Comitente"]'
+
+# Espaços do template: nome -> expressão que encontra o texto a substituir
+ESPACOS = {
+    'lotes': re.compile(r'const lotes = \[.*?\];', re.DOTALL),
+    'titulo': re.compile(re.escape('>Leilão Exemplo<')),
+    'total': re.compile(r'<span id="totalLotes">.*?</span>'),
+    'data': re.compile(r'<span id="dataAbertura">.*?</span>'),
+    'logo_comitente': re.compile(re.escape('https://via.placeholder.com/50x50?text=Logo')),
+    'logo_comitente_lote': re.compile(re.escape('https://via.placeholder.com/30x30?text=C')),
+    'logo_site': re.compile(re.escape(LOGO_SITE_ORIGINAL)),
+}
+
+# Ajustes fixos do template, aplicados uma vez na compilação
+AJUSTES_FIXOS = [
+    # Foto do lote vinda do campo 'imagem' (templates antigos tinham a foto fixa)
+    ('src="https://via.placeholder.com/100x75?text=Foto"',
+     'src="${lote.imagem || \'https://via.placeholder.com/100x75?text=Foto\'}"'),
+]
+
+class ModeloRelatorio:
+    """Template compilado: lista de partes fixas (str) e espaços (nome, texto original)"""
+    def __init__(self, caminho):
+        self.caminho = caminho
+        with open(caminho, 'r', encoding='utf-8') as f:
+            texto = f.read()
+        self.modificado_em = os.path.getmtime(caminho)
+        for antigo, novo in AJUSTES_FIXOS:
+            texto = texto.replace(antigo, novo)
+
+        encontrados = []
+        for nome, expressao in ESPACOS.items():
+            encontrados.extend((m.start(), m.end(), nome) for m in expressao.finditer(texto))
+        encontrados.sort()
+
+        self.partes = []
+        posicao = 0
+        for inicio, fim, nome in encontrados:
+            if inicio < posicao:
+                continue  # Sobreposto a outro espaço
+            self.partes.append(texto[posicao:inicio])
+            self.partes.append((nome, texto[inicio:fim]))
+            posicao = fim
+        self.partes.append(texto[posicao:])
+
+    def desatualizado(self):
+        try:
+            return os.path.getmtime(self.caminho) != self.modificado_em
+        except OSError:
+            return False
+
+    def renderizar(self, valores):
+        """Junta as partes; espaços sem valor (ou None) mantêm o texto original do template"""
+        saida = []
+        for parte in self.partes:
+            if isinstance(parte, str):
+                saida.append(parte)
+            else:
+                nome, original = parte
+                valor = valores.get(nome)
+                saida.append(original if valor is None else valor)
+        return ''.join(saida)
+
+def logo_do_comitente(comitente_logo, lotes):
+    """Logo do leilão; se vier relativo ou vazio, o primeiro símbolo de lote que já veio absoluto"""
+    logo_url = comitente_logo or ''
+    if not logo_url or (not logo_url.startswith('http') and not logo_url.startswith('data:')):
+        logo_url = next((lote.simbolo_lote for lote in lotes
+                         if (lote.simbolo_lote or '').startswith('http')), None) \
+            or modelos.url_absoluta(logo_url)
+    return logo_url
+
+def registros_dos_lotes(lotes, avaliacoes, logo_url, com_imagem_retirado=False):
+    """
+    Registros do array `lotes` do template. Título, número, URLs e valor já vêm prontos do
+    modelo. Com com_imagem_retirado, lotes retirados ficam sem imagem: ela é preenchida no
+    navegador com a constante IMAGEM_RETIRADO (ver _script_lotes).
+    """
+    registros = []
+    for lote in lotes:
+        # Valor sem "R$" (o template adiciona)
+        centavos = lote.valor_centavos
+        if centavos is not None:
+            valor_limpo = modelos.formatar_centavos(centavos)
+        else:
+            valor_limpo = lote.texto_valor_leilao or lote.texto_valor_minimo or "0,00"
+        avaliacao = avaliacoes.get(lote.chave)
+
+        # Verificar se está retirado
+        imagem_lote = lote.imagem_url
+        if lote.retirado and com_imagem_retirado:
+            imagem_lote = None
+
+        registros.append({
+            "numero": (lote.numero_lote or '0').upper().replace('LOTE', '').strip(),
+            "titulo": lote.titulo_limpo,
+            "descricao": lote.descricao or "Sem descrição detalhada.",
+            "lances": 0, # Dado não disponível no JSON atual
+            "valorMinimo": valor_limpo,
+            "avaliacao": modelos.formatar_centavos(avaliacao) if avaliacao is not None else '',
+            "localizacao": "Paraíba", # Padrão
+            "imagem": imagem_lote,
+            "comitente": lote.simbolo_url or logo_url,
+            "retirado": lote.retirado
+        })
+    return registros
+
+def assinatura(titulo, comitente_logo, lotes, avaliacoes):
+    """
+    Tupla com os dados que aparecem no relatório. É a própria chave do cache: um acerto
+    exige dados iguais, não só o mesmo hash (os hashes das strings ficam guardados nelas).
+    """
+    return (titulo, comitente_logo, tuple(
+        (lote.assinatura(), avaliacoes.get(lote.chave)) for lote in lotes
+    ))
+
+class GeradorRelatorios:
+    """
+    Gera o HTML dos relatórios com o template compilado (recompilado só se o arquivo
+    mudar) e o cache dos relatórios já montados.
+    """
+    def __init__(self, caminho_template, imagem_retirado='', caminho_logo_site='logo_leiloespb', imagens=None):
+        self.caminho_template = caminho_template
+        self.imagem_retirado = imagem_retirado
+        self.imagens = imagens  # imagens.CacheImagens com as cópias locais (opcional)
+        self.caminho_logo_site = caminho_logo_site
+        self.modelo = None
+        self.cache = OrderedDict()  # LRU {assinatura: valores dos espaços}
+        self.acertos = 0
+        self._logo_site_uri = False  # Data URI do logo, codificado no primeiro uso
+
+    def _modelo(self):
+        if self.modelo is None or self.modelo.desatualizado():
+            self.modelo = ModeloRelatorio(self.caminho_template)
+            self.cache.clear()
+        return self.modelo
+
+    def _logo_site(self):
+        """Logo do LeiloesPB embutido como data URI (None mantém o endereço do template)"""
+        if self._logo_site_uri is not False:
+            return self._logo_site_uri
+        self._logo_site_uri = None
+        try:
+            if os.path.exists(self.caminho_logo_site):
+                with open(self.caminho_logo_site, 'rb') as img_file:
+                    # Detectar tipo de imagem (assumindo PNG por padrão)
+                    self._logo_site_uri = f"data:image/png;base64,{base64.b64encode(img_file.read()).decode('utf-8')}"
+        except Exception as e:
+            print(f"Aviso: Não foi possível carregar logo_leiloespb: {e}")
+        return self._logo_site_uri
+
+    def _imagens_locais(self, registros, logo_url):
+        """{url: data URI} das imagens do relatório que já estão no cache local"""
+        locais = {}
+        if self.imagens is None:
+            return locais
+        enderecos = [logo_url] + [registro[campo] for registro in registros for campo in ('imagem', 'comitente')]
+        for url in dict.fromkeys(enderecos):
+            if url and url.startswith('http'):
+                uri = self.imagens.data_uri(url)
+                if uri:
+                    locais[url] = uri
+        return locais
+
+    def _script_lotes(self, registros, lotes, locais, logo_local=None):
+        """
+        Declaração do array de lotes. A foto de retirado e as cópias locais vão uma vez
+        cada, em constantes, e os lotes são apontados para elas antes do renderLeilao().
+        logo_local: URL do logo do comitente já embutido no cabeçalho; os lotes com esse
+        logo usam o src da imagem do cabeçalho.
+        """
+        # Inserido por concatenação: o JSON vai como está (sem escapar barras para o re.sub)
+        declaracoes = []
+        ajustes = []
+        if self.imagem_retirado and any(lote.retirado for lote in lotes):
+            declaracoes.append(f'const IMAGEM_RETIRADO = "data:image/jpeg;base64,{self.imagem_retirado}";')
+            ajustes.append('if (lote.retirado) lote.imagem = IMAGEM_RETIRADO;')
+        if locais:
+            declaracoes.append(f'const IMAGENS_LOCAIS = {json.dumps(locais)};')
+            ajustes.append('lote.imagem = IMAGENS_LOCAIS[lote.imagem] || lote.imagem;')
+            ajustes.append('lote.comitente = IMAGENS_LOCAIS[lote.comitente] || lote.comitente;')
+        if logo_local:
+            declaracoes.append(f'const LOGO_COMITENTE = document.querySelector({json.dumps(SELETOR_LOGO_COMITENTE)}).src;')
+            ajustes.append(f'if (lote.comitente === {json.dumps(logo_local)}) lote.comitente = LOGO_COMITENTE;')
+        declaracoes.append(f'const lotes = {json.dumps(registros, ensure_ascii=False)};')
+        if ajustes:
+            declaracoes.append('lotes.forEach(lote => { ' + ' '.join(ajustes) + ' });')
+        return '\n        '.join(declaracoes)
+
+    def _montar_valores(self, titulo, comitente_logo, lotes, avaliacoes):
+        logo_url = logo_do_comitente(comitente_logo, lotes)
+        registros = registros_dos_lotes(lotes, avaliacoes, logo_url, bool(self.imagem_retirado))
+        locais = self._imagens_locais(registros, logo_url)
+        # O logo do comitente vai uma vez só, no cabeçalho
+        logo_embutido = locais.pop(logo_url, None)
+        return {
+            'lotes': self._script_lotes(registros, lotes, locais, logo_url if logo_embutido else None),
+            'titulo': f'>{titulo}<',
+            'total': f'<span id="totalLotes">{len(registros)}</span>',
+            'logo_comitente': logo_embutido or logo_url or None,
+            'logo_comitente_lote': logo_url or None,
+            'logo_site': self._logo_site(),
+        }
+
+    def gerar(self, titulo, comitente_logo, lotes, avaliacoes):
+        """HTML do relatório para os lotes (modelos.Lote, já ordenados)"""
+        modelo = self._modelo()
+        chave = assinatura(titulo, comitente_logo, lotes, avaliacoes)
+        if self.imagens is not None:
+            chave = (chave, self.imagens.versao)  # Imagens novas no cache refazem o relatório
+        valores = self.cache.get(chave)
+        if valores is None:
+            valores = self._montar_valores(titulo, comitente_logo, lotes, avaliacoes)
+            self.cache[chave] = valores
+            while len(self.cache) > TAMANHO_CACHE_RELATORIOS:
+                self.cache.popitem(last=False)
+        else:
+            self.acertos += 1
+        self.cache.move_to_end(chave)
+
+        data_hoje = datetime.now().strftime("%d/%m/%Y %H:%M")
+        return modelo.renderizar(dict(valores, data=f'<span id="dataAbertura">{data_hoje}</span>'))
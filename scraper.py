@@ -1,9 +1,18 @@
 import json
 import time
+import hashlib
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from playwright.sync_api import sync_playwright
 import argparse
 import sys
 import os
+import scraper_http
+from imagens import CacheImagens, enderecos_do_leilao
+from armazenamento import ArmazemLeiloes, ARQUIVO_BANCO
+from modelos import BASE_URL
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 # Forçar encoding UTF-8 no Windows para evitar erros de impressão
 if sys.platform == "win32":
@@ -12,117 +21,561 @@ if sys.platform == "win32":
     if sys.stderr is not None:
         sys.stderr.reconfigure(encoding='utf-8')
 
-BASE_URL = "https://www.leiloespb.com.br"
+# Pausas fixas do caminho por cliques: 0,5 s antes e 3 s depois de cada clique
+CUSTO_PAGINA_POR_CLIQUE = 3.5
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 
-def extrair_dados_lote_individual(page, lote_url):
+# Assinatura da listagem atual (primeiros links de lote) para detectar troca de página via AJAX
+_ASSINATURA_LISTAGEM = """Array.from(document.querySelectorAll('article a[href*="/lote/"]'))
+    .slice(0, 5).map(a => a.getAttribute('href')).join('|')"""
+
+class Esperas:
     """
-    Extrai dados de um lote individual quando já estamos na página dele.
-    Usado para leilões com apenas 1 lote que redirecionam diretamente.
+    Esperas por sinais concretos de prontidão (seletores, troca de URL ou de conteúdo,
+    rede ociosa) em vez de pausas fixas, com o tempo gasto acumulado por fase.
+    Com fixas=True reproduz as pausas antigas, para comparar as duas estratégias.
     """
-    try:
-        page.wait_for_timeout(500)
-        
-        # Extrair título do lote
-        titulo = "Título não encontrado"
+    def __init__(self, fixas=False, timeout_ms=10000):
+        self.fixas = fixas
+        self.timeout_ms = timeout_ms
+        self.tempos = {}  # fase -> [segundos, vezes]
+
+    def _registrar(self, fase, inicio):
+        total = self.tempos.setdefault(fase, [0.0, 0])
+        total[0] += time.perf_counter() - inicio
+        total[1] += 1
+
+    def _aguardar_funcao(self, page, expressao, arg=None, timeout_ms=None):
         try:
-            titulo_locator = page.locator('h2').first
-            if titulo_locator.count() > 0:
-                titulo = titulo_locator.inner_text(timeout=3000).strip()
-            else:
-                titulo_locator = page.locator('h1').first
-                if titulo_locator.count() > 0:
-                    titulo = titulo_locator.inner_text(timeout=3000).strip()
+            page.wait_for_function(expressao, arg=arg, timeout=timeout_ms or self.timeout_ms)
+            return True
         except:
-            titulo = lote_url.split('/')[-1].replace('-', ' ').title()
-        
-        # Extrair descrição - XPath específico para lote único
-        descricao = "Descrição não disponível"
+            return False
+
+    def pagina_principal(self, page):
+        """Cards de leilão já apareceram; esperar a rede acalmar para a lista ficar completa"""
+        inicio = time.perf_counter()
+        if self.fixas:
+            page.wait_for_timeout(2000)
+        else:
+            try:
+                page.wait_for_load_state('networkidle', timeout=3000)
+            except:
+                pass
+        self._registrar('principal', inicio)
+
+    def pagina_leilao(self, page, inicio_navegacao=None):
+        """Página de leilão: cards de lote renderizados, ou redirecionamento para um lote único"""
+        inicio = time.perf_counter()
+        if self.fixas:
+            page.wait_for_timeout(2000)
+        else:
+            self._aguardar_funcao(page, """() => document.querySelector('article a[href*="/lote/"]')
+                || (location.pathname.includes('/lote/') && document.querySelector('h2'))""")
+        self._registrar('leilao', inicio)
+
+    def pagina_listagem(self, page, inicio_navegacao=None):
+        """Página N da listagem aberta direto pela URL: cards de lote renderizados"""
+        inicio = time.perf_counter()
+        if self.fixas:
+            decorrido = (time.monotonic() - inicio_navegacao) * 1000 if inicio_navegacao else 0
+            if 2000 - decorrido > 0:
+                page.wait_for_timeout(2000 - decorrido)
+        else:
+            self._aguardar_funcao(page, """() => document.querySelector('article a[href*="/lote/"]')""",
+                                  timeout_ms=5000)
+        self._registrar('listagem', inicio)
+
+    def pagina_lote(self, page, inicio_navegacao=None, espera_fixa_ms=800, fase='lote'):
+        """Página de lote: título e rótulos de código/número presentes"""
+        inicio = time.perf_counter()
+        if self.fixas:
+            # No pool a pausa conta desde o início da navegação, como no modo sequencial
+            decorrido = (time.monotonic() - inicio_navegacao) * 1000 if inicio_navegacao else 0
+            if espera_fixa_ms - decorrido > 0:
+                page.wait_for_timeout(espera_fixa_ms - decorrido)
+        else:
+            self._aguardar_funcao(page, """() => document.querySelector('h2')
+                && /Número Lote|Código Lote/.test(document.body.textContent)""", timeout_ms=5000)
+        self._registrar(fase, inicio)
+
+    def pausa_entre_lotes(self):
+        if self.fixas:
+            inicio = time.perf_counter()
+            time.sleep(0.1)
+            self._registrar('pausa_lotes', inicio)
+
+    def antes_de_paginar(self, page):
+        """Após rolar até o fim: aguardar o widget de paginação, se ele ainda não existir"""
+        inicio = time.perf_counter()
+        if self.fixas:
+            page.wait_for_timeout(500)
+        else:
+            try:
+                page.wait_for_selector('.pagination, li.arrow-right', state='attached', timeout=1000)
+            except:
+                pass
+        self._registrar('antes_paginar', inicio)
+
+    def assinatura_listagem(self, page):
         try:
-            # Tentativa 1: XPath completo fornecido pelo usuário
-            desc_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[6]')
-            if desc_locator.count() > 0:
-                descricao = desc_locator.inner_text(timeout=3000).strip()
-            else:
-                # Tentativa 2: XPath do parágrafo específico
-                desc_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[6]/p')
-                if desc_locator.count() > 0:
-                    descricao = desc_locator.inner_text(timeout=3000).strip()
-                else:
-                    # Tentativa 3: Fallback genérico
-                    desc_heading = page.locator('text="Descrição"').first
-                    if desc_heading.count() > 0:
-                        desc_container = desc_heading.locator('xpath=..').locator('xpath=following-sibling::*').first
-                        if desc_container.count() > 0:
-                            descricao = desc_container.inner_text(timeout=3000).strip()
+            return page.evaluate(f"() => {_ASSINATURA_LISTAGEM}")
         except:
-            pass
-        
-        # Extrair valor mínimo de venda
-        valor_minimo = "Sob Consulta"
+            return ''
+
+    def apos_paginar(self, page, url_antes, assinatura_antes):
+        """Após clicar em "próxima": troca de URL ou troca dos cards de lote (AJAX)"""
+        inicio = time.perf_counter()
+        if self.fixas:
+            page.wait_for_timeout(2000)
+            if page.url == url_antes:
+                page.wait_for_timeout(1000)
+        else:
+            self._aguardar_funcao(page, f"""([urlAntes, assinaturaAntes]) => {{
+                if (location.href !== urlAntes) return true;
+                const atual = {_ASSINATURA_LISTAGEM};
+                return atual !== '' && atual !== assinaturaAntes;
+            }}""", arg=[url_antes, assinatura_antes], timeout_ms=5000)
+            if page.url != url_antes:
+                try:
+                    page.wait_for_selector('article', timeout=self.timeout_ms)
+                except:
+                    pass
+        self._registrar('paginacao', inicio)
+
+    def imprimir_resumo(self):
+        if not self.tempos:
+            return
+        estrategia = "pausas fixas" if self.fixas else "esperas por evento"
+        total = sum(segundos for segundos, _ in self.tempos.values())
+        print(f"\nTempo de espera por fase ({estrategia}, {total:.1f}s no total):")
+        for fase, (segundos, vezes) in sorted(self.tempos.items(), key=lambda i: -i[1][0]):
+            print(f"   {fase:<14} {vezes:>4}x  {segundos:7.1f}s  (média {segundos / vezes * 1000:.0f} ms)")
+
+class PoolPaginas:
+    """
+    Conjunto limitado de abas do mesmo navegador para visitar várias páginas ao mesmo tempo.
+
+    A API síncrona do Playwright bloqueia em cada page.goto, então a navegação é disparada
+    via JavaScript (retorna na hora) e o Chromium baixa as páginas em paralelo enquanto o
+    Python processa uma de cada vez, sempre na ordem em que foram iniciadas.
+    """
+    def __init__(self, context, tamanho, esperas=None):
+        self.context = context
+        self.tamanho = tamanho
+        self.esperas = esperas or Esperas()
+        self.paginas = [context.new_page() for _ in range(tamanho)]
+        self._livres = list(self.paginas)
+        self._em_andamento = deque()  # (page, url, url_anterior, inicio, preparar)
+
+    def tem_livre(self):
+        return bool(self._livres)
+
+    def em_andamento(self):
+        return len(self._em_andamento)
+
+    def iniciar(self, url, preparar=None):
+        """
+        Dispara a navegação de uma aba livre para a URL sem esperar o carregamento.
+        preparar(page, inicio) é a espera de prontidão (padrão: página de lote).
+        """
+        page = self._livres.pop()
+        url_anterior = page.url
+        if url_anterior != url:
+            try:
+                page.evaluate("url => { window.location.href = url; }", url)
+            except:
+                url_anterior = url  # Força o page.goto em aguardar_proxima
+        self._em_andamento.append((page, url, url_anterior, time.monotonic(), preparar or self.esperas.pagina_lote))
+
+    def aguardar_proxima(self, timeout=30000):
+        """
+        Espera a navegação mais antiga terminar.
+        Retorna (page, url, erro); a aba deve ser devolvida com liberar(page).
+        """
+        page, url, url_anterior, inicio, preparar = self._em_andamento.popleft()
         try:
-            valor_locator = page.locator('text="Valor mínimo de venda"').locator('xpath=following-sibling::*').first
-            if valor_locator.count() > 0:
-                valor_minimo = valor_locator.inner_text(timeout=3000).strip()
-        except:
-            pass
-        
-        # Extrair valor do leilão
-        valor_leilao = "Não informado"
+            if url_anterior == url:
+                page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+            else:
+                try:
+                    page.wait_for_url(lambda u: u != url_anterior, wait_until="domcontentloaded", timeout=timeout)
+                except:
+                    # Navegação via JS falhou ou foi descartada: tentar do jeito tradicional
+                    page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+
+            preparar(page, inicio)
+            return page, url, None
+        except Exception as e:
+            return page, url, e
+
+    def liberar(self, page):
+        self._livres.append(page)
+
+    def mapear(self, urls, funcao, preparar=None):
+        """
+        Aplica funcao(page, url) a cada URL mantendo até `tamanho` navegações simultâneas.
+        Gera (url, resultado, erro) na mesma ordem da lista de entrada.
+        """
+        pendentes = deque(urls)
+        while pendentes or self._em_andamento:
+            while pendentes and self.tem_livre():
+                self.iniciar(pendentes.popleft(), preparar)
+
+            page, url, erro = self.aguardar_proxima()
+            resultado = None
+            if erro is None:
+                try:
+                    resultado = funcao(page, url)
+                except Exception as e:
+                    erro = e
+            self.liberar(page)
+            yield url, resultado, erro
+
+    def fechar(self):
+        for page in self.paginas:
+            try:
+                page.close()
+            except:
+                pass
+
+class PoliticaRecursos:
+    """
+    Regras de bloqueio aplicadas via interceptação de rotas no contexto do navegador.
+
+    O scraper só lê textos e atributos src, então imagens, fontes, mídia e scripts de
+    terceiros (analytics, chat) não precisam ser baixados. Regras, em ordem:
+    hosts bloqueados > documento principal > tipos bloqueados > scripts de hosts não permitidos.
+    """
+    TIPOS_BLOQUEADOS = ['image', 'font', 'media']
+    HOSTS_PERMITIDOS = ['leiloespb.com.br', 'suporteleiloes.com.br']
+    HOSTS_BLOQUEADOS = [
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googleadservices.com',
+        'facebook.net', 'facebook.com', 'hotjar.com', 'clarity.ms',
+        'tawk.to', 'jivosite.com', 'zopim.com', 'zendesk.com', 'onesignal.com'
+    ]
+    # Tamanho médio estimado de um recurso bloqueado (não é possível saber sem baixar)
+    TAMANHO_ESTIMADO = {'image': 60_000, 'font': 40_000, 'media': 500_000, 'script': 50_000}
+
+    def __init__(self, tipos_bloqueados=None, hosts_permitidos=None, hosts_bloqueados=None):
+        self.tipos_bloqueados = set(self.TIPOS_BLOQUEADOS if tipos_bloqueados is None else tipos_bloqueados)
+        self.hosts_permitidos = list(self.HOSTS_PERMITIDOS if hosts_permitidos is None else hosts_permitidos)
+        self.hosts_bloqueados = list(self.HOSTS_BLOQUEADOS if hosts_bloqueados is None else hosts_bloqueados)
+        self.permitidas = 0
+        self.bloqueadas = {}  # tipo -> quantidade
+        self.bytes_recebidos = 0
+        self.bytes_economizados = 0
+
+    def _host_casa(self, host, lista):
+        return any(h in host for h in lista)
+
+    def permitir(self, url, tipo):
+        host = urlparse(url).hostname or ''
+        if self._host_casa(host, self.hosts_bloqueados):
+            return False
+        if tipo == 'document':
+            return True
+        if tipo in self.tipos_bloqueados:
+            return False
+        if tipo == 'script' and self.hosts_permitidos and not self._host_casa(host, self.hosts_permitidos):
+            return False
+        return True
+
+    def tratar_rota(self, route):
+        request = route.request
+        tipo = request.resource_type
+        if self.permitir(request.url, tipo):
+            self.permitidas += 1
+            route.continue_()
+        else:
+            self.bloqueadas[tipo] = self.bloqueadas.get(tipo, 0) + 1
+            self.bytes_economizados += self.TAMANHO_ESTIMADO.get(tipo, 10_000)
+            route.abort()
+
+    def registrar_resposta(self, response):
         try:
-            leilao_valor = page.locator('text=/Leilão Único|1º Leilão/').locator('xpath=following::*[contains(text(), "R$")]').first
-            if leilao_valor.count() > 0:
-                valor_leilao = leilao_valor.inner_text(timeout=3000).strip()
-        except:
+            self.bytes_recebidos += int(response.headers.get('content-length', 0))
+        except (TypeError, ValueError):
             pass
+
+    def aplicar(self, context):
+        context.route("**/*", self.tratar_rota)
+        context.on("response", self.registrar_resposta)
+
+    def imprimir_resumo(self):
+        total_bloqueadas = sum(self.bloqueadas.values())
+        print("\nRequisições do navegador:")
+        print(f"   {self.permitidas} permitidas ({self.bytes_recebidos / 1024 / 1024:.1f} MB com tamanho informado)")
+        if total_bloqueadas:
+            detalhes = ', '.join(f"{tipo}: {qtd}" for tipo, qtd in sorted(self.bloqueadas.items()))
+            print(f"   {total_bloqueadas} bloqueadas ({detalhes})")
+            print(f"   ~{self.bytes_economizados / 1024 / 1024:.1f} MB economizados (estimativa)")
+
+class ImpressoesLotes:
+    """
+    Reextração incremental: guarda para cada lote uma impressão digital do card da
+    listagem (título e imagem), o hash do conteúdo extraído e quando foi extraído.
+    Um lote só é reaberto se o card mudou, se a extração passou do TTL ou se ele ainda
+    não está no banco; os demais vêm do banco. completo=True reabre todos.
+    """
+    def __init__(self, armazem, ttl_horas=24, completo=False):
+        self.armazem = armazem
+        self.ttl = ttl_horas * 3600
+        self.completo = completo
+        self.cartoes = {}  # url -> impressão do card visto nesta execução
+        self._guardadas = {}  # leilao_url -> (impressões, lotes salvos), lidas uma vez por leilão
+        self._pendentes = {}  # leilao_url -> impressões a gravar quando o leilão for salvo
+        self.contagem = {'reaproveitados': 0, 'novos': 0, 'cartao_mudou': 0, 'expirados': 0,
+                         'conteudo_igual': 0, 'conteudo_mudou': 0}
+
+    @staticmethod
+    def _hash(texto):
+        return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+    def registrar_cartoes(self, cards):
+        for card in cards:
+            if 'titulo' in card:
+                self.cartoes[card['url']] = self._hash(f"{card['titulo']}\x1f{card['imagem']}")
+
+    def _do_leilao(self, leilao_url):
+        if leilao_url not in self._guardadas:
+            lotes = {lote['url']: lote for lote in self.armazem.carregar_lotes(leilao_url, derivados=False)}
+            self._guardadas[leilao_url] = (self.armazem.impressoes_do_leilao(leilao_url), lotes)
+        return self._guardadas[leilao_url]
+
+    def reaproveitar(self, leilao_url, lote_url):
+        """Retorna o lote salvo se ele pode ser reaproveitado sem abrir a página, senão None"""
+        impressoes, lotes = self._do_leilao(leilao_url)
+        impressao = impressoes.get(lote_url)
+        lote = lotes.get(lote_url)
+        cartao = self.cartoes.get(lote_url)
+        if impressao is None or lote is None or cartao is None:
+            self.contagem['novos'] += 1
+            return None
+        if self.completo:
+            return None
+        if impressao['cartao'] != cartao:
+            self.contagem['cartao_mudou'] += 1
+            return None
+        agora = time.time()
+        if agora - (impressao['extraido_em'] or 0) > self.ttl:
+            self.contagem['expirados'] += 1
+            return None
+        self._pendentes.setdefault(leilao_url, []).append(dict(impressao, url=lote_url, visto_em=agora))
+        self.contagem['reaproveitados'] += 1
+        return lote
+
+    def lote_extraido(self, leilao_url, lote):
+        conteudo = self._hash(json.dumps(lote, ensure_ascii=False, sort_keys=True))
+        anterior = self._do_leilao(leilao_url)[0].get(lote['url'])
+        if anterior:
+            self.contagem['conteudo_igual' if anterior['conteudo'] == conteudo else 'conteudo_mudou'] += 1
+        agora = time.time()
+        self._pendentes.setdefault(leilao_url, []).append({
+            'url': lote['url'], 'cartao': self.cartoes.get(lote['url']), 'conteudo': conteudo,
+            'extraido_em': agora, 'visto_em': agora
+        })
+
+    def salvar(self, leilao_url):
+        """Grava as impressões do leilão (chamar depois que o leilão foi salvo no banco)"""
+        pendentes = self._pendentes.pop(leilao_url, [])
+        self.armazem.salvar_impressoes(leilao_url, pendentes)
+        self._guardadas.pop(leilao_url, None)
+        for impressao in pendentes:
+            self.cartoes.pop(impressao['url'], None)
+
+    def imprimir_resumo(self):
+        c = self.contagem
+        if not any(c.values()):
+            return
+        print("\nReextração incremental:")
+        print(f"   {c['reaproveitados']} lotes sem mudança reaproveitados do banco")
+        print(f"   reabertos: {c['novos']} novos, {c['cartao_mudou']} com card alterado, "
+              f"{c['expirados']} com mais de {self.ttl / 3600:g}h" + (" (modo --completo)" if self.completo else ""))
+        if c['conteudo_igual'] or c['conteudo_mudou']:
+            print(f"   dos já conhecidos e reabertos, {c['conteudo_mudou']} mudaram e {c['conteudo_igual']} estavam iguais")
+
+class SessaoScraper:
+    """
+    Opções e estatísticas de uma execução do scraper, repassadas para as funções de extração.
+    """
+    def __init__(self, pool=None, motor='js', cliente_http=None, comparar_http=False, dir_fixtures=None,
+                 esperas=None):
+        self.pool = pool
+        self.pipeline = None  # PipelineScraper, se as listagens e os lotes devem se sobrepor
+        self.armazem = None  # ArmazemLeiloes onde fica o checkpoint da coleta completa
+        self.incremental = None  # ImpressoesLotes, para reabrir só os lotes que mudaram
+        self.esperas = esperas or Esperas()
+        self.motor = motor  # 'js', 'locators' ou 'comparar'
+        self.cliente_http = cliente_http
+        self.comparar_http = comparar_http
+        self.dir_fixtures = dir_fixtures
+        self.tempos_extracao = {}  # motor -> [segundos, lotes]
+        self.vazao = {}  # 'http' ou 'navegador' -> [segundos, lotes]
+        self.divergencias = 0
+        self.comparados_http = 0
+        self.divergencias_http = 0
+        self.html_http = {}  # url -> (conteudo, encoding), usado só no modo de comparação
+        self.paginacoes = []  # (modo, paginas, segundos) por leilão
+
+    def lotes_ja_extraidos(self, leilao_url):
+        """Lotes do leilão registrados no checkpoint por uma coleta interrompida: {url: lote}"""
+        return self.armazem.lotes_da_coleta(leilao_url) if self.armazem else {}
+
+    def lote_concluido(self, leilao_url, lote):
+        if self.armazem:
+            self.armazem.registrar_lote_da_coleta(leilao_url, lote)
+        if self.incremental:
+            self.incremental.lote_extraido(leilao_url, lote)
+
+    def registrar_extracao(self, motor, segundos):
+        total = self.tempos_extracao.setdefault(motor, [0.0, 0])
+        total[0] += segundos
+        total[1] += 1
+
+    def registrar_vazao(self, caminho, lotes, segundos):
+        total = self.vazao.setdefault(caminho, [0.0, 0])
+        total[0] += segundos
+        total[1] += lotes
+
+    def registrar_paginacao(self, modo, paginas, segundos):
+        self.paginacoes.append((modo, paginas, segundos))
+        if modo == 'direta':
+            # Os cliques custavam ~3,5 s de pausa por página, mais 3 páginas sem lotes no final
+            estimado = (paginas - 1 + 3) * CUSTO_PAGINA_POR_CLIQUE
+            print(f"   {paginas} página(s) visitadas em {segundos:.1f}s "
+                  f"(~{max(0, estimado - segundos):.1f}s a menos que por cliques)")
+
+    def imprimir_estatisticas(self):
+        self.esperas.imprimir_resumo()
         
-        # Extrair código do lote
-        codigo_lote = "N/A"
-        try:
-            codigo_locator = page.locator('text="Código Lote"').locator('xpath=following-sibling::*').first
-            if codigo_locator.count() > 0:
-                codigo_lote = codigo_locator.inner_text(timeout=3000).strip()
-        except:
-            pass
+        if self.incremental:
+            self.incremental.imprimir_resumo()
         
-        # Extrair número do lote
-        numero_lote = "N/A"
-        try:
-            numero_locator = page.locator('text="Número Lote"').locator('xpath=following-sibling::*').first
-            if numero_locator.count() > 0:
-                numero_lote = numero_locator.inner_text(timeout=3000).strip()
-        except:
-            pass
+        if self.pipeline:
+            self.pipeline.imprimir_resumo()
         
-        # Extrair símbolo/logo do lote - XPath específico para lote único
-        simbolo_lote = ""
-        try:
-            # XPath específico fornecido pelo usuário para o símbolo
-            simbolo_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[5]/ul[1]/li[2]/div[1]/img')
-            if simbolo_locator.count() > 0:
-                src = simbolo_locator.get_attribute('src')
-                if src:
-                    simbolo_lote = src if src.startswith('http') else BASE_URL + src
-        except:
-            pass
+        if self.paginacoes:
+            print("\nPaginação das listagens:")
+            for modo in ('direta', 'cliques'):
+                registros = [r for r in self.paginacoes if r[0] == modo]
+                if registros:
+                    paginas = sum(r[1] for r in registros)
+                    segundos = sum(r[2] for r in registros)
+                    print(f"   {modo:<8} {len(registros)} leilão(ões), {paginas} páginas em {segundos:.1f}s")
+        
+        if self.tempos_extracao:
+            print("\nTempo de extração por lote (após o carregamento da página):")
+            for motor, (segundos, lotes) in sorted(self.tempos_extracao.items()):
+                print(f"   {motor:<9} {lotes} lotes, média de {segundos / lotes * 1000:.1f} ms/lote")
+            if self.motor == 'comparar':
+                print(f"   {self.divergencias} lote(s) com resultado diferente entre os motores")
         
-        # Extrair imagem do lote (foto principal)
+        if self.cliente_http and self.vazao:
+            print("\nVazão por caminho (download + extração):")
+            for caminho, (segundos, lotes) in sorted(self.vazao.items()):
+                taxa = lotes / segundos if segundos > 0 else 0
+                print(f"   {caminho:<9} {lotes} lotes em {segundos:.1f}s ({taxa:.2f} lotes/s)")
+            if self.comparar_http:
+                print(f"   {self.divergencias_http}/{self.comparados_http} lote(s) diferentes entre HTTP e navegador")
+
+def extrair_detalhes_lote_locators(page, lote_url, imagem_lote):
+    """
+    Extrai os campos de um lote com um locator do Playwright por campo (motor "locators").
+    Cada count/inner_text/get_attribute é uma ida e volta ao Chromium.
+    Se imagem_lote for None, a foto é procurada na própria página.
+    """
+    # Extrair título do lote (H2 principal ou H1)
+    titulo = "Título não encontrado"
+    try:
+        # Tentar H2 primeiro
+        titulo_locator = page.locator('h2').first
+        if titulo_locator.count() > 0:
+            titulo = titulo_locator.inner_text(timeout=3000).strip()
+        else:
+            # Fallback para H1
+            titulo_locator = page.locator('h1').first
+            if titulo_locator.count() > 0:
+                titulo = titulo_locator.inner_text(timeout=3000).strip()
+    except:
+        # Se falhar, tentar pegar do slug da URL
+        titulo = lote_url.split('/')[-1].replace('-', ' ').title()
+    
+    # Extrair descrição
+    descricao = "Descrição não disponível"
+    try:
+        # Tentativa 1: XPath completo fornecido pelo usuário (div inteira)
+        desc_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[6]')
+        if desc_locator.count() > 0:
+            descricao = desc_locator.inner_text(timeout=3000).strip()
+        else:
+            # Tentativa 2: XPath do parágrafo específico
+            desc_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[6]/p')
+            if desc_locator.count() > 0:
+                descricao = desc_locator.inner_text(timeout=3000).strip()
+            else:
+                # Tentativa 3: Fallback genérico
+                desc_heading = page.locator('text="Descrição"').first
+                if desc_heading.count() > 0:
+                    desc_container = desc_heading.locator('xpath=..').locator('xpath=following-sibling::*').first
+                    if desc_container.count() > 0:
+                        descricao = desc_container.inner_text(timeout=3000).strip()
+    except:
+        pass
+    
+    # Extrair valor mínimo de venda
+    valor_minimo = "Sob Consulta"
+    try:
+        valor_locator = page.locator('text="Valor mínimo de venda"').locator('xpath=following-sibling::*').first
+        if valor_locator.count() > 0:
+            valor_minimo = valor_locator.inner_text(timeout=3000).strip()
+    except:
+        pass
+    
+    # Extrair valor do leilão
+    valor_leilao = "Não informado"
+    try:
+        leilao_valor = page.locator('text=/Leilão Único|1º Leilão/').locator('xpath=following::*[contains(text(), "R$")]').first
+        if leilao_valor.count() > 0:
+            valor_leilao = leilao_valor.inner_text(timeout=3000).strip()
+    except:
+        pass
+    
+    # Extrair código do lote
+    codigo_lote = "N/A"
+    try:
+        codigo_locator = page.locator('text="Código Lote"').locator('xpath=following-sibling::*').first
+        if codigo_locator.count() > 0:
+            codigo_lote = codigo_locator.inner_text(timeout=3000).strip()
+    except:
+        pass
+    
+    # Extrair número do lote
+    numero_lote = "N/A"
+    try:
+        numero_locator = page.locator('text="Número Lote"').locator('xpath=following-sibling::*').first
+        if numero_locator.count() > 0:
+            numero_lote = numero_locator.inner_text(timeout=3000).strip()
+    except:
+        pass
+    
+    # Extrair símbolo/logo do lote
+    simbolo_lote = ""
+    try:
+        # XPath específico fornecido pelo usuário para o símbolo
+        simbolo_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[5]/ul[1]/li[2]/div[1]/img')
+        if simbolo_locator.count() > 0:
+            src = simbolo_locator.get_attribute('src')
+            if src:
+                simbolo_lote = src if src.startswith('http') else BASE_URL + src
+    except:
+        pass
+    
+    # Extrair imagem do lote (foto principal) quando ela não veio do card
+    if imagem_lote is None:
         imagem_lote = ""
         try:
-            # Tentar vários seletores
-            seletores_imagem = [
-                'xpath=/html/body/section[4]/div/div[2]/div/div[1]/div/div[2]/div[1]/div/div/div[2]/div/div/a/img',
-                '.product-gallery-preview img',
-                'div.image-container img',
-                '.gallery img',
-                '.product-image img',
-                'img[alt*="lote"]',
-                'img[alt*="veículo"]',
-                'img[alt*="veiculo"]',
-                'section img',
-                'main img'
-            ]
-            
-            for seletor in seletores_imagem:
+            for seletor in SELETORES_IMAGEM_LOTE:
                 img_locator = page.locator(seletor).first
                 if img_locator.count() > 0:
                     src = img_locator.get_attribute('src')
@@ -131,105 +584,342 @@ def extrair_dados_lote_individual(page, lote_url):
                         break
         except:
             pass
-        
-        # Extrair status retirado
-        retirado = False
-        try:
-            # XPath específico fornecido para status retirado
-            status_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[2]/div/div[1]/ul[3]/li[2]/div[2]/strong')
-            if status_locator.count() > 0:
-                texto_status = status_locator.inner_text(timeout=3000).strip().lower()
-                if "retirado" in texto_status:
-                    retirado = True
-        except:
-            pass
-        
-        return {
-            "codigo_lote": codigo_lote,
-            "numero_lote": numero_lote,
-            "titulo": titulo,
-            "descricao": descricao,
-            "valor_leilao": valor_leilao,
-            "valor_minimo": valor_minimo,
-            "simbolo_lote": simbolo_lote,
-            "imagem_lote": imagem_lote,
-            "retirado": retirado,
-            "url": lote_url
+    
+    # Extrair status retirado
+    retirado = False
+    try:
+        status_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[2]/div/div[1]/ul[3]/li[2]/div[2]/strong')
+        if status_locator.count() > 0:
+            texto_status = status_locator.inner_text(timeout=3000).strip().lower()
+            if "retirado" in texto_status:
+                retirado = True
+    except:
+        pass
+    
+    lote_info = {
+        "codigo_lote": codigo_lote,
+        "numero_lote": numero_lote,
+        "titulo": titulo,
+        "descricao": descricao,
+        "valor_leilao": valor_leilao,
+        "valor_minimo": valor_minimo,
+        "simbolo_lote": simbolo_lote,
+        "imagem_lote": imagem_lote,
+        "retirado": retirado,
+        "url": lote_url
+    }
+    
+    return lote_info
+
+# Extrator executado dentro da página: devolve todos os campos do lote em uma única
+# chamada page.evaluate, seguindo as mesmas cadeias de fallback dos locators.
+EXTRATOR_LOTE_JS = r"""
+(opcoes) => {
+    const IGNORAR = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    const normalizar = s => (s || '').replace(/\s+/g, ' ').trim();
+    const texto = el => el ? (el.innerText || el.textContent || '').trim() : null;
+    const porXPath = (xpath, contexto) => {
+        try {
+            return document.evaluate(xpath, contexto || document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } catch (e) {
+            return null;
         }
-    except Exception as e:
-        print(f"   Erro ao extrair lote individual: {str(e)[:50]}")
-        return None
+    };
+    const porSeletor = seletor => seletor.startsWith('xpath=')
+        ? porXPath(seletor.slice(6))
+        : document.querySelector(seletor);
+
+    // Equivalente ao seletor text= do Playwright: elemento mais interno cujo texto corresponde
+    const porTexto = teste => {
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+        for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+            const el = n.parentElement;
+            if (el && !IGNORAR.has(el.tagName) && teste(normalizar(n.nodeValue)) && teste(normalizar(el.textContent))) {
+                return el;
+            }
+        }
+        // Texto quebrado em vários nós (ex: "1º <b>Leilão</b>")
+        for (const el of document.body.querySelectorAll('*')) {
+            if (IGNORAR.has(el.tagName) || !teste(normalizar(el.textContent))) continue;
+            if (![...el.children].some(f => teste(normalizar(f.textContent)))) return el;
+        }
+        return null;
+    };
+    const exato = rotulo => t => t === rotulo;
+    const irmaoDoRotulo = rotulo => {
+        const el = porTexto(exato(rotulo));
+        return el ? el.nextElementSibling : null;
+    };
+
+    const dados = {};
+
+    // Título (H2 principal ou H1)
+    dados.titulo = texto(document.querySelector('h2')) ?? texto(document.querySelector('h1'));
+
+    // Descrição: div inteira, parágrafo específico, ou bloco após o rótulo "Descrição"
+    let desc = porXPath('/html/body/section[4]/div/div[2]/div/div[6]')
+        || porXPath('/html/body/section[4]/div/div[2]/div/div[6]/p');
+    if (!desc) {
+        const rotulo = porTexto(exato('Descrição'));
+        desc = rotulo && rotulo.parentElement ? rotulo.parentElement.nextElementSibling : null;
+    }
+    dados.descricao = texto(desc);
+
+    dados.valor_minimo = texto(irmaoDoRotulo('Valor mínimo de venda'));
+    dados.codigo_lote = texto(irmaoDoRotulo('Código Lote'));
+    dados.numero_lote = texto(irmaoDoRotulo('Número Lote'));
 
-def extrair_lotes_de_leilao(page):
+    const rotuloLeilao = porTexto(t => /Leilão Único|1º Leilão/.test(t));
+    dados.valor_leilao = rotuloLeilao
+        ? texto(porXPath('following::*[contains(text(), "R$")]', rotuloLeilao))
+        : null;
+
+    const simbolo = porXPath('/html/body/section[4]/div/div[2]/div/div[5]/ul[1]/li[2]/div[1]/img');
+    dados.simbolo_src = simbolo ? simbolo.getAttribute('src') : null;
+
+    const status = porXPath('/html/body/section[4]/div/div[2]/div/div[2]/div/div[1]/ul[3]/li[2]/div[2]/strong');
+    dados.status = texto(status);
+
+    // Foto principal (apenas quando não veio do card da listagem)
+    dados.imagem_src = null;
+    for (const seletor of opcoes.seletores_imagem) {
+        const img = porSeletor(seletor);
+        if (!img) continue;
+        const src = img.getAttribute('src');
+        if (src && !src.toLowerCase().includes('placeholder')) {
+            dados.imagem_src = src;
+            break;
+        }
+    }
+    return dados;
+}
+"""
+
+# Seletores testados (em ordem) para a foto principal de lotes sem card de listagem
+SELETORES_IMAGEM_LOTE = [
+    'xpath=/html/body/section[4]/div/div[2]/div/div[1]/div/div[2]/div[1]/div/div/div[2]/div/div/a/img',
+    '.product-gallery-preview img',
+    'div.image-container img',
+    '.gallery img',
+    '.product-image img',
+    'img[alt*="lote"]',
+    'img[alt*="veículo"]',
+    'img[alt*="veiculo"]',
+    'section img',
+    'main img'
+]
+
+def extrair_detalhes_lote_js(page, lote_url, imagem_lote=None):
     """
-    Extrai informações de todos os lotes de um leilão específico.
+    Extrai os campos de um lote com uma única chamada page.evaluate (motor "js").
+    Se imagem_lote for None, a foto é procurada na própria página.
     """
-    lotes_data = []
+    dados = page.evaluate(EXTRATOR_LOTE_JS, {
+        'seletores_imagem': SELETORES_IMAGEM_LOTE if imagem_lote is None else []
+    })
     
-    # Verificar se foi redirecionado direto para página de lote (leilão com 1 único lote)
-    url_atual = page.url
-    comitente_logo_encontrado = ""  # Variável para armazenar a logo do comitente
+    return montar_lote(dados, lote_url, imagem_lote)
+
+def montar_lote(dados, lote_url, imagem_lote=None):
+    """
+    Monta o dicionário do lote a partir dos campos brutos lidos da página
+    (mesmo formato para o extrator JavaScript e para o caminho HTTP).
+    """
+    simbolo_lote = ""
+    src = dados.get('simbolo_src')
+    if src:
+        simbolo_lote = src if src.startswith('http') else BASE_URL + src
     
-    if '/lote/' in url_atual and url_atual.count('/') >= 7:
-        print("   Leilão com lote único detectado (redirecionamento direto)")
-        # Extrair dados deste único lote
-        lote_info = extrair_dados_lote_individual(page, url_atual)
-        if lote_info:
-            lotes_data.append(lote_info)
-            # A logo do comitente está no mesmo lugar que o símbolo do lote
-            comitente_logo_encontrado = lote_info.get('simbolo_lote', '')
-            print(f"   ✓ 1 lote coletado")
-        return lotes_data, comitente_logo_encontrado
+    if imagem_lote is None:
+        imagem_lote = ""
+        src = dados.get('imagem_src')
+        if src:
+            imagem_lote = src if src.startswith('http') else BASE_URL + src
     
-    # Aguardar um seletor específico ao invés de networkidle
+    def campo(nome, padrao):
+        # Mesma regra dos locators: o padrão só vale quando o elemento não existe
+        valor = dados.get(nome)
+        return padrao if valor is None else valor
+    
+    return {
+        "codigo_lote": campo('codigo_lote', "N/A"),
+        "numero_lote": campo('numero_lote', "N/A"),
+        "titulo": campo('titulo', "Título não encontrado"),
+        "descricao": campo('descricao', "Descrição não disponível"),
+        "valor_leilao": campo('valor_leilao', "Não informado"),
+        "valor_minimo": campo('valor_minimo', "Sob Consulta"),
+        "simbolo_lote": simbolo_lote,
+        "imagem_lote": imagem_lote,
+        "retirado": "retirado" in (dados.get('status') or '').lower(),
+        "url": lote_url
+    }
+
+def _extrair_com_motor(sessao, extrair_js, extrair_locators):
+    """Executa o motor configurado na sessão e registra o tempo gasto na extração"""
+    motor = sessao.motor if sessao else 'js'
+    
+    if motor == 'comparar':
+        # Roda os dois motores na mesma página e aponta divergências
+        inicio = time.perf_counter()
+        referencia = extrair_locators()
+        sessao.registrar_extracao('locators', time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        try:
+            resultado_js = extrair_js()
+        except Exception:
+            resultado_js = None
+        sessao.registrar_extracao('js', time.perf_counter() - inicio)
+        if resultado_js != referencia:
+            campos = [k for k in (referencia or resultado_js or {})
+                      if (referencia or {}).get(k) != (resultado_js or {}).get(k)]
+            sessao.divergencias += 1
+            print(f" [divergência: {', '.join(campos)}]", end='')
+        return referencia
+    
+    inicio = time.perf_counter()
+    resultado = extrair_locators() if motor == 'locators' else extrair_js()
+    if sessao:
+        sessao.registrar_extracao(motor, time.perf_counter() - inicio)
+    return resultado
+
+def extrair_detalhes_lote(page, lote_url, imagem_lote, sessao=None):
+    """
+    Extrai os campos de um lote a partir da página dele já carregada.
+    A imagem vem do card da listagem (mais confiável que a da página do lote).
+    """
+    return _extrair_com_motor(
+        sessao,
+        lambda: extrair_detalhes_lote_js(page, lote_url, imagem_lote),
+        lambda: extrair_detalhes_lote_locators(page, lote_url, imagem_lote)
+    )
+
+def extrair_dados_lote_individual(page, lote_url, sessao=None):
+    """
+    Extrai dados de um lote individual quando já estamos na página dele.
+    Usado para leilões com apenas 1 lote que redirecionam diretamente.
+    """
+    esperas = sessao.esperas if sessao else Esperas()
+    esperas.pagina_lote(page, espera_fixa_ms=500, fase='lote_unico')
+    
+    def extrair_js():
+        try:
+            return extrair_detalhes_lote_js(page, lote_url)
+        except Exception as e:
+            print(f"   Erro ao extrair lote individual: {str(e)[:50]}")
+            return None
+    
+    return _extrair_com_motor(
+        sessao,
+        extrair_js,
+        lambda: extrair_detalhes_lote_locators(page, lote_url, None)
+    )
+
+# Coleta todos os cards de uma listagem de lotes em uma única chamada page.evaluate
+CARDS_LOTES_JS = """
+() => Array.from(document.querySelectorAll('article')).map(card => {
+    const link = card.querySelector('a[href*="/lote/"]');
+    if (!link) return null;
+    const img = card.querySelector('img');
+    const titulo = card.querySelector('h3, h2, h4');
+    return {
+        href: link.getAttribute('href'),
+        imagem: img ? (img.getAttribute('src') || '') : '',
+        titulo: titulo ? titulo.innerText.trim() : ''
+    };
+}).filter(Boolean)
+"""
+
+# Idem para os cards de leilão da página principal
+CARDS_LEILOES_JS = """
+() => Array.from(document.querySelectorAll('a[href*="/eventos/leilao/"]')).map(link => {
+    const titulo = link.querySelector('h3');
+    if (!titulo) return null;
+    return {href: link.getAttribute('href'), titulo: titulo.innerText.trim()};
+}).filter(Boolean)
+"""
+
+def coletar_cards_lotes(page):
+    """
+    Retorna os cards de lote da página atual: [{'url', 'imagem', 'titulo'}], sem duplicatas.
+    """
     try:
-        page.wait_for_selector('article', timeout=10000)
-    except:
-        print("   ⚠ Nenhum lote encontrado nesta página")
-        return lotes_data, comitente_logo_encontrado
+        cards = page.evaluate(CARDS_LOTES_JS)
+    except Exception as e:
+        print(f"      Erro ao coletar cards: {str(e)[:50]}")
+        return []
     
-    # Coletar URLs e imagens de todas as páginas
-    lotes_info = {}  # {url: imagem}
+    vistos = set()
+    resultado = []
+    for card in cards:
+        href = card.get('href')
+        if not href or any(x in href for x in ['facebook', 'twitter', 'whatsapp', 'mailto', 'login']):
+            continue
+        url_completa = href if href.startswith('http') else BASE_URL + href
+        # Garantir que é uma URL de lote individual
+        if '/lote/' not in url_completa or url_completa.count('/') < 6 or url_completa in vistos:
+            continue
+        vistos.add(url_completa)
+        src = card.get('imagem') or ""
+        resultado.append({
+            'url': url_completa,
+            'imagem': (src if src.startswith('http') else BASE_URL + src) if src else "",
+            'titulo': card.get('titulo') or ""
+        })
+    return resultado
+
+def coletar_cards_leiloes(page):
+    """
+    Retorna os leilões listados na página principal: [{'url', 'titulo'}], sem duplicatas.
+    """
+    try:
+        cards = page.evaluate(CARDS_LEILOES_JS)
+    except Exception as e:
+        print(f"✗ Erro ao coletar cards de leilão: {str(e)[:50]}")
+        return []
+    
+    print(f"✓ Encontrados {len(cards)} cards de leilões")
+    
+    vistos = set()
+    leiloes = []
+    for card in cards:
+        href = card.get('href')
+        if not href:
+            continue
+        url_completa = href if href.startswith('http') else BASE_URL + href
+        if url_completa in vistos:
+            continue
+        vistos.add(url_completa)
+        leiloes.append({
+            'url': url_completa,
+            'titulo': card.get('titulo') or f"Leilão {url_completa.split('/')[-2]}"
+        })
+    return leiloes
+
+def _adicionar_cards(lotes_info, cards, sessao=None):
+    """Adiciona os cards ainda não vistos a lotes_info e retorna quantos eram novos"""
+    if sessao and sessao.incremental:
+        sessao.incremental.registrar_cartoes(cards)
+    novos = 0
+    for card in cards:
+        if card['url'] not in lotes_info:
+            lotes_info[card['url']] = card['imagem']
+            novos += 1
+    return novos
+
+def _coletar_lotes_por_cliques(page, lotes_info, sessao):
+    """
+    Percorre a listagem clicando no botão "próxima" até não haver mais páginas
+    (ou até 3 páginas seguidas sem lotes novos). Retorna o número de páginas visitadas.
+    """
     pagina_atual = 1
     paginas_vazias_consecutivas = 0  # Contador para detectar loop infinito
     
     while True:
         print(f"   Coletando lotes da página {pagina_atual}...")
         
-        # Coletar lotes dos cards article da página atual
-        lotes_cards = page.locator('article')
-        count = lotes_cards.count()
-        
-        lotes_encontrados_nesta_pagina = 0
-        for i in range(count):
-            try:
-                card = lotes_cards.nth(i)
-                
-                # Procurar link do lote dentro do article
-                link = card.locator('a[href*="/lote/"]').first
-                if link.count() > 0:
-                    href = link.get_attribute('href')
-                    if href and not any(x in href for x in ['facebook', 'twitter', 'whatsapp', 'mailto', 'login']):
-                        url_completa = href if href.startswith('http') else BASE_URL + href
-                        # Garantir que é uma URL de lote individual
-                        if '/lote/' in url_completa and url_completa.count('/') >= 6:
-                            # Extrair imagem do card
-                            imagem = ""
-                            try:
-                                # Tentar pegar a imagem dentro do article
-                                img = card.locator('img').first
-                                if img.count() > 0:
-                                    src = img.get_attribute('src') or ""
-                                    if src:
-                                        imagem = src if src.startswith('http') else BASE_URL + src
-                            except:
-                                pass
-                            
-                            if url_completa not in lotes_info:
-                                lotes_info[url_completa] = imagem
-                                lotes_encontrados_nesta_pagina += 1
-            except:
-                continue
+        # Coletar lotes dos cards article da página atual (uma única chamada ao navegador)
+        lotes_encontrados_nesta_pagina = _adicionar_cards(lotes_info, coletar_cards_lotes(page), sessao)
         
         print(f"      {lotes_encontrados_nesta_pagina} novos lotes encontrados")
         
@@ -250,7 +940,7 @@ def extrair_lotes_de_leilao(page):
         try:
             # Scroll até o final da página
             page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            page.wait_for_timeout(500)
+            sessao.esperas.antes_de_paginar(page)
             
             # Estratégias para encontrar o botão "Próxima"
             botao_next = None
@@ -288,6 +978,7 @@ def extrair_lotes_de_leilao(page):
                 if botao_next.is_visible():
                     print(f"   Navegando para página {pagina_atual + 1}...")
                     url_antes = page.url
+                    assinatura_antes = sessao.esperas.assinatura_listagem(page)
                     
                     # Forçar clique via JS se o elemento estiver coberto ou difícil de clicar
                     try:
@@ -295,16 +986,15 @@ def extrair_lotes_de_leilao(page):
                     except:
                         page.evaluate('(element) => element.click()', botao_next.element_handle())
                     
-                    page.wait_for_timeout(2000)
+                    # Aguardar troca de URL ou dos cards (paginação via AJAX)
+                    sessao.esperas.apos_paginar(page, url_antes, assinatura_antes)
                     
                     # Verificar mudança
                     if page.url != url_antes:
                         pagina_atual += 1
                         conseguiu_paginar = True
                     else:
-                        # Se a URL não mudou, verificar se o conteúdo mudou (AJAX)
-                        # Esperar um pouco mais e verificar se novos artigos apareceram
-                        page.wait_for_timeout(1000)
+                        # Se a URL não mudou, o conteúdo pode ter mudado via AJAX
                         pagina_atual += 1 # Assumir que mudou se não houve erro, para tentar continuar
                         conseguiu_paginar = True
             
@@ -315,155 +1005,711 @@ def extrair_lotes_de_leilao(page):
             print(f"   Fim da paginação na página {pagina_atual}")
             break
     
-    print(f"   Total de {len(lotes_info)} lotes únicos coletados de {pagina_atual} página(s)")
+    return pagina_atual
+
+# Links do widget de paginação (href já resolvido pelo navegador)
+LINKS_PAGINACAO_JS = """
+() => Array.from(document.querySelectorAll('.pagination a[href], .row-actions a[href], li.arrow-right a[href]'))
+    .map(a => a.href)
+"""
+
+def detectar_paginacao(page):
+    """
+    Procura nos links do widget de paginação um parâmetro numérico de página na mesma URL
+    (ex: ?page=3). Retorna (parametro, maior_pagina) ou None se não houver padrão.
+    """
+    try:
+        links = page.evaluate(LINKS_PAGINACAO_JS)
+    except:
+        return None
     
-    # Iterar sobre cada lote
-    for idx, (lote_url, imagem_card) in enumerate(sorted(lotes_info.items()), 1):
+    atual = urlparse(page.url)
+    candidatos = {}  # parâmetro -> números de página vistos
+    for link in links:
+        destino = urlparse(link)
+        if destino.netloc != atual.netloc or destino.path != atual.path:
+            continue
+        for nome, valores in parse_qs(destino.query).items():
+            if valores and valores[0].isdigit():
+                candidatos.setdefault(nome, set()).add(int(valores[0]))
+    
+    if not candidatos:
+        return None
+    parametro = max(candidatos, key=lambda nome: len(candidatos[nome]))
+    maior = max(candidatos[parametro])
+    return (parametro, maior) if maior >= 2 else None
+
+def _url_da_pagina(url_base, parametro, numero):
+    partes = urlparse(url_base)
+    query = parse_qs(partes.query)
+    query[parametro] = [str(numero)]
+    return urlunparse(partes._replace(query=urlencode(query, doseq=True)))
+
+def _visitar_listagens(page, urls, sessao):
+    """
+    Abre páginas de listagem (em paralelo se houver pool) e gera (url, cards, paginacao, erro)
+    na ordem das URLs; paginacao é o resultado de detectar_paginacao naquela página.
+    """
+    def ler(pg, url):
+        return coletar_cards_lotes(pg), detectar_paginacao(pg)
+    
+    if sessao.pool:
+        resultados = sessao.pool.mapear(urls, ler, preparar=sessao.esperas.pagina_listagem)
+        for url, resultado, erro in resultados:
+            cards, paginacao = resultado if resultado else ([], None)
+            yield url, cards, paginacao, erro
+        return
+    
+    for url in urls:
         try:
-            print(f"      [{idx}/{len(lotes_info)}] Processando: {lote_url.split('/')[-1][:40]}...", end='')
-            
-            # Navegar para a página do lote - usar domcontentloaded é mais rápido
-            page.goto(lote_url, wait_until="domcontentloaded", timeout=30000)
-            
-            # Esperar um tempo menor
-            page.wait_for_timeout(800)
-            
-            # Extrair título do lote (H2 principal ou H1)
-            titulo = "Título não encontrado"
-            try:
-                # Tentar H2 primeiro
-                titulo_locator = page.locator('h2').first
-                if titulo_locator.count() > 0:
-                    titulo = titulo_locator.inner_text(timeout=3000).strip()
-                else:
-                    # Fallback para H1
-                    titulo_locator = page.locator('h1').first
-                    if titulo_locator.count() > 0:
-                        titulo = titulo_locator.inner_text(timeout=3000).strip()
-            except:
-                # Se falhar, tentar pegar do slug da URL
-                titulo = lote_url.split('/')[-1].replace('-', ' ').title()
-            
-            # Extrair descrição
-            descricao = "Descrição não disponível"
-            try:
-                # Tentativa 1: XPath completo fornecido pelo usuário (div inteira)
-                desc_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[6]')
-                if desc_locator.count() > 0:
-                    descricao = desc_locator.inner_text(timeout=3000).strip()
-                else:
-                    # Tentativa 2: XPath do parágrafo específico
-                    desc_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[6]/p')
-                    if desc_locator.count() > 0:
-                        descricao = desc_locator.inner_text(timeout=3000).strip()
-                    else:
-                        # Tentativa 3: Fallback genérico
-                        desc_heading = page.locator('text="Descrição"').first
-                        if desc_heading.count() > 0:
-                            desc_container = desc_heading.locator('xpath=..').locator('xpath=following-sibling::*').first
-                            if desc_container.count() > 0:
-                                descricao = desc_container.inner_text(timeout=3000).strip()
-            except:
-                pass
-            
-            # Extrair valor mínimo de venda
-            valor_minimo = "Sob Consulta"
-            try:
-                valor_locator = page.locator('text="Valor mínimo de venda"').locator('xpath=following-sibling::*').first
-                if valor_locator.count() > 0:
-                    valor_minimo = valor_locator.inner_text(timeout=3000).strip()
-            except:
-                pass
-            
-            # Extrair valor do leilão
-            valor_leilao = "Não informado"
-            try:
-                leilao_valor = page.locator('text=/Leilão Único|1º Leilão/').locator('xpath=following::*[contains(text(), "R$")]').first
-                if leilao_valor.count() > 0:
-                    valor_leilao = leilao_valor.inner_text(timeout=3000).strip()
-            except:
-                pass
-            
-            # Extrair código do lote
-            codigo_lote = "N/A"
-            try:
-                codigo_locator = page.locator('text="Código Lote"').locator('xpath=following-sibling::*').first
-                if codigo_locator.count() > 0:
-                    codigo_lote = codigo_locator.inner_text(timeout=3000).strip()
-            except:
-                pass
-            
-            # Extrair número do lote
-            numero_lote = "N/A"
-            try:
-                numero_locator = page.locator('text="Número Lote"').locator('xpath=following-sibling::*').first
-                if numero_locator.count() > 0:
-                    numero_lote = numero_locator.inner_text(timeout=3000).strip()
-            except:
-                pass
+            page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            sessao.esperas.pagina_listagem(page)
+            cards, paginacao = ler(page, url)
+            yield url, cards, paginacao, None
+        except Exception as e:
+            yield url, [], None, e
 
+def _coletar_lotes_paginacao_direta(page, lotes_info, sessao):
+    """
+    Abre todas as páginas da listagem diretamente pela URL (?page=N), sem clicar em
+    "próxima". Retorna o número de páginas visitadas, ou None se o padrão de URL não
+    foi detectado ou não funcionou (nesse caso lotes_info não é alterado).
+    """
+    paginacao = detectar_paginacao(page)
+    if not paginacao:
+        return None
+    
+    inicio = time.monotonic()
+    parametro, total = paginacao
+    url_inicial = page.url
+    encontrados = {}
+    
+    print(f"   Paginação detectada: {total} página(s) via parâmetro '{parametro}'")
+    print(f"   Coletando lotes da página 1...")
+    novos = _adicionar_cards(encontrados, coletar_cards_lotes(page), sessao)
+    print(f"      {novos} novos lotes encontrados")
+    
+    visitadas = 1
+    novos_apos_primeira = 0
+    proxima = 2
+    while proxima <= total:
+        numeros = list(range(proxima, total + 1))
+        proxima = total + 1
+        urls = [_url_da_pagina(url_inicial, parametro, n) for n in numeros]
+        for numero, (url, cards, paginacao_pagina, erro) in zip(numeros, _visitar_listagens(page, urls, sessao)):
+            visitadas += 1
+            if erro:
+                print(f"   ✗ Página {numero}: {str(erro)[:50]}")
+                continue
+            novos = _adicionar_cards(encontrados, cards, sessao)
+            novos_apos_primeira += novos
+            print(f"   Página {numero}: {novos} novos lotes encontrados")
+            # O widget pode mostrar só uma janela de páginas: ampliar o total se aparecerem mais
+            if paginacao_pagina and paginacao_pagina[0] == parametro:
+                total = max(total, paginacao_pagina[1])
+    
+    if novos_apos_primeira == 0:
+        # O site ignorou o parâmetro: voltar para a primeira página e usar os cliques
+        print("   ⚠ Páginas diretas não trouxeram lotes novos; usando navegação por cliques")
+        if page.url != url_inicial:
+            page.goto(url_inicial, wait_until="domcontentloaded", timeout=30000)
+            sessao.esperas.pagina_leilao(page)
+        return None
+    
+    lotes_info.update(encontrados)
+    duracao = time.monotonic() - inicio
+    sessao.registrar_paginacao('direta', visitadas, duracao)
+    return visitadas
 
-            # Usar imagem já extraída do card da listagem
-            imagem_lote = imagem_card
-            
-            # Extrair símbolo/logo do lote
-            simbolo_lote = ""
-            try:
-                # XPath específico fornecido pelo usuário para o símbolo
-                simbolo_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[5]/ul[1]/li[2]/div[1]/img')
-                if simbolo_locator.count() > 0:
-                    src = simbolo_locator.get_attribute('src')
-                    if src:
-                        simbolo_lote = src if src.startswith('http') else BASE_URL + src
-            except:
-                pass
-            
-            # Extrair status retirado
-            retirado = False
+def iterar_lotes_de_leilao(page, sessao=None, leilao_url=None):
+    """
+    Gera cada lote do leilão aberto em page assim que ele é extraído.
+    leilao_url identifica o leilão no checkpoint (padrão: a URL atual da página).
+    """
+    sessao = sessao or SessaoScraper()
+    leilao_url = leilao_url or page.url
+    
+    # Verificar se foi redirecionado direto para página de lote (leilão com 1 único lote)
+    url_atual = page.url
+    if '/lote/' in url_atual and url_atual.count('/') >= 7:
+        print("   Leilão com lote único detectado (redirecionamento direto)")
+        # Extrair dados deste único lote
+        lote_info = extrair_dados_lote_individual(page, url_atual, sessao)
+        if lote_info:
+            print(f"   ✓ 1 lote coletado")
+            yield lote_info
+        return
+    
+    # Aguardar um seletor específico ao invés de networkidle
+    try:
+        page.wait_for_selector('article', timeout=10000)
+    except:
+        print("   ⚠ Nenhum lote encontrado nesta página")
+        return
+    
+    # Coletar URLs e imagens de todas as páginas
+    lotes_info = {}  # {url: imagem}
+    inicio_paginacao = time.monotonic()
+    pagina_atual = _coletar_lotes_paginacao_direta(page, lotes_info, sessao)
+    if pagina_atual is None:
+        # Padrão de URL não detectado: seguir clicando em "próxima"
+        pagina_atual = _coletar_lotes_por_cliques(page, lotes_info, sessao)
+        sessao.registrar_paginacao('cliques', pagina_atual, time.monotonic() - inicio_paginacao)
+    
+    print(f"   Total de {len(lotes_info)} lotes únicos coletados de {pagina_atual} página(s)")
+    
+    # Iterar sobre cada lote
+    lotes_ordenados = sorted(lotes_info.items())
+    inicio_lotes = time.monotonic()
+    gerados = 0
+    
+    # Lotes já extraídos por uma coleta interrompida não são visitados de novo
+    prontos = sessao.lotes_ja_extraidos(leilao_url)
+    a_extrair = [(url, imagem) for url, imagem in lotes_ordenados if url not in prontos]
+    if prontos:
+        print(f"   {len(lotes_ordenados) - len(a_extrair)} lotes já extraídos na coleta anterior")
+        for lote_url, _ in lotes_ordenados:
+            if lote_url in prontos:
+                gerados += 1
+                yield prontos[lote_url]
+    
+    # Lotes cujo card não mudou e que foram extraídos há pouco vêm direto do banco
+    if sessao.incremental and a_extrair:
+        pendentes = []
+        for lote_url, imagem_card in a_extrair:
+            lote_info = sessao.incremental.reaproveitar(leilao_url, lote_url)
+            if lote_info is None:
+                pendentes.append((lote_url, imagem_card))
+                continue
+            gerados += 1
+            yield lote_info
+        if len(pendentes) < len(a_extrair):
+            print(f"   {len(a_extrair) - len(pendentes)} lotes sem mudança reaproveitados do banco, "
+                  f"{len(pendentes)} para extrair")
+        a_extrair = pendentes
+    
+    cliente_http = sessao.cliente_http
+    if cliente_http and sessao.comparar_http:
+        # Comparação: precisa de todos os lotes pelos dois caminhos antes de entregar
+        extraidos, _ = _extrair_lotes_via_http(cliente_http, a_extrair, sessao)
+        _comparar_com_navegador(page, a_extrair, extraidos, sessao)
+        a_extrair = []
+        for lote_url, lote_info in extraidos.items():
+            sessao.lote_concluido(leilao_url, lote_info)
+            gerados += 1
+            yield lote_info
+    elif cliente_http:
+        # Caminho rápido: só as páginas que o HTTP não conseguiu ler passam pelo navegador
+        pendentes = []
+        for lote_url, imagem_card, lote_info in _iterar_lotes_via_http(cliente_http, a_extrair, sessao):
+            if lote_info is None:
+                pendentes.append((lote_url, imagem_card))
+                continue
+            sessao.lote_concluido(leilao_url, lote_info)
+            gerados += 1
+            yield lote_info
+        a_extrair = pendentes
+    
+    for lote_url, lote_info in _iterar_lotes_via_navegador(page, a_extrair, sessao):
+        sessao.lote_concluido(leilao_url, lote_info)
+        gerados += 1
+        yield lote_info
+    
+    duracao = time.monotonic() - inicio_lotes
+    if gerados and duracao > 0:
+        print(f"   {gerados} lotes em {duracao:.1f}s ({gerados / duracao:.2f} lotes/s)")
+
+def extrair_lotes_de_leilao(page, sessao=None, leilao_url=None):
+    """
+    Extrai informações de todos os lotes de um leilão específico.
+    Retorna (lotes em ordem de URL, logo do comitente).
+    """
+    lotes_data = sorted(iterar_lotes_de_leilao(page, sessao, leilao_url), key=lambda lote: lote['url'])
+    # A logo do comitente está no mesmo lugar que o símbolo do lote
+    comitente_logo = next((lote['simbolo_lote'] for lote in lotes_data if lote['simbolo_lote']), "")
+    return lotes_data, comitente_logo
+
+def _iterar_lotes_via_navegador(page, lotes, sessao=None):
+    """
+    Visita as páginas dos lotes no Chromium (uma aba ou o pool de abas da sessão).
+    Recebe [(url, imagem_do_card)] e gera (url, lote_info) para cada lote extraído.
+    """
+    sessao = sessao or SessaoScraper()
+    if not lotes:
+        return
+    extraidos = 0
+    inicio = time.monotonic()
+    
+    pool = sessao.pool
+    if pool:
+        # Modo concorrente: várias abas baixam os lotes ao mesmo tempo
+        print(f"   Processando lotes com {pool.tamanho} abas simultâneas...")
+        imagens = dict(lotes)
+        resultados = pool.mapear(
+            [url for url, _ in lotes],
+            lambda pg, url: extrair_detalhes_lote(pg, url, imagens[url], sessao)
+        )
+        for idx, (lote_url, lote_info, erro) in enumerate(resultados, 1):
+            nome = lote_url.split('/')[-1][:40]
+            if erro:
+                print(f"      [{idx}/{len(lotes)}] {nome}... ✗ ({str(erro)[:50]})")
+                continue
+            print(f"      [{idx}/{len(lotes)}] {nome}... ✓")
+            extraidos += 1
+            yield lote_url, lote_info
+    else:
+        for idx, (lote_url, imagem_card) in enumerate(lotes, 1):
             try:
-                status_locator = page.locator('xpath=/html/body/section[4]/div/div[2]/div/div[2]/div/div[1]/ul[3]/li[2]/div[2]/strong')
-                if status_locator.count() > 0:
-                    texto_status = status_locator.inner_text(timeout=3000).strip().lower()
-                    if "retirado" in texto_status:
-                        retirado = True
-            except:
-                pass
-            
-            lote_info = {
-                "codigo_lote": codigo_lote,
-                "numero_lote": numero_lote,
-                "titulo": titulo,
-                "descricao": descricao,
-                "valor_leilao": valor_leilao,
-                "valor_minimo": valor_minimo,
-                "simbolo_lote": simbolo_lote,
-                "imagem_lote": imagem_lote,
-                "retirado": retirado,
-                "url": lote_url
-            }
-            
-            lotes_data.append(lote_info)
-            
-            # Capturar logo do comitente do primeiro lote processado
-            if not comitente_logo_encontrado and simbolo_lote:
-                comitente_logo_encontrado = simbolo_lote
-            
-            print(f" ✓")
-            
-            # Pausa mínima entre requisições
-            time.sleep(0.1)
-            
-        except Exception as e:
-            print(f" ✗ ({str(e)[:50]})")
+                print(f"      [{idx}/{len(lotes)}] Processando: {lote_url.split('/')[-1][:40]}...", end='')
+                
+                # Navegar para a página do lote - usar domcontentloaded é mais rápido
+                page.goto(lote_url, wait_until="domcontentloaded", timeout=30000)
+                sessao.esperas.pagina_lote(page)
+                
+                lote_info = extrair_detalhes_lote(page, lote_url, imagem_card, sessao)
+                
+                print(f" ✓")
+                
+                # Pausa mínima entre requisições (só no modo de pausas fixas)
+                sessao.esperas.pausa_entre_lotes()
+                
+            except Exception as e:
+                print(f" ✗ ({str(e)[:50]})")
+                continue
+            extraidos += 1
+            yield lote_url, lote_info
+    
+    sessao.registrar_vazao('navegador', extraidos, time.monotonic() - inicio)
+
+def _extrair_lotes_via_navegador(page, lotes, sessao=None):
+    """Como _iterar_lotes_via_navegador, mas retorna {url: lote_info} com todos os lotes"""
+    return dict(_iterar_lotes_via_navegador(page, lotes, sessao))
+
+def _iterar_lotes_via_http(cliente_http, lotes, sessao):
+    """
+    Baixa as páginas dos lotes sem navegador, na ordem recebida.
+    Gera (url, imagem, lote_info); lote_info é None se a página falhou na validação.
+    """
+    if not lotes:
+        return
+    inicio = time.monotonic()
+    print(f"   Baixando {len(lotes)} lotes via HTTP ({cliente_http.conexoes} conexões)...")
+    resultados = cliente_http.iterar_varios([url for url, _ in lotes])
+    
+    extraidos = 0
+    for (lote_url, imagem_card), (dados, conteudo, encoding) in zip(lotes, resultados):
+        if dados is None:
+            yield lote_url, imagem_card, None
+            continue
+        extraidos += 1
+        if sessao.comparar_http:
+            sessao.html_http[lote_url] = (conteudo, encoding)
+        yield lote_url, imagem_card, montar_lote(dados, lote_url, imagem_card)
+    
+    sessao.registrar_vazao('http', extraidos, time.monotonic() - inicio)
+    print(f"   ✓ {extraidos} lotes via HTTP, {len(lotes) - extraidos} para o navegador")
+
+def _extrair_lotes_via_http(cliente_http, lotes, sessao):
+    """Retorna ({url: lote_info}, [(url, imagem)] que falharam na validação)"""
+    extraidos = {}
+    pendentes = []
+    for lote_url, imagem_card, lote_info in _iterar_lotes_via_http(cliente_http, lotes, sessao):
+        if lote_info is None:
+            pendentes.append((lote_url, imagem_card))
+        else:
+            extraidos[lote_url] = lote_info
+    return extraidos, pendentes
+
+def _comparar_com_navegador(page, lotes, extraidos_http, sessao):
+    """
+    Modo --comparar-http: extrai todos os lotes também pelo navegador, aponta lotes
+    diferentes e, se pedido, grava as páginas como fixtures para verificação offline.
+    """
+    via_navegador = _extrair_lotes_via_navegador(page, lotes, sessao)
+    for lote_url, imagem_card in lotes:
+        referencia = via_navegador.get(lote_url)
+        lote_http = extraidos_http.get(lote_url)
+        if referencia is None or lote_http is None:
             continue
+        sessao.comparados_http += 1
+        if lote_http != referencia:
+            campos = [k for k in referencia if referencia[k] != lote_http.get(k)]
+            sessao.divergencias_http += 1
+            print(f"      ≠ {lote_url.split('/')[-1][:40]}: {', '.join(campos)}")
+        
+        conteudo, encoding = sessao.html_http.pop(lote_url, (None, None))
+        if sessao.dir_fixtures and conteudo:
+            gravar_fixture(sessao.dir_fixtures, lote_url, imagem_card, conteudo, encoding, referencia)
     
-    return lotes_data, comitente_logo_encontrado
+    # O resultado usado é sempre o do navegador
+    extraidos_http.clear()
+    extraidos_http.update(via_navegador)
 
+def gravar_fixture(diretorio, lote_url, imagem_lote, conteudo, encoding, esperado):
+    """Grava o HTML de um lote e o resultado do navegador para verificar o caminho HTTP offline"""
+    os.makedirs(diretorio, exist_ok=True)
+    nome = hashlib.sha1(lote_url.encode('utf-8')).hexdigest()[:16]
+    with open(os.path.join(diretorio, f"{nome}.html"), 'wb') as f:
+        f.write(conteudo)
+    with open(os.path.join(diretorio, f"{nome}.json"), 'w', encoding='utf-8') as f:
+        json.dump({
+            'url': lote_url,
+            'imagem_lote': imagem_lote,
+            'encoding': encoding,
+            'esperado': esperado
+        }, f, ensure_ascii=False, indent=4)
 
-def extrair_todos_os_leiloes(page):
+def verificar_fixtures(diretorio):
     """
-    Extrai todos os leilões da página principal e depois os lotes de cada um.
+    Roda o parser HTTP sobre as fixtures gravadas e confere se os lotes são idênticos
+    aos extraídos pelo navegador. Retorna True se todos conferem.
     """
+    arquivos = sorted(a for a in os.listdir(diretorio) if a.endswith('.json'))
+    if not arquivos:
+        print(f"Nenhuma fixture encontrada em {diretorio}")
+        return False
+    
+    identicos = 0
+    inicio = time.perf_counter()
+    for arquivo in arquivos:
+        with open(os.path.join(diretorio, arquivo), 'r', encoding='utf-8') as f:
+            fixture = json.load(f)
+        with open(os.path.join(diretorio, arquivo[:-5] + '.html'), 'rb') as f:
+            conteudo = f.read()
+        
+        dados = scraper_http.extrair_campos_html(scraper_http.parsear_html(conteudo, fixture['encoding']))
+        lote = montar_lote(dados, fixture['url'], fixture['imagem_lote'])
+        # Comparar o JSON serializado garante igualdade byte a byte do que seria salvo
+        if json.dumps(lote, ensure_ascii=False) == json.dumps(fixture['esperado'], ensure_ascii=False):
+            identicos += 1
+        else:
+            campos = [k for k in fixture['esperado'] if fixture['esperado'][k] != lote.get(k)]
+            print(f"   ≠ {fixture['url']}: {', '.join(campos)}")
+    duracao = time.perf_counter() - inicio
+    
+    print(f"{identicos}/{len(arquivos)} fixtures idênticas ao navegador "
+          f"({len(arquivos) / duracao:.1f} lotes/s só com o parser HTTP)")
+    return identicos == len(arquivos)
+
+def _logo_comitente(page):
+    """Logo do comitente na página do leilão (fallback quando nenhum lote traz o símbolo)"""
+    try:
+        logo_locator = page.locator('xpath=/html/body/section[2]/div/div/div[1]/a/div/img')
+        if logo_locator.count() > 0:
+            src = logo_locator.get_attribute('src')
+            if src:
+                return src if src.startswith('http') else BASE_URL + src
+    except:
+        pass
+    return ""
+
+def _titulo_leilao(page, url):
+    """Título (h1) da página do leilão, ou um nome montado a partir da URL"""
+    titulo = f"Leilão {url.split('/')[-2]}"
+    try:
+        titulo_el = page.locator('h1').first
+        if titulo_el.count() > 0:
+            titulo = titulo_el.inner_text().strip()
+    except:
+        pass
+    return titulo
+
+def _tempo_ocupado(intervalos):
+    """Tempo de relógio em que pelo menos um dos intervalos (inicio, fim) estava aberto"""
+    total = 0.0
+    fim_atual = None
+    for inicio, fim in sorted(intervalos):
+        if fim_atual is None or inicio > fim_atual:
+            total += fim - inicio
+            fim_atual = fim
+        elif fim > fim_atual:
+            total += fim - fim_atual
+            fim_atual = fim
+    return total
+
+class LeilaoEmAndamento:
+    """Estado de um leilão dentro do pipeline"""
+    def __init__(self, indice, url, titulo):
+        self.indice = indice
+        self.url = url
+        self.titulo = titulo
+        self.titulo_pagina = None  # h1 da página do leilão
+        self.logo_pagina = ""
+        self.lotes_info = {}  # {url: imagem do card}
+        self.extraidos = {}  # {url: lote_info}
+        self.paginas_pendentes = 1  # a própria página do leilão
+        self.lotes_pendentes = 0
+        self.paginacao = None  # [parametro, total, url_base]
+        self.paginas_visitadas = 0
+        self.novos_apos_primeira = 0
+        self.inicio = None
+        self.prontos = {}  # lotes já extraídos por uma coleta interrompida
+        self.falhou = False  # página do leilão ou de listagem com erro
+
+    def concluido(self):
+        return self.paginas_pendentes == 0 and self.lotes_pendentes == 0
+
+    def resultado(self):
+        """Retorna (lotes em ordem de URL, logo do comitente)"""
+        lotes = [self.extraidos[url] for url in sorted(self.lotes_info) if url in self.extraidos]
+        logo = next((lote['simbolo_lote'] for lote in lotes if lote['simbolo_lote']), "")
+        return lotes, logo or self.logo_pagina
+
+class PipelineScraper:
+    """
+    Scraper em pipeline (produtor/consumidor) sobre o pool de abas.
+
+    As páginas de leilão e de listagem são os produtores: cada uma, assim que lida, coloca
+    as URLs dos lotes numa fila limitada que as abas livres (consumidores) esvaziam na hora,
+    sem esperar o fim da paginação nem do leilão anterior. Com a fila cheia os produtores
+    param até abrir espaço. No modo HTTP os lotes vão para threads e as abas ficam com as
+    listagens e com os lotes que falharem na validação.
+    """
+    def __init__(self, page, sessao, limite_fila=None):
+        self.page = page  # aba principal, usada só no fallback por cliques
+        self.sessao = sessao
+        self.pool = sessao.pool
+        self.limite_fila = limite_fila or self.pool.tamanho * 4
+        self.fila_paginas = []  # heap de (indice do leilão, número da página, seq, tipo, leilao, url)
+        self.fila_lotes = deque()  # (leilao, url, imagem)
+        self._tarefas = deque()  # tarefas nas abas, na mesma ordem do pool: (tipo, leilao, url, extra, inicio)
+        self._futuros = {}  # future -> (leilao, url, imagem)
+        self._http = None
+        self._seq = 0
+        self.intervalos = {'listagem': [], 'lote': []}  # (inicio, fim) de cada página visitada
+        self.lotes_http = 0
+        self.duracao = 0.0
+
+    def _agendar_pagina(self, tipo, leilao, url, numero):
+        self._seq += 1
+        heapq.heappush(self.fila_paginas, (leilao.indice, numero, self._seq, tipo, leilao, url))
+
+    def _agendar_listagens(self, leilao, de, ate):
+        parametro, _, url_base = leilao.paginacao
+        for numero in range(de, ate + 1):
+            leilao.paginas_pendentes += 1
+            self._agendar_pagina('listagem', leilao, _url_da_pagina(url_base, parametro, numero), numero)
+
+    def _extrair_http(self, url):
+        inicio = time.monotonic()
+        dados, _, _ = self.sessao.cliente_http.extrair(url)
+        return dados, inicio, time.monotonic()
+
+    def _enfileirar_lotes(self, leilao, cards):
+        """
+        Produtor: coloca na fila os lotes ainda não vistos que precisam ser abertos.
+        Retorna quantos lotes eram novos no leilão (abertos ou não).
+        """
+        incremental = self.sessao.incremental
+        if incremental:
+            incremental.registrar_cartoes(cards)
+        novos = 0
+        for card in cards:
+            url = card['url']
+            if url in leilao.lotes_info:
+                continue
+            leilao.lotes_info[url] = card['imagem']
+            novos += 1
+            if url in leilao.prontos:
+                leilao.extraidos[url] = leilao.prontos[url]
+                continue
+            lote = incremental.reaproveitar(leilao.url, url) if incremental else None
+            if lote is not None:
+                leilao.extraidos[url] = lote
+                continue
+            leilao.lotes_pendentes += 1
+            if self._http:
+                self._futuros[self._http.submit(self._extrair_http, url)] = (leilao, url, card['imagem'])
+            else:
+                self.fila_lotes.append((leilao, url, card['imagem']))
+        return novos
+
+    def _lotes_aguardando(self):
+        return len(self.fila_lotes) + len(self._futuros)
+
+    def _despachar(self):
+        """Ocupa as abas livres: lotes da fila primeiro, mas sempre com um produtor ativo"""
+        esperas = self.sessao.esperas
+        while self.pool.tem_livre():
+            produtor_liberado = self.fila_paginas and self._lotes_aguardando() < self.limite_fila
+            produtores_ativos = sum(1 for tarefa in self._tarefas if tarefa[0] != 'lote')
+            if produtor_liberado and (not self.fila_lotes or produtores_ativos == 0):
+                _, numero, _, tipo, leilao, url = heapq.heappop(self.fila_paginas)
+                if tipo == 'leilao':
+                    leilao.inicio = time.monotonic()
+                    self.pool.iniciar(url, esperas.pagina_leilao)
+                else:
+                    self.pool.iniciar(url, esperas.pagina_listagem)
+                self._tarefas.append((tipo, leilao, url, numero, time.monotonic()))
+            elif self.fila_lotes:
+                leilao, url, imagem = self.fila_lotes.popleft()
+                self.pool.iniciar(url)
+                self._tarefas.append(('lote', leilao, url, imagem, time.monotonic()))
+            else:
+                break
+
+    def _ler_pagina_leilao(self, page, leilao):
+        leilao.titulo_pagina = _titulo_leilao(page, leilao.url)
+        leilao.logo_pagina = _logo_comitente(page)
+        
+        url_atual = page.url
+        if '/lote/' in url_atual and url_atual.count('/') >= 7:
+            print(f"   [{leilao.indice}] Leilão com lote único detectado (redirecionamento direto)")
+            lote_info = extrair_dados_lote_individual(page, url_atual, self.sessao)
+            if lote_info:
+                leilao.lotes_info[url_atual] = ""
+                leilao.extraidos[url_atual] = lote_info
+            return
+        
+        paginacao = detectar_paginacao(page)
+        if not paginacao:
+            # Sem padrão de URL: percorrer por cliques nesta aba e enfileirar tudo no final
+            self._coletar_por_cliques(page, leilao)
+            return
+        
+        parametro, total = paginacao
+        leilao.paginacao = [parametro, total, page.url]
+        leilao.paginas_visitadas = 1
+        novos = self._enfileirar_lotes(leilao, coletar_cards_lotes(page))
+        print(f"   [{leilao.indice}] {total} página(s) via '{parametro}'; página 1: {novos} lotes")
+        self._agendar_listagens(leilao, 2, total)
+
+    def _ler_listagem(self, page, leilao, numero):
+        leilao.paginas_visitadas += 1
+        novos = self._enfileirar_lotes(leilao, coletar_cards_lotes(page))
+        leilao.novos_apos_primeira += novos
+        print(f"   [{leilao.indice}] página {numero}: {novos} novos lotes")
+        
+        # O widget pode mostrar só uma janela de páginas: ampliar o total se aparecerem mais
+        paginacao = detectar_paginacao(page)
+        parametro, total, _ = leilao.paginacao
+        if paginacao and paginacao[0] == parametro and paginacao[1] > total:
+            leilao.paginacao[1] = paginacao[1]
+            self._agendar_listagens(leilao, total + 1, paginacao[1])
+
+    def _coletar_por_cliques(self, page, leilao):
+        inicio = time.monotonic()
+        lotes_info = {}
+        paginas = _coletar_lotes_por_cliques(page, lotes_info, self.sessao)
+        self.sessao.registrar_paginacao('cliques', paginas, time.monotonic() - inicio)
+        self._enfileirar_lotes(leilao, [{'url': url, 'imagem': imagem} for url, imagem in lotes_info.items()])
+        leilao.paginas_visitadas = paginas
+
+    def _fim_das_listagens(self, leilao):
+        if leilao.paginacao and leilao.paginas_visitadas > 1:
+            if leilao.novos_apos_primeira == 0:
+                # O site ignorou o parâmetro: refazer a coleta por cliques na aba principal
+                print(f"   [{leilao.indice}] ⚠ Páginas diretas não trouxeram lotes novos; usando navegação por cliques")
+                self.page.goto(leilao.url, wait_until="domcontentloaded", timeout=30000)
+                self.sessao.esperas.pagina_leilao(self.page)
+                self._coletar_por_cliques(self.page, leilao)
+            else:
+                self.sessao.registrar_paginacao('direta', leilao.paginas_visitadas, time.monotonic() - leilao.inicio)
+        print(f"   [{leilao.indice}] Total de {len(leilao.lotes_info)} lotes únicos coletados "
+              f"de {max(1, leilao.paginas_visitadas)} página(s)")
+
+    def _processar_proxima_aba(self):
+        """Espera a navegação mais antiga e entrega a página ao estágio dela"""
+        tipo, leilao, url, extra, inicio = self._tarefas.popleft()
+        page, _, erro = self.pool.aguardar_proxima()
+        try:
+            if erro is None:
+                if tipo == 'leilao':
+                    self._ler_pagina_leilao(page, leilao)
+                elif tipo == 'listagem':
+                    self._ler_listagem(page, leilao, extra)
+                else:
+                    leilao.extraidos[url] = extrair_detalhes_lote(page, url, extra, self.sessao)
+                    self.sessao.lote_concluido(leilao.url, leilao.extraidos[url])
+        except Exception as e:
+            erro = e
+        finally:
+            self.pool.liberar(page)
+        
+        if erro:
+            print(f"   [{leilao.indice}] ✗ {url.split('/')[-1][:40]}: {str(erro)[:50]}")
+            if tipo != 'lote':
+                leilao.falhou = True
+        if tipo == 'lote':
+            self.intervalos['lote'].append((inicio, time.monotonic()))
+            leilao.lotes_pendentes -= 1
+        else:
+            self.intervalos['listagem'].append((inicio, time.monotonic()))
+            leilao.paginas_pendentes -= 1
+            if leilao.paginas_pendentes == 0:
+                self._fim_das_listagens(leilao)
+
+    def _coletar_http(self, bloquear=False):
+        """Consumidores HTTP: lotes prontos entram no leilão; os que falharam vão para as abas"""
+        if not self._futuros:
+            return
+        if bloquear:
+            wait(list(self._futuros), return_when=FIRST_COMPLETED)
+        for futuro in [f for f in self._futuros if f.done()]:
+            leilao, url, imagem = self._futuros.pop(futuro)
+            try:
+                dados, inicio, fim = futuro.result()
+                self.intervalos['lote'].append((inicio, fim))
+            except Exception:
+                dados = None
+            if dados is None:
+                self.fila_lotes.append((leilao, url, imagem))
+                continue
+            leilao.extraidos[url] = montar_lote(dados, url, imagem)
+            self.sessao.lote_concluido(leilao.url, leilao.extraidos[url])
+            leilao.lotes_pendentes -= 1
+            self.lotes_http += 1
+
+    def executar(self, leiloes):
+        """
+        Processa os leilões [{'url', 'titulo'}] em pipeline.
+        Gera cada LeilaoEmAndamento na ordem de entrada, assim que ele e os anteriores terminam.
+        """
+        estados = [LeilaoEmAndamento(idx, leilao['url'], leilao['titulo']) for idx, leilao in enumerate(leiloes, 1)]
+        for leilao in estados:
+            leilao.prontos = self.sessao.lotes_ja_extraidos(leilao.url)
+            self._agendar_pagina('leilao', leilao, leilao.url, 1)
+        if self.sessao.cliente_http:
+            self._http = ThreadPoolExecutor(max_workers=self.sessao.cliente_http.conexoes)
+        
+        inicio = time.monotonic()
+        proximo = 0
+        try:
+            while proximo < len(estados):
+                self._despachar()
+                if self._tarefas:
+                    self._processar_proxima_aba()
+                elif self._futuros:
+                    self._coletar_http(bloquear=True)
+                elif not self.fila_paginas and not self.fila_lotes:
+                    break
+                self._coletar_http()
+                
+                while proximo < len(estados) and estados[proximo].concluido():
+                    yield estados[proximo]
+                    proximo += 1
+            # Só chega aqui sem trabalho pendente se algo saiu do controle: entregar o que houver
+            for leilao in estados[proximo:]:
+                yield leilao
+        finally:
+            self.duracao += time.monotonic() - inicio
+            if self._http:
+                self._http.shutdown(wait=False, cancel_futures=True)
+                self._http = None
+            self._futuros.clear()
+
+    def imprimir_resumo(self):
+        if not self.duracao:
+            return
+        ocupado = {estagio: _tempo_ocupado(intervalos) for estagio, intervalos in self.intervalos.items()}
+        print(f"\nPipeline ({self.pool.tamanho} abas, fila de até {self.limite_fila} lotes):")
+        print(f"   listagens {len(self.intervalos['listagem']):>5} páginas, ativas por {ocupado['listagem']:.1f}s")
+        print(f"   lotes     {len(self.intervalos['lote']):>5} páginas, ativos por {ocupado['lote']:.1f}s"
+              + (f" ({self.lotes_http} via HTTP)" if self.lotes_http else ""))
+        print(f"   tempo real {self.duracao:.1f}s (estágios em sequência: {sum(ocupado.values()):.1f}s)")
+
+def _leiloes_da_pagina_principal(page, sessao):
+    """Abre a página principal e retorna os leilões listados, ou None se ela não carregou"""
     print(f"Acessando {BASE_URL}...")
     page.goto(BASE_URL, wait_until="domcontentloaded", timeout=30000)
     
@@ -473,49 +1719,72 @@ def extrair_todos_os_leiloes(page):
         print("✓ Página principal carregada")
     except:
         print("✗ Timeout ao carregar página principal")
-        return []
+        return None
     
-    page.wait_for_timeout(2000)
+    sessao.esperas.pagina_principal(page)
     
     # Buscar apenas os links principais dos cards de leilão
-    leiloes_locators = page.locator('a[href*="/eventos/leilao/"]:has(h3)')
-    count = leiloes_locators.count()
+    leiloes_info = coletar_cards_leiloes(page)
+    for leilao in leiloes_info:
+        print(f"   • {leilao['titulo']}")
     
-    print(f"✓ Encontrados {count} cards de leilões")
+    print(f"\n✓ {len(leiloes_info)} leilões únicos identificados\n")
+    return leiloes_info
+
+def _leilao_concluido(sessao, leilao_url, dado):
+    """Registra no checkpoint o leilão terminado (dado é None se ele não teve lotes)"""
+    if sessao.armazem:
+        sessao.armazem.concluir_leilao_da_coleta(leilao_url, dado)
+    if sessao.incremental and dado:
+        sessao.incremental.salvar(leilao_url)
+
+def iterar_leiloes(page, sessao=None, retomar=False):
+    """
+    Extrai os leilões da página principal e gera cada um (com os lotes) assim que termina;
+    leilões sem lotes não são gerados. Só um leilão por vez fica em memória.
+    Com sessao.armazem, cada lote e cada leilão ficam gravados assim que terminam;
+    retomar=True continua a coleta interrompida a partir desse checkpoint.
+    """
+    sessao = sessao or SessaoScraper()
     
-    leiloes_info = []
-    for i in range(count):
-        try:
-            locator = leiloes_locators.nth(i)
-            href = locator.get_attribute('href')
-            
-            if href:
-                url_completa = href if href.startswith('http') else BASE_URL + href
-                
-                # Pegar o título do leilão (H3 dentro do card)
-                try:
-                    titulo_h3 = locator.locator('h3')
-                    if titulo_h3.count() > 0:
-                        titulo = titulo_h3.inner_text().strip()
-                    else:
-                        titulo = f"Leilão {url_completa.split('/')[-2]}"
-                except:
-                    titulo = f"Leilão {url_completa.split('/')[-2]}"
-                
-                # Evitar duplicatas
-                if not any(l['url'] == url_completa for l in leiloes_info):
-                    leiloes_info.append({
-                        'url': url_completa,
-                        'titulo': titulo if titulo else f"Leilão {len(leiloes_info)+1}"
-                    })
-                    print(f"   • {titulo}")
-                    
-        except Exception as e:
-            continue
+    leiloes_info = None
+    if retomar and sessao.armazem:
+        pendente = sessao.armazem.coleta_pendente()
+        if pendente:
+            concluidos = sum(1 for leilao in pendente if leilao['concluido'])
+            print(f"Retomando coleta interrompida: {concluidos}/{len(pendente)} leilões já concluídos\n")
+            leiloes_info = [leilao for leilao in pendente if not leilao['concluido']]
+        else:
+            print("Nenhuma coleta interrompida encontrada; começando uma nova")
     
-    print(f"\n✓ {len(leiloes_info)} leilões únicos identificados\n")
+    if leiloes_info is None:
+        leiloes_info = _leiloes_da_pagina_principal(page, sessao)
+        if leiloes_info is None:
+            return
+        if sessao.armazem:
+            sessao.armazem.iniciar_coleta(leiloes_info)
     
-    resultados = []
+    if sessao.pipeline:
+        # Listagens e lotes de todos os leilões sobrepostos nas mesmas abas
+        for leilao in sessao.pipeline.executar(leiloes_info):
+            lotes, comitente_logo = leilao.resultado()
+            dado = None
+            if lotes:
+                dado = {
+                    'leilao_titulo': leilao.titulo,
+                    'leilao_url': leilao.url,
+                    'comitente_logo': comitente_logo,
+                    'total_lotes': len(lotes),
+                    'lotes': lotes
+                }
+                print(f"✓ [{leilao.indice}/{len(leiloes_info)}] {leilao.titulo}: {len(lotes)} lotes extraídos")
+            else:
+                print(f"⚠ [{leilao.indice}/{len(leiloes_info)}] {leilao.titulo}: nenhum lote encontrado")
+            if not leilao.falhou:
+                _leilao_concluido(sessao, leilao.url, dado)
+            if dado:
+                yield dado
+        return
     
     # Processar cada leilão
     for idx, leilao in enumerate(leiloes_info, 1):
@@ -526,45 +1795,49 @@ def extrair_todos_os_leiloes(page):
         try:
             # Navegar para a página do leilão
             page.goto(leilao['url'], wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(2000)
+            sessao.esperas.pagina_leilao(page)
             
             # Extrair lotes deste leilão (retorna também a logo do comitente)
-            lotes, comitente_logo = extrair_lotes_de_leilao(page)
+            lotes, comitente_logo = extrair_lotes_de_leilao(page, sessao, leilao['url'])
             
             # Se não encontrou logo nos lotes, tentar na página do leilão (fallback)
             if not comitente_logo:
-                try:
-                    logo_locator = page.locator('xpath=/html/body/section[2]/div/div/div[1]/a/div/img')
-                    if logo_locator.count() > 0:
-                        src = logo_locator.get_attribute('src')
-                        if src:
-                            comitente_logo = src if src.startswith('http') else BASE_URL + src
-                except:
-                    pass
+                comitente_logo = _logo_comitente(page)
             
+            dado = None
             if lotes:
-                resultados.append({
+                dado = {
                     'leilao_titulo': leilao['titulo'],
                     'leilao_url': leilao['url'],
                     'comitente_logo': comitente_logo,
                     'total_lotes': len(lotes),
                     'lotes': lotes
-                })
+                }
                 print(f"   ✓ {len(lotes)} lotes extraídos")
             else:
                 print("   ⚠ Nenhum lote encontrado")
+            _leilao_concluido(sessao, leilao['url'], dado)
                 
         except Exception as e:
             print(f"   ✗ Erro ao processar leilão: {str(e)[:100]}")
             continue
-            
-    return resultados
+        
+        if dado:
+            yield dado
+
+def extrair_todos_os_leiloes(page, sessao=None, retomar=False):
+    """
+    Extrai todos os leilões da página principal e depois os lotes de cada um.
+    Retorna a lista completa; para coletas grandes prefira iterar_leiloes.
+    """
+    return list(iterar_leiloes(page, sessao, retomar))
 
-def listar_leiloes_disponiveis(page):
+def listar_leiloes_disponiveis(page, sessao=None):
     """
     Acessa a página principal e retorna lista de leilões disponíveis.
     Salva em leiloes_disponiveis.json
     """
+    sessao = sessao or SessaoScraper()
     print(f"Acessando {BASE_URL}...")
     page.goto(BASE_URL, wait_until="domcontentloaded", timeout=30000)
     
@@ -574,72 +1847,42 @@ def listar_leiloes_disponiveis(page):
         print("✗ Timeout ao carregar página principal")
         return []
     
-    page.wait_for_timeout(2000)
+    sessao.esperas.pagina_principal(page)
     
-    leiloes_locators = page.locator('a[href*="/eventos/leilao/"]:has(h3)')
-    count = leiloes_locators.count()
+    leiloes_online = coletar_cards_leiloes(page)
     
-    leiloes_online = []
-    for i in range(count):
-        try:
-            locator = leiloes_locators.nth(i)
-            href = locator.get_attribute('href')
-            
-            if href:
-                url_completa = href if href.startswith('http') else BASE_URL + href
-                
-                try:
-                    titulo_h3 = locator.locator('h3')
-                    if titulo_h3.count() > 0:
-                        titulo = titulo_h3.inner_text().strip()
-                    else:
-                        titulo = f"Leilão {url_completa.split('/')[-2]}"
-                except:
-                    titulo = f"Leilão {url_completa.split('/')[-2]}"
-                
-                if not any(l['url'] == url_completa for l in leiloes_online):
-                    leiloes_online.append({
-                        'url': url_completa,
-                        'titulo': titulo
-                    })
-        except:
-            continue
-            
     # Salvar em arquivo temporário
     with open('leiloes_disponiveis.json', 'w', encoding='utf-8') as f:
         json.dump(leiloes_online, f, ensure_ascii=False, indent=4)
         
     return leiloes_online
 
-def processar_leilao_unico(page, url):
+def processar_leilao_unico(page, url, sessao=None, armazem=None):
     """
-    Processa um único leilão e atualiza o JSON principal.
+    Processa um único leilão, atualiza o banco local e retorna o leilão salvo.
     """
+    sessao = sessao or SessaoScraper()
     print(f"Processando leilão único: {url}")
-    page.goto(url, wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(2000)
     
-    # Extrair título
-    titulo = f"Leilão {url.split('/')[-2]}"
-    try:
-        titulo_el = page.locator('h1').first
-        if titulo_el.count() > 0:
-            titulo = titulo_el.inner_text().strip()
-    except:
-        pass
+    if sessao.pipeline:
+        # Os lotes começam a ser baixados enquanto as listagens ainda estão sendo lidas
+        titulo = f"Leilão {url.split('/')[-2]}"
+        lotes, comitente_logo = [], ""
+        for leilao in sessao.pipeline.executar([{'url': url, 'titulo': titulo}]):
+            titulo = leilao.titulo_pagina or titulo
+            lotes, comitente_logo = leilao.resultado()
+    else:
+        page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        sessao.esperas.pagina_leilao(page)
         
-    lotes, comitente_logo = extrair_lotes_de_leilao(page)
-    
-    # Fallback para logo do comitente
-    if not comitente_logo:
-        try:
-            logo_locator = page.locator('xpath=/html/body/section[2]/div/div/div[1]/a/div/img')
-            if logo_locator.count() > 0:
-                src = logo_locator.get_attribute('src')
-                if src:
-                    comitente_logo = src if src.startswith('http') else BASE_URL + src
-        except:
-            pass
+        # Extrair título
+        titulo = _titulo_leilao(page, url)
+        
+        lotes, comitente_logo = extrair_lotes_de_leilao(page, sessao, url)
+        
+        # Fallback para logo do comitente
+        if not comitente_logo:
+            comitente_logo = _logo_comitente(page)
     
     novo_dado = {
         'leilao_titulo': titulo,
@@ -649,70 +1892,228 @@ def processar_leilao_unico(page, url):
         'lotes': lotes
     }
     
-    # Carregar dados existentes
-    dados_existentes = []
-    if os.path.exists('leiloes_completo.json'):
-        try:
-            with open('leiloes_completo.json', 'r', encoding='utf-8') as f:
-                dados_existentes = json.load(f)
-        except:
-            pass
-            
-    # Atualizar ou adicionar
-    encontrado = False
-    for i, item in enumerate(dados_existentes):
-        # Verificar compatibilidade com chaves antigas e novas
-        item_url = item.get('leilao_url') or item.get('url')
-        if item_url == url:
-            dados_existentes[i] = novo_dado
-            encontrado = True
-            break
-            
-    if not encontrado:
-        dados_existentes.append(novo_dado)
-        
-    # Salvar
-    with open('leiloes_completo.json', 'w', encoding='utf-8') as f:
-        json.dump(dados_existentes, f, ensure_ascii=False, indent=4)
+    # Só as linhas deste leilão são regravadas
+    armazem = armazem or ArmazemLeiloes()
+    armazem.salvar_leilao(novo_dado)
+    if sessao.incremental:
+        sessao.incremental.salvar(url)
         
-    print(f"✓ Dados salvos em leiloes_completo.json")
+    print(f"✓ {len(lotes)} lotes salvos em {armazem.caminho}")
+    return novo_dado
 
-def run_scraper(args_list=None):
+class EscritorNDJSON:
+    """
+    Grava um registro JSON por linha assim que ele fica pronto (NDJSON), sem manter a
+    coleta inteira em memória. Cada linha é um leilão no formato do antigo JSON.
+    """
+    def __init__(self, caminho, acrescentar=False):
+        self.caminho = caminho
+        self.registros = 0
+        self._arquivo = open(caminho, 'a' if acrescentar else 'w', encoding='utf-8')
+
+    def escrever(self, registro):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        self._arquivo.flush()
+        self.registros += 1
+
+    def fechar(self):
+        self._arquivo.close()
+
+def ler_ndjson(caminho):
+    """Gera os registros de um arquivo NDJSON, um por vez"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+def _lista_argumento(valor):
+    """Converte 'a,b,c' da linha de comando em lista (None se o argumento não foi informado)"""
+    if valor is None:
+        return None
+    return [item.strip() for item in valor.split(',') if item.strip()]
+
+def run_scraper(args_list=None, servico=None, ao_salvar_leilao=None, imagens=None):
+    """
+    Executa o scraper com os argumentos da linha de comando (ou args_list).
+    Com servico (ServicoNavegador) usa o navegador já aberto em vez de iniciar outro.
+    ao_salvar_leilao(leilao) é chamado para cada leilão assim que ele é salvo.
+    imagens: imagens.CacheImagens já aberto pelo app (senão o scraper abre o seu).
+    """
     parser = argparse.ArgumentParser(description='Scraper Leilões PB')
     parser.add_argument('--url', help='URL específica de um leilão para baixar')
     parser.add_argument('--listar', action='store_true', help='Apenas listar leilões disponíveis')
+    parser.add_argument('--motor', choices=['js', 'locators', 'comparar'], default='js',
+                        help='Como extrair os campos dos lotes: "js" (uma chamada por página), '
+                             '"locators" (um locator por campo) ou "comparar" (roda os dois e mede)')
+    parser.add_argument('--concorrencia', '--concurrency', type=int, default=1,
+                        help='Número de abas abertas em paralelo para baixar os lotes (padrão: 1)')
+    parser.add_argument('--esperas-fixas', action='store_true',
+                        help='Usar as pausas fixas antigas em vez de esperar por eventos (para comparação)')
+    parser.add_argument('--sem-bloqueio', action='store_true',
+                        help='Não bloquear imagens, fontes, mídia e scripts de terceiros no navegador')
+    parser.add_argument('--bloquear-tipos', metavar='TIPOS',
+                        help='Tipos de recurso bloqueados, separados por vírgula (padrão: image,font,media)')
+    parser.add_argument('--permitir-hosts', metavar='HOSTS',
+                        help='Hosts de onde scripts podem ser carregados, separados por vírgula')
+    parser.add_argument('--bloquear-hosts', metavar='HOSTS',
+                        help='Hosts sempre bloqueados, separados por vírgula (substitui a lista padrão)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Abrir os lotes enquanto as listagens ainda estão sendo percorridas, '
+                             'sobrepondo os leilões (usa o pool de abas; mínimo de 2)')
+    parser.add_argument('--fila-lotes', type=int, default=None, metavar='N',
+                        help='Com --pipeline, máximo de lotes aguardando antes de pausar as listagens '
+                             '(padrão: 4 por aba)')
+    parser.add_argument('--http', action='store_true',
+                        help='Baixar as páginas dos lotes via HTTP, sem navegador (usa o navegador só se a página falhar na validação)')
+    parser.add_argument('--comparar-http', action='store_true',
+                        help='Extrair os lotes pelos dois caminhos (HTTP e navegador) e comparar resultado e vazão')
+    parser.add_argument('--gravar-fixtures', metavar='DIR',
+                        help='Com --comparar-http, gravar o HTML de cada lote e o resultado do navegador em DIR')
+    parser.add_argument('--retomar', '--resume', action='store_true',
+                        help='Continuar a última coleta completa interrompida, pulando leilões e lotes já extraídos')
+    parser.add_argument('--ttl-lotes', type=float, default=24, metavar='HORAS',
+                        help='Lotes com o card inalterado e extraídos há menos de HORAS vêm do banco sem abrir a página (padrão: 24)')
+    parser.add_argument('--completo', action='store_true',
+                        help='Reabrir todas as páginas de lote, ignorando o que já está no banco')
+    parser.add_argument('--saida', metavar='ARQUIVO',
+                        help='Gravar também cada leilão, assim que termina, como uma linha JSON (NDJSON) em ARQUIVO')
+    parser.add_argument('--banco', default=ARQUIVO_BANCO,
+                        help=f'Arquivo do banco local onde os leilões são salvos (padrão: {ARQUIVO_BANCO})')
+    parser.add_argument('--sem-imagens', action='store_true',
+                        help='Não baixar as imagens dos lotes para o cache local dos relatórios')
+    parser.add_argument('--verificar-fixtures', metavar='DIR',
+                        help='Conferir offline o parser HTTP contra as fixtures gravadas em DIR e sair')
     
     if args_list:
         args = parser.parse_args(args_list)
     else:
         args = parser.parse_args()
+    
+    if args.verificar_fixtures:
+        verificar_fixtures(args.verificar_fixtures)
+        return
+    
+    if args.pipeline and args.comparar_http:
+        print("⚠ --pipeline não suporta --comparar-http; usando o modo sequencial")
+        args.pipeline = False
+    if args.pipeline and args.concorrencia < 2:
+        print("⚠ --pipeline precisa de pelo menos 2 abas; usando --concorrencia 2")
+        args.concorrencia = 2
+    
+    cliente_http = None
+    if args.http or args.comparar_http:
+        if scraper_http.DISPONIVEL:
+            cliente_http = scraper_http.ClienteHTTP(USER_AGENT, conexoes=max(4, args.concorrencia))
+        else:
+            print("⚠ Modo HTTP requer os pacotes requests e lxml; usando apenas o navegador")
+
+    armazem = ArmazemLeiloes(args.banco)
+    armazem.importar_json_legado()
+    
+    # Imagens dos lotes baixadas em segundo plano enquanto a coleta continua
+    cache_imagens = None
+    if not args.sem_imagens and not args.listar:
+        cache_imagens = imagens or CacheImagens()
+    
+    try:
+        if servico:
+            # Navegador já aberto pelo app: só um contexto novo para esta execução
+            servico.executar(_executar_com_navegador, args, cliente_http, armazem, ao_salvar_leilao, cache_imagens)
+        else:
+            with sync_playwright() as p:
+                print("Iniciando navegador...")
+                browser = p.chromium.launch(headless=True)
+                try:
+                    _executar_com_navegador(browser, args, cliente_http, armazem, ao_salvar_leilao, cache_imagens)
+                finally:
+                    print("Fechando navegador...")
+                    browser.close()
+    finally:
+        if cache_imagens:
+            print("Aguardando as imagens dos lotes...")
+            if imagens:
+                cache_imagens.aguardar()
+            else:
+                cache_imagens.fechar()
+            print(f"✓ Imagens em cache: {cache_imagens.tamanho / 1024 / 1024:.1f} MB em {cache_imagens.pasta}")
+        if cliente_http:
+            cliente_http.fechar()
+        armazem.fechar()
 
-    with sync_playwright() as p:
-        print("Iniciando navegador...")
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            viewport={'width': 1366, 'height': 768}
+def _executar_com_navegador(browser, args, cliente_http, armazem, ao_salvar_leilao=None, cache_imagens=None):
+    """Roda o modo pedido em args num contexto novo do navegador e fecha o contexto no final"""
+    context = browser.new_context(
+        user_agent=USER_AGENT,
+        viewport={'width': 1366, 'height': 768}
+    )
+    
+    politica = None
+    if not args.sem_bloqueio:
+        politica = PoliticaRecursos(
+            tipos_bloqueados=_lista_argumento(args.bloquear_tipos),
+            hosts_permitidos=_lista_argumento(args.permitir_hosts),
+            hosts_bloqueados=_lista_argumento(args.bloquear_hosts)
         )
-        page = context.new_page()
-        
-        try:
-            if args.listar:
-                listar_leiloes_disponiveis(page)
-            elif args.url:
-                processar_leilao_unico(page, args.url)
+        politica.aplicar(context)
+    
+    page = context.new_page()
+    
+    # Abas extras para baixar os lotes em paralelo
+    esperas = Esperas(fixas=args.esperas_fixas)
+    pool = PoolPaginas(context, args.concorrencia, esperas) if args.concorrencia > 1 else None
+    sessao = SessaoScraper(
+        esperas=esperas,
+        pool=pool,
+        motor=args.motor,
+        cliente_http=cliente_http,
+        comparar_http=args.comparar_http,
+        dir_fixtures=args.gravar_fixtures
+    )
+    if args.pipeline:
+        sessao.pipeline = PipelineScraper(page, sessao, limite_fila=args.fila_lotes)
+    sessao.incremental = ImpressoesLotes(armazem, ttl_horas=args.ttl_lotes, completo=args.completo)
+    
+    # Saída NDJSON: com --retomar continua o arquivo da execução interrompida
+    escritor = EscritorNDJSON(args.saida, acrescentar=args.retomar) if args.saida else None
+    
+    def entregar(leilao):
+        if cache_imagens and leilao:
+            cache_imagens.agendar(enderecos_do_leilao(leilao))
+        if escritor:
+            escritor.escrever(leilao)
+        if ao_salvar_leilao:
+            ao_salvar_leilao(leilao)
+    
+    try:
+        if args.listar:
+            listar_leiloes_disponiveis(page, sessao)
+        elif args.url:
+            entregar(processar_leilao_unico(page, args.url, sessao, armazem))
+        else:
+            # Modo padrão: baixar tudo
+            # Cada leilão é gravado no banco assim que termina (checkpoint) e
+            # repassado adiante sem acumular a coleta inteira em memória
+            sessao.armazem = armazem
+            for leilao in iterar_leiloes(page, sessao, retomar=args.retomar):
+                entregar(leilao)
+            pendentes = armazem.finalizar_coleta()
+            if pendentes:
+                print(f"⚠ {pendentes} leilão(ões) não concluído(s); rode de novo com --retomar para completar")
             else:
-                # Modo padrão: baixar tudo
-                dados = extrair_todos_os_leiloes(page)
-                with open('leiloes_completo.json', 'w', encoding='utf-8') as f:
-                    json.dump(dados, f, ensure_ascii=False, indent=4)
-                print(f"✓ Extração concluída! Dados salvos em leiloes_completo.json")
-                
-        except Exception as e:
-            print(f"Erro fatal: {e}")
-        finally:
-            print("Fechando navegador...")
-            browser.close()
+                print(f"✓ Extração concluída! Dados salvos em {armazem.caminho}")
+            
+    except Exception as e:
+        print(f"Erro fatal: {e}")
+    finally:
+        sessao.imprimir_estatisticas()
+        if politica:
+            politica.imprimir_resumo()
+        if pool:
+            pool.fechar()
+        if escritor:
+            escritor.fechar()
+            print(f"{escritor.registros} leilão(ões) gravados em {escritor.caminho}")
+        context.close()
 
 if __name__ == "__main__":
     run_scraper()
@@ -0,0 +1,220 @@
+"""
+Caminho rápido sem navegador para as páginas de lote.
+
+Baixa o HTML renderizado no servidor com uma sessão HTTP keep-alive e lê os campos com
+o lxml, reproduzindo o que o extrator do Playwright lê (mesmos XPaths, mesmos rótulos e
+uma aproximação do innerText). Páginas que não passam na validação voltam para o navegador.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from lxml import html as lxml_html
+    DISPONIVEL = True
+except ImportError:
+    DISPONIVEL = False
+
+# Elementos que nunca aparecem no innerText
+IGNORAR = {'script', 'style', 'noscript', 'template', 'head', 'title'}
+
+# Elementos de bloco: geram quebra de linha antes e depois no innerText
+BLOCOS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'details', 'dialog', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hgroup', 'hr', 'li', 'main', 'nav', 'ol', 'pre', 'section', 'summary', 'table',
+    'caption', 'tr', 'ul', 'center'
+}
+
+def _normalizar(texto):
+    return re.sub(r'\s+', ' ', texto or '').strip()
+
+def _visitar(el, partes):
+    tag = el.tag if isinstance(el.tag, str) else None
+    if tag is None or tag in IGNORAR:
+        return
+    if tag == 'br':
+        partes.append('\n')
+        return
+
+    quebra = 2 if tag == 'p' else (1 if tag in BLOCOS else 0)
+    if tag in ('td', 'th') and el.getprevious() is not None:
+        partes.append('\t')
+    if quebra:
+        partes.append(quebra)
+    if el.text:
+        partes.append(re.sub(r'[ \t\n\r\f]+', ' ', el.text))
+    for filho in el:
+        _visitar(filho, partes)
+        if filho.tail:
+            partes.append(re.sub(r'[ \t\n\r\f]+', ' ', filho.tail))
+    if quebra:
+        partes.append(quebra)
+
+def texto_renderizado(el):
+    """
+    Aproximação do innerText do navegador (sem CSS): espaços colapsados, quebra de linha
+    em elementos de bloco, linha em branco em <p> e \\n em <br>.
+    """
+    if el is None:
+        return None
+    partes = []
+    _visitar(el, partes)
+
+    saida = []
+    quebra = 0
+    espaco = False
+    for parte in partes:
+        if isinstance(parte, int):
+            # Quebras no início são descartadas; em sequência vale a maior
+            if saida:
+                quebra = max(quebra, parte)
+            espaco = False
+            continue
+        if parte == ' ':
+            # Espaço isolado entre blocos não é renderizado
+            if saida and not quebra:
+                espaco = True
+            continue
+        if quebra:
+            saida.append('\n' * quebra)
+        elif espaco:
+            saida.append(' ')
+        quebra = 0
+        espaco = False
+        saida.append(parte)
+
+    texto = ''.join(saida)
+    texto = re.sub(r' {2,}', ' ', texto)
+    texto = re.sub(r' *\n *', '\n', texto)
+    return texto.strip()
+
+def _por_xpath(contexto, xpath):
+    try:
+        encontrados = contexto.xpath(xpath)
+    except Exception:
+        return None
+    return encontrados[0] if encontrados else None
+
+def _por_texto(doc, teste):
+    """Equivalente ao seletor text= do Playwright: elemento mais interno cujo texto corresponde"""
+    corpo = doc.find('body')
+    if corpo is None:
+        corpo = doc
+    elementos = [el for el in corpo.iter() if isinstance(el.tag, str) and el.tag not in IGNORAR]
+
+    for el in elementos:
+        textos = [el.text] + [filho.tail for filho in el]
+        if any(t and teste(_normalizar(t)) for t in textos) and teste(_normalizar(el.text_content())):
+            return el
+
+    # Texto quebrado em vários nós (ex: "1º <b>Leilão</b>")
+    for el in elementos:
+        if not teste(_normalizar(el.text_content())):
+            continue
+        if not any(isinstance(f.tag, str) and teste(_normalizar(f.text_content())) for f in el):
+            return el
+    return None
+
+def _irmao_do_rotulo(doc, rotulo):
+    el = _por_texto(doc, lambda t: t == rotulo)
+    return _por_xpath(el, 'following-sibling::*[1]') if el is not None else None
+
+def extrair_campos_html(doc):
+    """
+    Lê os campos de uma página de lote já parseada.
+    Devolve o mesmo formato do EXTRATOR_LOTE_JS (None quando o elemento não existe).
+    """
+    dados = {}
+
+    titulo = _por_xpath(doc, '(//h2)[1]')
+    if titulo is None:
+        titulo = _por_xpath(doc, '(//h1)[1]')
+    dados['titulo'] = texto_renderizado(titulo)
+
+    desc = _por_xpath(doc, '/html/body/section[4]/div/div[2]/div/div[6]')
+    if desc is None:
+        desc = _por_xpath(doc, '/html/body/section[4]/div/div[2]/div/div[6]/p')
+    if desc is None:
+        rotulo = _por_texto(doc, lambda t: t == 'Descrição')
+        pai = rotulo.getparent() if rotulo is not None else None
+        desc = _por_xpath(pai, 'following-sibling::*[1]') if pai is not None else None
+    dados['descricao'] = texto_renderizado(desc)
+
+    dados['valor_minimo'] = texto_renderizado(_irmao_do_rotulo(doc, 'Valor mínimo de venda'))
+    dados['codigo_lote'] = texto_renderizado(_irmao_do_rotulo(doc, 'Código Lote'))
+    dados['numero_lote'] = texto_renderizado(_irmao_do_rotulo(doc, 'Número Lote'))
+
+    rotulo_leilao = _por_texto(doc, lambda t: re.search(r'Leilão Único|1º Leilão', t) is not None)
+    dados['valor_leilao'] = None
+    if rotulo_leilao is not None:
+        dados['valor_leilao'] = texto_renderizado(
+            _por_xpath(rotulo_leilao, 'following::*[contains(text(), "R$")][1]')
+        )
+
+    simbolo = _por_xpath(doc, '/html/body/section[4]/div/div[2]/div/div[5]/ul[1]/li[2]/div[1]/img')
+    dados['simbolo_src'] = simbolo.get('src') if simbolo is not None else None
+
+    status = _por_xpath(doc, '/html/body/section[4]/div/div[2]/div/div[2]/div/div[1]/ul[3]/li[2]/div[2]/strong')
+    dados['status'] = texto_renderizado(status)
+
+    # A foto vem sempre do card da listagem neste caminho
+    dados['imagem_src'] = None
+    return dados
+
+def campos_validos(dados):
+    """Uma página só é aceita sem navegador se os campos que identificam o lote foram encontrados"""
+    return all(dados.get(campo) for campo in ('titulo', 'codigo_lote', 'numero_lote'))
+
+def parsear_html(conteudo, encoding=None):
+    parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+    return lxml_html.document_fromstring(conteudo, parser=parser)
+
+class ClienteHTTP:
+    """
+    Sessão HTTP com pool de conexões keep-alive para baixar páginas de lote em paralelo.
+    """
+    def __init__(self, user_agent, conexoes=4, timeout=30):
+        self.conexoes = max(1, conexoes)
+        self.timeout = timeout
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=self.conexoes)
+        self.sessao.mount('https://', adaptador)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.headers['User-Agent'] = user_agent
+
+    def extrair(self, url):
+        """
+        Baixa e lê uma página de lote.
+        Retorna (dados, conteudo, encoding); dados é None se a página não passou na validação.
+        """
+        try:
+            resposta = self.sessao.get(url, timeout=self.timeout)
+        except Exception:
+            return None, None, None
+
+        # Redirecionamentos para fora da página do lote (login, erro) vão para o navegador
+        if resposta.status_code != 200 or '/lote/' not in resposta.url:
+            return None, None, None
+
+        # Sem charset no cabeçalho o requests assume ISO-8859-1; nesse caso o lxml usa a meta tag
+        tipo = resposta.headers.get('Content-Type', '').lower()
+        encoding = resposta.encoding if 'charset' in tipo else None
+        try:
+            dados = extrair_campos_html(parsear_html(resposta.content, encoding))
+        except Exception:
+            return None, resposta.content, encoding
+        return (dados if campos_validos(dados) else None), resposta.content, encoding
+
+    def iterar_varios(self, urls):
+        """Baixa várias páginas ao mesmo tempo e gera os resultados na ordem das URLs, conforme ficam prontos"""
+        with ThreadPoolExecutor(max_workers=self.conexoes) as executor:
+            yield from executor.map(self.extrair, urls)
+
+    def extrair_varios(self, urls):
+        """Baixa várias páginas ao mesmo tempo; a lista de resultados segue a ordem das URLs"""
+        return list(self.iterar_varios(urls))
+
+    def fechar(self):
+        self.sessao.close()
@@ -0,0 +1,186 @@
+"""
+Chromium de longa duração compartilhado pelo app (scraper e geração de PDF).
+
+A API síncrona do Playwright só pode ser usada na thread que a iniciou, então o serviço
+tem uma thread dona do navegador que executa, uma de cada vez, as tarefas enviadas pelas
+outras threads. O navegador é iniciado no primeiro uso, conferido antes de cada tarefa
+e reiniciado depois de um número fixo de usos para não acumular memória.
+
+Uma importação ocupa a thread do navegador até terminar; um PDF pedido nesse meio-tempo
+não entra na fila atrás dela: abre um navegador próprio, de vida curta, na thread que
+pediu. Se a thread do navegador morrer (Playwright ou Chromium ausentes, por exemplo), as
+tarefas na fila falham com o erro em vez de ficarem esperando para sempre.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as TempoEsgotado
+
+from playwright.sync_api import sync_playwright
+
+# Tempo máximo de um PDF (a importação não tem limite)
+TIMEOUT_PDF = 120
+# De quanto em quanto tempo quem espera uma tarefa confere se a thread ainda está viva
+INTERVALO_VERIFICACAO = 1.0
+
+def _renderizar_pdf(browser, html, caminho, opcoes):
+    """Renderiza o HTML num contexto novo do navegador e salva o PDF"""
+    context = browser.new_context()
+    try:
+        page = context.new_page()
+        page.set_content(html)
+        page.pdf(path=caminho, **opcoes)
+    finally:
+        context.close()
+
+class ServicoNavegador:
+    def __init__(self, usos_por_navegador=20, headless=True):
+        self.usos_por_navegador = usos_por_navegador
+        self.headless = headless
+        self.browser = None
+        self.usos = 0
+        self.lancamentos = 0
+        self._fila = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ocupado = False  # Uma tarefa está rodando na thread do navegador
+        self._erro = None  # Por que a thread do navegador terminou, se foi por erro
+
+    def _iniciar_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._erro = None
+                self._thread = threading.Thread(target=self._loop, name="navegador", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        try:
+            with sync_playwright() as p:
+                while True:
+                    tarefa = self._fila.get()
+                    if tarefa is None:
+                        break
+                    funcao, args, kwargs, futuro = tarefa
+                    if futuro.done():
+                        continue  # Já falhada por executar() quando a thread anterior morreu
+                    try:
+                        if not futuro.set_running_or_notify_cancel():
+                            continue  # Cancelada
+                    except RuntimeError:
+                        continue  # Terminou entre a conferência e aqui
+                    self._ocupado = True
+                    try:
+                        futuro.set_result(funcao(self._navegador_pronto(p), *args, **kwargs))
+                    except BaseException as e:
+                        futuro.set_exception(e)
+                    finally:
+                        self._ocupado = False
+                        self.usos += 1
+                        if self.usos >= self.usos_por_navegador:
+                            self._fechar_navegador()
+                self._fechar_navegador()
+        except BaseException as e:
+            self._erro = e
+            print(f"⚠ Thread do navegador encerrada: {e}")
+        finally:
+            self._ocupado = False
+            self._falhar_pendentes()
+
+    def _falhar_pendentes(self):
+        """Falha as tarefas que ficaram na fila quando a thread do navegador termina"""
+        while True:
+            try:
+                tarefa = self._fila.get_nowait()
+            except queue.Empty:
+                return
+            if tarefa is not None:
+                self._falhar(tarefa[3])
+
+    def _falhar(self, futuro):
+        if futuro.done():
+            return
+        try:
+            if not futuro.set_running_or_notify_cancel():
+                return  # Cancelada
+        except RuntimeError:
+            return  # Já terminou
+        motivo = f": {self._erro}" if self._erro else ""
+        futuro.set_exception(RuntimeError(f"Serviço do navegador encerrado{motivo}"))
+
+    def _navegador_pronto(self, p):
+        """Devolve o navegador aberto, reiniciando-o se caiu ou ainda não existe"""
+        if self.browser is not None and not self.browser.is_connected():
+            print("⚠ Navegador desconectado; iniciando outro")
+            self.browser = None
+        if self.browser is None:
+            inicio = time.monotonic()
+            self.browser = p.chromium.launch(headless=self.headless)
+            self.usos = 0
+            self.lancamentos += 1
+            print(f"Navegador iniciado em {time.monotonic() - inicio:.1f}s")
+        return self.browser
+
+    def _fechar_navegador(self):
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except:
+                pass
+            self.browser = None
+
+    def ocupado(self):
+        """True se há tarefa rodando ou esperando na thread do navegador"""
+        return self._ocupado or not self._fila.empty()
+
+    def executar(self, funcao, *args, timeout=None, **kwargs):
+        """
+        Roda funcao(browser, *args, **kwargs) na thread do navegador e devolve o resultado.
+        Bloqueia a thread chamadora até a tarefa terminar (tarefas rodam em sequência).
+        Com timeout (segundos), desiste com TimeoutError; a tarefa é cancelada se ainda
+        não tiver começado. Se a thread do navegador morrer, levanta RuntimeError.
+        """
+        self._iniciar_thread()
+        futuro = Future()
+        self._fila.put((funcao, args, kwargs, futuro))
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            espera = INTERVALO_VERIFICACAO
+            if limite is not None:
+                espera = min(espera, max(0, limite - time.monotonic()))
+            try:
+                return futuro.result(timeout=espera)
+            except TempoEsgotado:
+                pass
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                # A thread terminou sem pegar esta tarefa (o finally dela já pode ter passado)
+                self._falhar(futuro)
+                return futuro.result()
+            if limite is not None and time.monotonic() >= limite:
+                futuro.cancel()
+                raise TimeoutError(f"Tarefa do navegador não terminou em {timeout}s")
+
+    def gerar_pdf(self, html, caminho, timeout=TIMEOUT_PDF, **opcoes):
+        """
+        Renderiza o HTML e salva o PDF: no navegador compartilhado se ele estiver livre,
+        senão (importação em andamento) num navegador próprio, aberto só para este PDF.
+        """
+        if not self.ocupado():
+            self.executar(_renderizar_pdf, html, caminho, opcoes, timeout=timeout)
+            return
+        print("Navegador compartilhado ocupado; gerando o PDF num navegador próprio")
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=self.headless)
+            try:
+                _renderizar_pdf(browser, html, caminho, opcoes)
+            finally:
+                browser.close()
+
+    def encerrar(self, timeout=10):
+        """Fecha o navegador e a thread dona dele (se tiverem sido iniciados)"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._fila.put(None)
+            thread.join(timeout)
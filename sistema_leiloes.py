@@ -4,11 +4,16 @@ import os
 import subprocess
 import re
 import threading
+import time
 from datetime import datetime
 import shutil
-from playwright.sync_api import sync_playwright
-import queue
+from collections import OrderedDict, deque
 import scraper
+import modelos
+import relatorio
+from imagens import CacheImagens, enderecos_das_imagens
+from servico_navegador import ServicoNavegador
+from armazenamento import ArmazemLeiloes, ARQUIVO_BANCO
 import io
 import sys
 from contextlib import redirect_stdout, redirect_stderr
@@ -24,9 +29,20 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 # Configurações
-ARQUIVO_JSON = 'leiloes_completo.json'
 ARQUIVO_TEMPLATE = resource_path('Relatório Leilões.html')
 ARQUIVO_SCRAPER = 'scraper.py'
+# Quantos leilões mantêm os lotes em memória depois de abertos
+TAMANHO_CACHE_LOTES = 8
+# Linhas da tabela de lotes montadas de cada vez
+LINHAS_POR_PAGINA = 50
+# Espera depois da última tecla no filtro antes de aplicá-lo (segundos)
+ESPERA_FILTRO = 0.2
+# Máximo de lotes mostrados numa busca
+LIMITE_BUSCA = 200
+# Linhas mantidas no log da interface
+LINHAS_LOG = 500
+# Espera depois da última tecla numa avaliação antes de formatar o campo (segundos)
+ESPERA_AVALIACAO = 0.4
 
 class StreamToQueue:
     def __init__(self, queue):
@@ -38,19 +54,285 @@ class StreamToQueue:
     def flush(self):
         pass
 
+class BufferLog:
+    """
+    Log da interface: as mensagens chegam de qualquer thread num deque de entrada (append e
+    popleft são atômicos, sem o lock por mensagem do queue.Queue) e são descarregadas em
+    lote num deque de tamanho fixo (só as últimas linhas ficam). Cada
+    descarga reenvia apenas o campo do log. O intervalo entre descargas se adapta:
+    curto quando chegam poucas mensagens, maior em rajadas e quando o log está parado.
+    """
+    INTERVALO_MIN = 0.1
+    INTERVALO_RAJADA = 0.5
+    INTERVALO_MAX = 1.0
+    # Mais mensagens que isso numa descarga conta como rajada
+    RAJADA = 50
+
+    def __init__(self, controle, max_linhas=LINHAS_LOG):
+        self.controle = controle
+        self.linhas = deque(maxlen=max_linhas)
+        self.entrada = deque()
+        self.intervalo = self.INTERVALO_MIN
+        self.ativo = False
+        self.timer = None
+        self._lock = threading.Lock()
+
+    def adicionar(self, mensagem):
+        """Pode ser chamado de qualquer thread"""
+        self.entrada.append(mensagem)
+
+    # Mesma interface de uma fila, para o StreamToQueue
+    put = adicionar
+
+    def descarregar(self):
+        """Move as mensagens da fila para o deque e atualiza o campo; devolve quantas eram"""
+        with self._lock:
+            quantidade = len(self.entrada)
+            if not quantidade:
+                return 0
+            novas = [self.entrada.popleft() for _ in range(quantidade)]
+            
+            # Numa rajada só as últimas linhas sobrevivem no deque: nem formata as outras
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            self.linhas.extend(f"[{timestamp}] {msg}" for msg in novas[-self.linhas.maxlen:])
+            self.controle.value = '\n'.join(self.linhas)
+            if self.controle.visible and self.controle.page:
+                self.controle.update()
+            return quantidade
+
+    def _ciclo(self):
+        try:
+            quantidade = self.descarregar()
+        except Exception as e:
+            print(f"Erro ao processar log: {e}")
+            quantidade = 0
+        
+        if quantidade > self.RAJADA:
+            self.intervalo = self.INTERVALO_RAJADA
+        elif quantidade:
+            self.intervalo = self.INTERVALO_MIN
+        else:
+            self.intervalo = min(self.intervalo * 2, self.INTERVALO_MAX)
+        
+        if self.ativo:
+            self.timer = threading.Timer(self.intervalo, self._ciclo)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def iniciar(self):
+        self.ativo = True
+        self.intervalo = self.INTERVALO_MIN
+        self._ciclo()
+
+    def parar(self):
+        """Para as descargas periódicas e descarrega o que ainda estiver na fila"""
+        self.ativo = False
+        if self.timer:
+            self.timer.cancel()
+        self.descarregar()
+
+    def limpar(self):
+        with self._lock:
+            self.linhas.clear()
+            self.controle.value = ""
+
+class TabelaLotes:
+    """
+    Tabela de lotes paginada: só as linhas da página atual existem como controles e as
+    mesmas linhas são reaproveitadas ao trocar de página (muda apenas o conteúdo delas).
+    As avaliações digitadas ficam no dicionário do app, não nos campos.
+    """
+    def __init__(self, avaliacoes, ao_editar, linhas_por_pagina=LINHAS_POR_PAGINA):
+        self.avaliacoes = avaliacoes
+        self.ao_editar = ao_editar  # ao_editar(e, lote)
+        self.linhas_por_pagina = linhas_por_pagina
+        self.lotes = []
+        self.formatar_titulo = lambda lote: lote.titulo_limpo
+        self.pagina = 0
+        self.linhas = []  # (DataRow, numero, titulo, campo, valor, link), reaproveitadas entre páginas
+        
+        self.tabela = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Lote")),
+                ft.DataColumn(ft.Text("Título")),
+                ft.DataColumn(ft.Text("Avaliação"), numeric=True), # Coluna numérica para mais espaço
+                ft.DataColumn(ft.Text("Valor")),
+                ft.DataColumn(ft.Text("Link")),
+            ],
+            rows=[],
+            border=ft.border.all(1, ft.Colors.GREY_200),
+            vertical_lines=ft.border.BorderSide(1, ft.Colors.GREY_200),
+            horizontal_lines=ft.border.BorderSide(1, ft.Colors.GREY_200),
+            column_spacing=30,  # Mais espaço entre colunas
+            data_row_max_height=50,  # Altura máxima das linhas
+        )
+        self.texto_pagina = ft.Text(size=12, color=ft.Colors.GREY_700)
+        self.btn_anterior = ft.IconButton(
+            icon=ft.Icons.CHEVRON_LEFT, tooltip="Página anterior",
+            on_click=lambda e: self.ir_para(self.pagina - 1)
+        )
+        self.btn_proxima = ft.IconButton(
+            icon=ft.Icons.CHEVRON_RIGHT, tooltip="Próxima página",
+            on_click=lambda e: self.ir_para(self.pagina + 1)
+        )
+        self.paginador = ft.Row([self.btn_anterior, self.texto_pagina, self.btn_proxima], spacing=5)
+        self.controle = ft.Column([self.paginador, self.tabela], scroll=ft.ScrollMode.AUTO, expand=True)
+
+    def _criar_linha(self, posicao):
+        numero = ft.Text()
+        titulo = ft.Text(weight=ft.FontWeight.BOLD)
+        campo = ft.TextField(
+            expand=True,
+            height=40,
+            text_size=14,
+            content_padding=10,
+            text_align=ft.TextAlign.RIGHT,
+            border_color=ft.Colors.BLUE_200,
+            on_change=lambda e, p=posicao: self._editar(e, p)
+        )
+        valor = ft.Text()
+        link = ft.IconButton(icon=ft.Icons.OPEN_IN_NEW, tooltip="Abrir no navegador", icon_size=20)
+        linha = ft.DataRow(cells=[
+            ft.DataCell(numero), ft.DataCell(titulo), ft.DataCell(campo), ft.DataCell(valor), ft.DataCell(link)
+        ])
+        return linha, numero, titulo, campo, valor, link
+
+    def _editar(self, e, posicao):
+        indice = self.pagina * self.linhas_por_pagina + posicao
+        if indice < len(self.lotes):
+            self.ao_editar(e, self.lotes[indice])
+
+    def total_paginas(self):
+        return max(1, -(-len(self.lotes) // self.linhas_por_pagina))
+
+    def carregar(self, lotes, formatar_titulo=None):
+        """Mostra outra lista de lotes a partir da primeira página (sem enviar à tela)"""
+        self.lotes = lotes
+        if formatar_titulo:
+            self.formatar_titulo = formatar_titulo
+        self.pagina = 0
+        self._preencher()
+
+    def ir_para(self, pagina):
+        pagina = min(max(pagina, 0), self.total_paginas() - 1)
+        if pagina == self.pagina:
+            return
+        self.pagina = pagina
+        self._preencher()
+        self.controle.update()
+
+    def _preencher(self):
+        inicio = self.pagina * self.linhas_por_pagina
+        visiveis = self.lotes[inicio:inicio + self.linhas_por_pagina]
+        while len(self.linhas) < len(visiveis):
+            self.linhas.append(self._criar_linha(len(self.linhas)))
+        
+        for lote, (_, numero, titulo, campo, valor, link) in zip(visiveis, self.linhas):
+            numero.value = (lote.numero_lote or '').replace('LOTE ', '')
+            titulo.value = self.formatar_titulo(lote)
+            avaliacao = self.avaliacoes.get(lote.chave)
+            campo.value = modelos.formatar_centavos(avaliacao) if avaliacao is not None else ''
+            campo.data = lote.chave  # Lote que o campo mostra agora (a linha é reaproveitada)
+            valor.value = lote.texto_valor_leilao or lote.texto_valor_minimo or ''
+            link.url = lote.url
+        self.tabela.rows = [linha[0] for linha in self.linhas[:len(visiveis)]]
+        
+        fim = inicio + len(visiveis)
+        self.texto_pagina.value = f"Lotes {inicio + 1 if visiveis else 0}–{fim} de {len(self.lotes)}"
+        self.btn_anterior.disabled = self.pagina == 0
+        self.btn_proxima.disabled = self.pagina >= self.total_paginas() - 1
+        self.paginador.visible = len(self.lotes) > self.linhas_por_pagina
+
+class CartaoLeilao:
+    """
+    Card de um leilão na lista lateral. Criado uma vez por URL e reaproveitado: ao filtrar
+    muda só a visibilidade, ao selecionar muda só o destaque, ao atualizar só os textos.
+    """
+    def __init__(self, url, ao_selecionar, ao_baixar, ao_excluir):
+        self.url = url
+        self.termo_busca = ""
+        self.selecionado = False
+        self.texto_titulo = ft.Text(weight=ft.FontWeight.BOLD, size=13, width=130, no_wrap=False, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS)
+        self.texto_lotes = ft.Text(size=11, color=ft.Colors.GREY_600)
+
+        # Botão de Ação (Baixar/Atualizar)
+        btn_baixar = ft.IconButton(
+            icon=ft.Icons.REFRESH,
+            icon_color=ft.Colors.BLUE_600,
+            tooltip="Atualizar este leilão",
+            on_click=lambda e: ao_baixar(url)
+        )
+
+        # Botão de Excluir
+        btn_excluir = ft.IconButton(
+            icon=ft.Icons.DELETE_OUTLINE,
+            icon_color=ft.Colors.RED_400,
+            tooltip="Excluir este leilão",
+            on_click=lambda e: ao_excluir(url)
+        )
+
+        self.controle = ft.Container(
+            content=ft.Row([
+                # Icone de status (sempre baixado aqui)
+                ft.Icon(ft.Icons.CHECK_CIRCLE, color=ft.Colors.GREEN, size=20),
+                ft.Column([self.texto_titulo, self.texto_lotes], expand=True, spacing=2),
+                ft.Row([btn_baixar, btn_excluir], spacing=0)
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+            padding=10,
+            border_radius=5,
+            on_click=lambda e: ao_selecionar(url),
+            ink=True,
+        )
+        self.destacar(False)
+
+    def atualizar(self, info):
+        """Copia os dados do índice para os textos; devolve True se algo mudou"""
+        titulo = info.get('leilao_titulo') or ''
+        sub_text = f"{info.get('total_lotes') or 0} lotes baixados"
+        if titulo == self.texto_titulo.value and sub_text == self.texto_lotes.value:
+            return False
+        self.texto_titulo.value = titulo
+        self.texto_lotes.value = sub_text
+        self.termo_busca = titulo.lower()
+        return True
+
+    def destacar(self, selecionado):
+        self.selecionado = selecionado
+        self.controle.bgcolor = ft.Colors.BLUE_50 if selecionado else ft.Colors.WHITE
+        self.controle.border = ft.border.all(1, ft.Colors.BLUE_200 if selecionado else ft.Colors.GREY_300)
+
+    def filtrar(self, termo):
+        """Mostra o card só se o título contém o termo; devolve True se a visibilidade mudou"""
+        visivel = not termo or termo in self.termo_busca
+        if visivel == self.controle.visible:
+            return False
+        self.controle.visible = visivel
+        return True
+
 class SistemaLeiloes:
     def __init__(self, page: ft.Page):
         self.page = page
         self.setup_page()
         
-        self.leiloes_data = []
+        self.leiloes_data = []  # Só o índice (título, URL, total de lotes); lotes vêm sob demanda
+        self.cache_lotes = OrderedDict()  # LRU {leilao_url: lotes}
         self.leiloes_online = []
-        self.avaliacoes = {} # Dicionário para armazenar avaliações manuais: {lote_url_ou_id: valor}
+        self.avaliacoes = {} # Avaliações manuais em centavos: {lote_url_ou_codigo: centavos}
+        self.timers_avaliacao = {}  # Formatação adiada de cada campo de avaliação
         self.selected_leilao = None
+        self.cartoes = {}  # {leilao_url: CartaoLeilao}, reaproveitados entre atualizações da lista
+        self.timer_filtro = None
         self.scraper_running = False
         self.log_visible = False  # Controlar visibilidade do log
-        self.log_queue = queue.Queue()  # Fila para mensagens de log thread-safe
-        self.log_timer = None  # Timer para atualizar log periodicamente
+        # Navegador compartilhado entre importações e PDFs (iniciado no primeiro uso)
+        self.navegador = ServicoNavegador()
+        # Banco local dos leilões (importa o leiloes_completo.json antigo na primeira vez)
+        self.armazem = ArmazemLeiloes(ARQUIVO_BANCO)
+        self.armazem.importar_json_legado()
+        # Avaliações já digitadas voltam do banco; as novas são gravadas em segundo plano
+        self.avaliacoes.update(self.armazem.carregar_avaliacoes())
+        self.gravacao_avaliacoes = self.armazem.gravacao_avaliacoes()
+        self.page.on_disconnect = self.encerrar
         
         # Carregar imagem de lote retirado (base64)
         self.imagem_retirado_base64 = ""
@@ -62,8 +344,20 @@ class SistemaLeiloes:
         except Exception as e:
             print(f"Erro ao carregar imagem de lote retirado: {e}")
         
+        # Cópias locais das imagens dos lotes (baixadas pelo scraper, embutidas nos relatórios)
+        self.imagens = CacheImagens()
+        # Relatórios HTML/PDF (template compilado e cache dos relatórios montados)
+        self.relatorios = relatorio.GeradorRelatorios(ARQUIVO_TEMPLATE, self.imagem_retirado_base64,
+                                                      imagens=self.imagens)
+        
         self.build_ui()
         
+        # Log do scraper (últimas linhas, atualizado em lotes)
+        self.log = BufferLog(self.log_text)
+        
+        # Tabela de lotes reaproveitada entre leilões
+        self.tabela_lotes = TabelaLotes(self.avaliacoes, self.atualizar_avaliacao)
+        
         # File Picker para salvar PDF
         self.file_picker = ft.FilePicker(on_result=self.concluir_geracao_pdf)
         self.page.overlay.append(self.file_picker)
@@ -117,6 +411,16 @@ class SistemaLeiloes:
             on_change=self.filtrar_lista
         )
         
+        # Busca de lotes por palavras em todos os leilões baixados
+        self.input_busca = ft.TextField(
+            hint_text="Buscar lotes (ex: BMW 2015 pátio)...",
+            prefix_icon=ft.Icons.SEARCH,
+            text_size=12,
+            height=40,
+            content_padding=10,
+            on_submit=self.buscar_lotes
+        )
+        
         self.status_text = ft.Text("Pronto", size=12, color=ft.Colors.GREY_600)
         self.progress_bar = ft.ProgressBar(width=None, visible=False)
 
@@ -147,6 +451,7 @@ class SistemaLeiloes:
             spacing=10,
             padding=10,
         )
+        self.aviso_lista = ft.Text(size=12, italic=True, visible=False)
 
         self.sidebar = ft.Container(
             content=ft.Column(
@@ -161,6 +466,10 @@ class SistemaLeiloes:
                     ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                     self.log_text,
                     
+                    ft.Divider(height=10),
+                    ft.Text("Buscar Lotes", weight=ft.FontWeight.BOLD),
+                    self.input_busca,
+                    
                     ft.Divider(height=10),
                     ft.Text("Leilões Baixados", weight=ft.FontWeight.BOLD),
                     self.input_filtro,
@@ -198,103 +507,162 @@ class SistemaLeiloes:
             )
         )
 
+    def encerrar(self, e=None):
+        """Fecha o navegador compartilhado, o cache de imagens e o banco quando a janela é fechada"""
+        self.navegador.encerrar()
+        self.gravacao_avaliacoes.fechar()
+        self.imagens.fechar()
+        self.armazem.fechar()
+
     def carregar_dados(self):
         # Carregar dados locais
-        if os.path.exists(ARQUIVO_JSON):
-            try:
-                with open(ARQUIVO_JSON, 'r', encoding='utf-8') as f:
-                    self.leiloes_data = json.load(f)
-            except Exception as e:
-                self.mostrar_mensagem(f"Erro ao ler dados locais: {e}", erro=True)
-                self.leiloes_data = []
-        else:
+        try:
+            self.leiloes_data = self.armazem.listar_leiloes()
+            self.cache_lotes.clear()
+        except Exception as e:
+            self.mostrar_mensagem(f"Erro ao ler dados locais: {e}", erro=True)
             self.leiloes_data = []
 
         self.atualizar_lista_leiloes()
 
     def atualizar_lista_leiloes(self):
-        self.lista_leiloes.controls.clear()
-        
+        """
+        Sincroniza os cards com self.leiloes_data: cria só os de leilões novos, remove os
+        excluídos e atualiza os textos dos que mudaram. A ordem só é refeita se o conjunto
+        de URLs mudou; o filtro é aplicado pela visibilidade dos cards.
+        """
         # Mapear dados locais por URL
         local_map = {l.get('leilao_url'): l for l in self.leiloes_data if l.get('leilao_url')}
         
-        # Apenas URLs locais
-        todos_urls = set(local_map.keys())
+        mudou_conjunto = local_map.keys() != self.cartoes.keys()
+        for url in list(self.cartoes):
+            if url not in local_map:
+                del self.cartoes[url]
         
-        if not todos_urls:
-            self.lista_leiloes.controls.append(ft.Text("Nenhum leilão baixado."))
-            self.page.update()
-            return
+        url_selecionada = self.selected_leilao.get('leilao_url') if self.selected_leilao else None
+        for url, local_info in local_map.items():
+            cartao = self.cartoes.get(url)
+            if cartao is None:
+                cartao = CartaoLeilao(url, self._selecionar_por_url, self.baixar_leilao, self.excluir_leilao)
+                self.cartoes[url] = cartao
+            cartao.atualizar(local_info)
+            if cartao.selecionado != (url == url_selecionada):
+                cartao.destacar(url == url_selecionada)
+        
+        if mudou_conjunto or not self.lista_leiloes.controls:
+            self.lista_leiloes.controls = [self.cartoes[url].controle for url in sorted(self.cartoes)]
+            self.lista_leiloes.controls.append(self.aviso_lista)
+        
+        self._aplicar_filtro()
+        self.lista_leiloes.update()
 
-        lista_ordenada = sorted(list(todos_urls))
+    def _aplicar_filtro(self):
+        """Mostra/oculta os cards conforme o filtro; devolve os controles que mudaram"""
         termo_filtro = self.input_filtro.value.lower() if self.input_filtro.value else ""
-
-        count_exibidos = 0
-        for url in lista_ordenada:
-            local_info = local_map.get(url)
-            
-            titulo = local_info['leilao_titulo']
-            
-            # Aplicar filtro
-            if termo_filtro and termo_filtro not in titulo.lower():
-                continue
-                
-            count_exibidos += 1
-            lotes_count = local_info['total_lotes']
-            
-            # Icone de status (sempre baixado aqui)
-            icon = ft.Icon(ft.Icons.CHECK_CIRCLE, color=ft.Colors.GREEN, size=20)
-            sub_text = f"{lotes_count} lotes baixados"
-            bg_color = ft.Colors.BLUE_50 if self.selected_leilao == local_info else ft.Colors.WHITE
-            border_color = ft.Colors.BLUE_200 if self.selected_leilao == local_info else ft.Colors.GREY_300
-
-            # Botão de Ação (Baixar/Atualizar)
-            btn_baixar = ft.IconButton(
-                icon=ft.Icons.REFRESH,
-                icon_color=ft.Colors.BLUE_600,
-                tooltip="Atualizar este leilão",
-                on_click=lambda e, u=url: self.baixar_leilao(u)
-            )
-
-            # Botão de Excluir
-            btn_excluir = ft.IconButton(
-                icon=ft.Icons.DELETE_OUTLINE,
-                icon_color=ft.Colors.RED_400,
-                tooltip="Excluir este leilão",
-                on_click=lambda e, u=url: self.excluir_leilao(u)
-            )
-
-            card_content = ft.Row([
-                icon,
-                ft.Column([
-                    ft.Text(titulo, weight=ft.FontWeight.BOLD, size=13, width=130, no_wrap=False, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS),
-                    ft.Text(sub_text, size=11, color=ft.Colors.GREY_600)
-                ], expand=True, spacing=2),
-                ft.Row([btn_baixar, btn_excluir], spacing=0)
-            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
-
-            card = ft.Container(
-                content=card_content,
-                padding=10,
-                border_radius=5,
-                bgcolor=bg_color,
-                border=ft.border.all(1, border_color),
-                on_click=lambda e, l=local_info: self.selecionar_leilao(l) if l else None,
-                ink=True,
-            )
-            self.lista_leiloes.controls.append(card)
-            
-        if count_exibidos == 0 and termo_filtro:
-             self.lista_leiloes.controls.append(ft.Text("Nenhum leilão corresponde ao filtro.", size=12, italic=True))
         
-        self.page.update()
+        mudados = [c.controle for c in self.cartoes.values() if c.filtrar(termo_filtro)]
+        
+        if not self.cartoes:
+            aviso = "Nenhum leilão baixado."
+        elif termo_filtro and not any(c.controle.visible for c in self.cartoes.values()):
+            aviso = "Nenhum leilão corresponde ao filtro."
+        else:
+            aviso = None
+        if (aviso is not None) != self.aviso_lista.visible or (aviso and aviso != self.aviso_lista.value):
+            self.aviso_lista.value = aviso or ""
+            self.aviso_lista.visible = aviso is not None
+            mudados.append(self.aviso_lista)
+        return mudados
 
     def filtrar_lista(self, e):
-        self.atualizar_lista_leiloes()
+        # Só aplica o filtro quando a digitação para por um instante
+        if self.timer_filtro:
+            self.timer_filtro.cancel()
+        self.timer_filtro = threading.Timer(ESPERA_FILTRO, self._filtrar_agora)
+        self.timer_filtro.start()
+
+    def _filtrar_agora(self):
+        try:
+            mudados = self._aplicar_filtro()
+            if mudados:
+                # Envia só os cards que apareceram/sumiram, não a página inteira
+                self.page.update(*mudados)
+        except Exception as e:
+            print(f"Erro ao filtrar lista: {e}")
+
+    def _selecionar_por_url(self, url):
+        leilao = next((l for l in self.leiloes_data if l.get('leilao_url') == url), None)
+        if leilao:
+            self.selecionar_leilao(leilao)
+
+    def _destacar_selecionado(self):
+        """Troca o destaque só nos cards que mudaram (o anterior e o novo selecionado)"""
+        url_selecionada = self.selected_leilao.get('leilao_url') if self.selected_leilao else None
+        mudados = []
+        for url, cartao in self.cartoes.items():
+            if cartao.selecionado != (url == url_selecionada):
+                cartao.destacar(url == url_selecionada)
+                mudados.append(cartao.controle)
+        if mudados:
+            self.page.update(*mudados)
+
+    def buscar_lotes(self, e):
+        """Busca pelo índice do banco e mostra os lotes encontrados na área principal"""
+        texto = (self.input_busca.value or "").strip()
+        if not texto:
+            return
+        try:
+            inicio = time.perf_counter()
+            resultados = self.armazem.buscar_lotes(texto, limite=LIMITE_BUSCA)
+            tempo = (time.perf_counter() - inicio) * 1000
+        except Exception as ex:
+            self.mostrar_mensagem(f"Erro na busca: {ex}", erro=True)
+            return
+        
+        resumo = f"{len(resultados)} lotes encontrados em {tempo:.0f} ms"
+        if len(resultados) >= LIMITE_BUSCA:
+            resumo += f" (mostrando os {LIMITE_BUSCA} mais relevantes)"
+        
+        itens = []
+        for lote in resultados:
+            valor = lote.get('valor_leilao') or lote.get('valor_minimo') or ''
+            itens.append(ft.ListTile(
+                leading=ft.Text(lote.get('numero_lote') or '', size=12, weight=ft.FontWeight.BOLD),
+                title=ft.Text(lote.get('titulo_limpo') or lote.get('titulo') or '', size=13, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS),
+                subtitle=ft.Text(f"{lote['leilao_titulo']}  ·  {valor}", size=11, color=ft.Colors.GREY_600),
+                trailing=ft.IconButton(icon=ft.Icons.OPEN_IN_NEW, tooltip="Abrir no navegador", icon_size=20, url=lote.get('url')),
+                on_click=lambda e, u=lote['leilao_url']: self._selecionar_por_url(u),
+            ))
+        if not itens:
+            itens.append(ft.Text("Nenhum lote encontrado.", italic=True))
+        
+        self.content_area.controls = [
+            ft.Text(f"Busca: {texto}", size=20, weight=ft.FontWeight.BOLD),
+            ft.Text(resumo, color=ft.Colors.GREY_700),
+            ft.Divider(),
+            *itens
+        ]
+        self.content_area.update()
+
+    def _lotes_do_leilao(self, url):
+        """Lotes de um leilão, lidos do banco só na primeira vez (cache LRU pequeno)"""
+        if url in self.cache_lotes:
+            self.cache_lotes.move_to_end(url)
+            return self.cache_lotes[url]
+        lotes = self.armazem.carregar_lotes_modelo(url)
+        self._guardar_no_cache(url, lotes)
+        return lotes
+
+    def _guardar_no_cache(self, url, lotes):
+        self.cache_lotes[url] = lotes
+        self.cache_lotes.move_to_end(url)
+        while len(self.cache_lotes) > TAMANHO_CACHE_LOTES:
+            self.cache_lotes.popitem(last=False)
 
     def selecionar_leilao(self, leilao):
-        self.selected_leilao = leilao
-        self.atualizar_lista_leiloes() # Para atualizar o destaque
+        # O item da lista só tem o índice; os lotes são carregados agora
+        self.selected_leilao = dict(leilao, lotes=self._lotes_do_leilao(leilao['leilao_url']))
+        self._destacar_selecionado()
         self.mostrar_detalhes_leilao()
 
     def _gerar_conteudo_html(self):
@@ -307,7 +675,7 @@ class SistemaLeiloes:
             
             if not self.selected_leilao:
                 self.content_area.controls.append(ft.Text("Selecione um leilão para ver os detalhes."))
-                self.page.update()
+                self.content_area.update()
                 return
 
             lotes = self.selected_leilao.get('lotes', [])
@@ -336,63 +704,11 @@ class SistemaLeiloes:
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN
             )
             
-            # Tabela de Preview
-            tabela = ft.DataTable(
-                columns=[
-                    ft.DataColumn(ft.Text("Lote")),
-                    ft.DataColumn(ft.Text("Título")),
-                    ft.DataColumn(ft.Text("Avaliação"), numeric=True), # Coluna numérica para mais espaço
-                    ft.DataColumn(ft.Text("Valor")),
-                    ft.DataColumn(ft.Text("Link")),
-                ],
-                rows=[],
-                border=ft.border.all(1, ft.Colors.GREY_200),
-                vertical_lines=ft.border.BorderSide(1, ft.Colors.GREY_200),
-                horizontal_lines=ft.border.BorderSide(1, ft.Colors.GREY_200),
-                column_spacing=30,  # Mais espaço entre colunas
-                data_row_max_height=50,  # Altura máxima das linhas
-            )
-
-            # Função auxiliar para extrair número do lote para ordenação
-            def extrair_numero_lote(lote):
-                try:
-                    num_str = lote.get('numero_lote', '0').replace('LOTE', '').strip()
-                    return int(re.sub(r'\D', '', num_str)) if num_str else 0
-                except:
-                    return 0
+            # Ordenar lotes (número já calculado quando o lote foi gravado)
+            lotes.sort(key=lambda lote: lote.numero)
 
-            # Ordenar lotes
-            lotes.sort(key=extrair_numero_lote)
-
-            for lote in lotes:
-                titulo_lote = self.limpar_titulo(lote, titulo)
-                valor = lote.get('valor_leilao', '') or lote.get('valor_minimo', '')
-                
-                tabela.rows.append(
-                    ft.DataRow(
-                        cells=[
-                            ft.DataCell(ft.Text(lote.get('numero_lote', '').replace('LOTE ', ''))),
-                            ft.DataCell(ft.Text(titulo_lote, weight=ft.FontWeight.BOLD)),
-                            ft.DataCell(ft.TextField(
-                                value=self.avaliacoes.get(lote.get('url') or lote.get('numero_lote'), ''),
-                                expand=True,
-                                height=40,
-                                text_size=14,
-                                content_padding=10,
-                                text_align=ft.TextAlign.RIGHT,
-                                border_color=ft.Colors.BLUE_200,
-                                on_change=lambda e, l=lote: self.atualizar_avaliacao(e, l)
-                            )),
-                            ft.DataCell(ft.Text(valor)),
-                            ft.DataCell(ft.IconButton(
-                                icon=ft.Icons.OPEN_IN_NEW,
-                                tooltip="Abrir no navegador",
-                                url=lote.get('url'),
-                                icon_size=20
-                            )),
-                        ]
-                    )
-                )
+            # Só a primeira página de linhas é montada; as demais reaproveitam as mesmas linhas
+            self.tabela_lotes.carregar(lotes, lambda lote: lote.titulo_limpo)
 
             aviso = ft.Container()
 
@@ -410,117 +726,57 @@ class SistemaLeiloes:
                     border_radius=5,
                     padding=8
                 ),
-                ft.Column([tabela, aviso], scroll=ft.ScrollMode.AUTO, expand=True)
+                self.tabela_lotes.controle,
+                aviso
             ])
             
-            self.page.update()
+            # Só a área de detalhes muda; a lista lateral não precisa ser reenviada
+            self.content_area.update()
             
         except Exception as e:
             print(f"Erro ao mostrar detalhes: {e}")
             self.content_area.controls.append(ft.Text(f"Erro ao carregar detalhes: {e}", color=ft.Colors.RED))
-            self.page.update()
-
-    def limpar_titulo(self, lote, titulo_leilao):
-        """Melhora o título do lote se ele for igual ao do leilão"""
-        titulo = lote.get('titulo', '')
-        num_str = lote.get('numero_lote', '').replace('LOTE', '').strip()
-        
-        # Se o título do lote for genérico ou igual ao do leilão, tenta extrair da URL ou descrição
-        if not titulo or titulo == titulo_leilao or titulo == "Título não encontrado" or titulo == "LOTE":
-            # Tenta extrair da descrição
-            descricao = lote.get('descricao', '')
-            if descricao:
-                linhas = [l.strip() for l in descricao.split('\n') if l.strip()]
-                
-                # Palavras-chave para ignorar no início das linhas
-                ignorar = [
-                    "DESCRIÇÃO", "AVALIAÇÃO", "LEILOEIRO", "COMITENTE", "CÓDIGO LEILÃO", 
-                    "CÓDIGO LOTE", "NÚMERO LOTE", "HABILITADOS", "TIPO", "RECEBIMENTO DE LANCES",
-                    "LOCALIZAÇÃO", "VISITAÇÃO", "PAGAMENTO", "RETIRADA"
-                ]
-                
-                for linha in linhas:
-                    linha_upper = linha.upper()
-                    # Se a linha for apenas uma palavra-chave, ignora
-                    if any(linha_upper == kw or linha_upper.startswith(f"{kw}:") for kw in ignorar):
-                        continue
-
-                    # Se a linha contiver "LOTE:" e "DATA:", ignora (cabeçalho padrão)
-                    if "LOTE:" in linha_upper and "DATA:" in linha_upper:
-                        continue
-                    
-                    # Se a linha for um valor monetário isolado, ignora
-                    if re.match(r'^R\$\s?[\d\.,]+$', linha):
-                        continue
-                        
-                    # Se a linha for muito curta (menos de 3 chars) e não for alfanumérica, ignora
-                    if len(linha) < 3:
-                        continue
-                        
-                    # Achamos um candidato!
-                    return linha
-
-            # Fallback para URL
-            url = lote.get('url', '')
-            if url:
-                try:
-                    # Pega a última parte da URL (slug)
-                    slug = url.rstrip('/').split('/')[-1]
-                    # Remove números iniciais se houver e formata
-                    slug_limpo = slug.replace('-', ' ').upper()
-                    return slug_limpo
-                except:
-                    pass
-                    
-            # Se tudo falhar, retorna LOTE X
-            if num_str:
-                return f"LOTE {num_str}"
-                
-        return titulo
+            self.content_area.update()
 
-    def formatar_moeda_brasileira(self, valor_str):
+    def atualizar_avaliacao(self, e, lote):
         """
-        Formata uma string numérica para o formato monetário brasileiro.
-        Ex: "1234567" -> "12.345,67"
+        Guarda a avaliação digitada (em centavos) e agenda a gravação no banco. A formatação
+        monetária do campo espera a digitação parar e reenvia só esse campo.
         """
-        # Remover tudo que não é dígito
-        apenas_digitos = ''.join(filter(str.isdigit, valor_str))
-        
-        if not apenas_digitos:
-            return ''
-        
-        # Converter para inteiro (centavos)
-        valor_centavos = int(apenas_digitos)
-        
-        # Converter para reais (dividir por 100)
-        valor_reais = valor_centavos / 100
-        
-        # Formatar com separador de milhares (.) e decimais (,)
-        valor_formatado = f"{valor_reais:,.2f}"
-        
-        # Trocar vírgula por ponto (milhares) e ponto por vírgula (decimais) - padrão brasileiro
-        valor_formatado = valor_formatado.replace(',', 'TEMP').replace('.', ',').replace('TEMP', '.')
-        
-        return valor_formatado
-
-    def atualizar_avaliacao(self, e, lote):
-        """Atualiza o valor da avaliação no dicionário com formatação monetária"""
-        chave = lote.get('url') or lote.get('numero_lote')
+        chave = lote.chave
         if chave:
-            # Obter o valor digitado
-            valor_digitado = e.control.value
-            
-            # Formatar o valor
-            valor_formatado = self.formatar_moeda_brasileira(valor_digitado)
+            # Só os dígitos contam, lidos como centavos (150000 -> 1.500,00)
+            centavos = modelos.centavos_digitados(e.control.value)
             
-            # Atualizar o campo com o valor formatado
-            e.control.value = valor_formatado
+            # Salvar no dicionário (em centavos; campo vazio remove) e no banco, em lote
+            if centavos is None:
+                self.avaliacoes.pop(chave, None)
+            else:
+                self.avaliacoes[chave] = centavos
+            self.gravacao_avaliacoes.alterar(chave, centavos)
             
-            # Salvar no dicionário
-            self.avaliacoes[chave] = valor_formatado
-            
-            # Atualizar a interface
-            self.page.update()
+            campo = e.control
+            timer = self.timers_avaliacao.pop(id(campo), None)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(ESPERA_AVALIACAO, self._formatar_avaliacao, args=(campo, chave))
+            timer.daemon = True
+            self.timers_avaliacao[id(campo)] = timer
+            timer.start()
+
+    def _formatar_avaliacao(self, campo, chave):
+        self.timers_avaliacao.pop(id(campo), None)
+        # A linha pode ter passado a mostrar outro lote (troca de página ou de leilão)
+        if campo.data != chave:
+            return
+        centavos = self.avaliacoes.get(chave)
+        valor_formatado = modelos.formatar_centavos(centavos) if centavos is not None else ''
+        if campo.value != valor_formatado:
+            campo.value = valor_formatado
+            try:
+                campo.update()
+            except Exception as e:
+                print(f"Erro ao formatar avaliação: {e}")
 
 
     def _gerar_conteudo_html(self):
@@ -532,152 +788,23 @@ class SistemaLeiloes:
             return None, None
 
         try:
-            # Preparar dados para o HTML
-            lotes_html = []
             lotes_originais = self.selected_leilao.get('lotes', [])
             
             # Ordenar lotes também para o relatório
-            def extrair_numero_lote(lote):
-                try:
-                    num_str = lote.get('numero_lote', '0').replace('LOTE', '').strip()
-                    return int(re.sub(r'\D', '', num_str)) if num_str else 0
-                except:
-                    return 0
-            
-            lotes_originais.sort(key=extrair_numero_lote)
+            lotes_originais.sort(key=lambda lote: lote.numero)
 
             titulo_leilao = self.selected_leilao.get('leilao_titulo', 'Relatório de Leilão')
+            comitente_logo = self.selected_leilao.get('comitente_logo', '')
             
-            # 5. Determinar Logo do Comitente (Mover para o início para usar como fallback nos lotes)
-            logo_url = self.selected_leilao.get('comitente_logo', '')
-            
-            # Se o logo for relativo ou vazio, tentar encontrar um válido nos lotes
-            if not logo_url or (not logo_url.startswith('http') and not logo_url.startswith('data:')):
-                for lote in lotes_originais:
-                    simbolo = lote.get('simbolo_lote', '')
-                    if simbolo and simbolo.startswith('http'):
-                        logo_url = simbolo
-                        break
-            
-            # Se ainda for relativo, adicionar BASE_URL como fallback
-            if logo_url and not logo_url.startswith('http') and not logo_url.startswith('data:'):
-                logo_url = scraper.BASE_URL + logo_url
-            
-            for lote in lotes_originais:
-                # Limpar valor (remover R$ para o template adicionar)
-                valor = lote.get('valor_leilao', '') or lote.get('valor_minimo', '')
-                valor_limpo = valor.replace('R$', '').strip()
-                if not valor_limpo:
-                    valor_limpo = "0,00"
-
-                # Extrair número (manter "LOTE" se existir, ou adicionar se for apenas número)
-                raw_num = lote.get('numero_lote', '0').upper().strip()
-                if "LOTE" not in raw_num:
-                    num_str = f"LOTE {raw_num}"
-                else:
-                    num_str = raw_num
-                
-                # Extrair apenas o número para a bolinha
-                apenas_numero = num_str.replace('LOTE', '').strip()
-                
-                titulo_limpo = self.limpar_titulo(lote, titulo_leilao)
-                if titulo_limpo.upper() == "LOTE" or not titulo_limpo.strip():
-                    titulo_limpo = num_str # Já é "LOTE X"
-
-                # Verificar se está retirado
-                is_retirado = lote.get('retirado', False)
-                imagem_lote = lote.get('imagem_lote', '')
-                if imagem_lote and not imagem_lote.startswith('http') and not imagem_lote.startswith('data:'):
-                    imagem_lote = scraper.BASE_URL + imagem_lote
-                
-                if is_retirado and self.imagem_retirado_base64:
-                    imagem_lote = f"data:image/jpeg;base64,{self.imagem_retirado_base64}"
-
-                lotes_html.append({
-                    "numero": apenas_numero,
-                    "titulo": titulo_limpo,
-                    "descricao": lote.get('descricao', '') or "Sem descrição detalhada.",
-                    "lances": 0, # Dado não disponível no JSON atual
-                    "valorMinimo": valor_limpo,
-                    "avaliacao": self.avaliacoes.get(lote.get('url') or lote.get('numero_lote'), ''), # Incluir avaliação
-                    "localizacao": "Paraíba", # Padrão
-                    "imagem": imagem_lote,
-                    "comitente": (scraper.BASE_URL + lote.get('simbolo_lote', '')) if lote.get('simbolo_lote', '') and not lote.get('simbolo_lote', '').startswith('http') else (lote.get('simbolo_lote', '') or logo_url),
-                    "retirado": is_retirado
-                })
-
-            # Ler template
-            with open(ARQUIVO_TEMPLATE, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            # Substituir dados no HTML
-            # 1. Substituir array de lotes
-            json_lotes = json.dumps(lotes_html, ensure_ascii=False)
-            # Escapar backslashes para que o re.sub não os interprete (necessário para \n funcionar no JS)
-            json_lotes = json_lotes.replace('\\', '\\\\')
-            
-            html_content = re.sub(
-                r'const lotes = \[.*?\];', 
-                f'const lotes = {json_lotes};', 
-                html_content, 
-                flags=re.DOTALL
-            )
-
-            # 2. Substituir Título do Leilão
-            html_content = html_content.replace('>Leilão Exemplo<', f'>{titulo_leilao}<')
-            
-            # 3. Substituir Total de Lotes
-            html_content = re.sub(
-                r'<span id="totalLotes">.*?</span>',
-                f'<span id="totalLotes">{len(lotes_html)}</span>',
-                html_content
-            )
-
-            # 4. Substituir Data
-            data_hoje = datetime.now().strftime("%d/%m/%Y %H:%M")
-            html_content = re.sub(
-                r'<span id="dataAbertura">.*?</span>',
-                f'<span id="dataAbertura">{data_hoje}</span>',
-                html_content
-            )
-
-            # 5. Substituir Logo do Comitente (Já calculado acima)
-            if logo_url:
-                # Substituir no header
-                html_content = html_content.replace(
-                    'https://via.placeholder.com/50x50?text=Logo', 
-                    logo_url
-                )
-                # Substituir na tabela (template string do JS)
-                html_content = html_content.replace(
-                    'https://via.placeholder.com/30x30?text=C', 
-                    logo_url
-                )
-
-            # 5.1. Substituir Logo do LeiloesPB no cabeçalho
-            try:
-                logo_leiloespb_path = 'logo_leiloespb'
-                if os.path.exists(logo_leiloespb_path):
-                    import base64
-                    with open(logo_leiloespb_path, 'rb') as img_file:
-                        logo_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-                        # Detectar tipo de imagem (assumindo PNG por padrão)
-                        logo_data_uri = f'data:image/png;base64,{logo_base64}'
-                        # Substituir a URL da logo do LeiloesPB
-                        html_content = html_content.replace(
-                            'https://www.leiloespb.com.br/client/logo.png?v=2',
-                            logo_data_uri
-                        )
-            except Exception as e:
-                print(f"Aviso: Não foi possível carregar logo_leiloespb: {e}")
-
-            # 6. Substituir Imagens dos Lotes (feito via JS no template, mas precisamos garantir que o JS use o campo 'imagem')
-            # O template atual usa: <img src="https://via.placeholder.com/100x75?text=Foto" ... />
-            # Vamos alterar o template JS para usar ${lote.imagem || 'placeholder'}
+            # Imagens que o scraper ainda não trouxe (leilões baixados antes do cache): baixadas
+            # em segundo plano; este relatório sai com os endereços remotos, os próximos com as cópias
+            faltando = self.imagens.agendar(enderecos_das_imagens(comitente_logo, lotes_originais))
+            if faltando:
+                print(f"Baixando {faltando} imagens do leilão para o cache local")
             
-            html_content = html_content.replace(
-                'src="https://via.placeholder.com/100x75?text=Foto"',
-                'src="${lote.imagem || \'https://via.placeholder.com/100x75?text=Foto\'}"'
+            # Template compilado uma vez; relatórios sem mudança saem do cache
+            html_content = self.relatorios.gerar(
+                titulo_leilao, comitente_logo, lotes_originais, self.avaliacoes
             )
 
             # Nome do arquivo sugerido
@@ -733,12 +860,10 @@ class SistemaLeiloes:
         try:
             self.mostrar_mensagem("Gerando PDF... Aguarde.")
             
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.set_content(self.temp_html_content)
-                page.pdf(path=e.path, format="A4", print_background=True, margin={"top": "1cm", "right": "1cm", "bottom": "1cm", "left": "1cm"})
-                browser.close()
+            self.navegador.gerar_pdf(
+                self.temp_html_content, e.path,
+                format="A4", print_background=True, margin={"top": "1cm", "right": "1cm", "bottom": "1cm", "left": "1cm"}
+            )
                 
             self.mostrar_mensagem(f"PDF salvo com sucesso em: {e.path}")
             try:
@@ -768,21 +893,23 @@ class SistemaLeiloes:
         self.page.update()
 
     def excluir_leilao(self, url):
-        """Remove um leilão da lista e do arquivo JSON"""
+        """Remove um leilão da lista e do banco local"""
         # Encontrar e remover da lista em memória
         self.leiloes_data = [l for l in self.leiloes_data if l.get('leilao_url') != url]
+        self.cache_lotes.pop(url, None)
         
-        # Salvar no arquivo JSON
+        # Remover do banco (só as linhas deste leilão)
         try:
-            with open(ARQUIVO_JSON, 'w', encoding='utf-8') as f:
-                json.dump(self.leiloes_data, f, ensure_ascii=False, indent=4)
+            self.armazem.excluir_leilao(url)
             
             self.mostrar_mensagem("Leilão removido com sucesso!")
             
             # Se o leilão removido era o selecionado, limpar seleção
             if self.selected_leilao and self.selected_leilao.get('leilao_url') == url:
                 self.selected_leilao = None
-                self.main_container.content = ft.Text("Selecione um leilão para visualizar os detalhes.", size=16, color=ft.Colors.GREY_500)
+                # Mantém a área de detalhes no lugar para as próximas seleções
+                self.content_area.controls = [ft.Text("Selecione um leilão para visualizar os detalhes.", size=16, color=ft.Colors.GREY_500)]
+                self.content_area.update()
             
             self.atualizar_lista_leiloes()
             
@@ -802,13 +929,13 @@ class SistemaLeiloes:
         self.status_text.value = msg
         
         # Limpar e mostrar log
-        self.limpar_log()
+        self.log.limpar()
         self.log_visible = True
         self.log_text.visible = True
         self.btn_toggle_log.visible = True
         
-        # Iniciar processamento da fila de log
-        self.processar_fila_log()
+        # Iniciar as descargas periódicas do log
+        self.log.iniciar()
         
         self.page.update()
 
@@ -818,42 +945,49 @@ class SistemaLeiloes:
     def _executar_scraper_thread(self, args):
         try:
             # Redirecionar stdout e stderr para a fila de log
-            stream = StreamToQueue(self.log_queue)
+            stream = StreamToQueue(self.log)
             
             with redirect_stdout(stream), redirect_stderr(stream):
-                scraper.run_scraper(args)
+                scraper.run_scraper(args, servico=self.navegador, ao_salvar_leilao=self._leilao_salvo,
+                                    imagens=self.imagens)
             
             self._scraper_concluido(sucesso=True)
                 
         except Exception as e:
             self._scraper_concluido(sucesso=False, msg=str(e))
 
+    def _leilao_salvo(self, leilao):
+        """Recebe do scraper (na mesma execução) cada leilão assim que ele é salvo no banco"""
+        # Lotes convertidos para o modelo compacto (mesmos campos derivados que o banco guardou)
+        modelo = modelos.Leilao.from_dict(leilao)
+        url = modelo.url
+        indice = modelo.indice()
+        for i, existente in enumerate(self.leiloes_data):
+            if existente.get('leilao_url') == url:
+                self.leiloes_data[i] = indice
+                break
+        else:
+            self.leiloes_data.append(indice)
+        self._guardar_no_cache(url, modelo.lotes)
+        
+        if self.selected_leilao and self.selected_leilao.get('leilao_url') == url:
+            self.selected_leilao = dict(indice, lotes=modelo.lotes)
+
     def _scraper_concluido(self, sucesso, msg=""):
         self.scraper_running = False
         self.btn_importar.disabled = False
         self.progress_bar.visible = False
         
-        # Cancelar timer se ainda estiver rodando
-        if self.log_timer:
-            try:
-                self.log_timer.cancel()
-            except:
-                pass
-        
-        # Processar mensagens finais da fila
+        # Parar as descargas e processar as mensagens finais da fila de uma vez
         try:
-            while not self.log_queue.empty():
-                msg_log = self.log_queue.get_nowait()  
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                linhas = self.log_text.value.split('\n') if self.log_text.value else []
-                linhas.append(f"[{timestamp}] {msg_log}")
-                self.log_text.value = '\n'.join(linhas[-500:])
+            self.log.parar()
         except:
             pass
         
         if sucesso:
             self.status_text.value = "Dados atualizados com sucesso!"
-            self.carregar_dados()
+            # Os leilões novos já chegaram por _leilao_salvo: não é preciso reler o banco
+            self.atualizar_lista_leiloes()
             self.mostrar_mensagem("Dados atualizados com sucesso!")
         else:
             self.status_text.value = "Erro na atualização."
@@ -875,52 +1009,16 @@ class SistemaLeiloes:
         """Alterna a visibilidade do log"""
         self.log_visible = not self.log_visible
         self.log_text.visible = self.log_visible
-        self.page.update()
+        self.log_text.update()
 
     def adicionar_log(self, mensagem):
         """Adiciona uma mensagem ao log (thread-safe)"""
-        try:
-            # Colocar mensagem na fila
-            self.log_queue.put(mensagem)
-        except:
-            pass
-    
-    def processar_fila_log(self):
-        """Processa mensagens da fila e atualiza o log (executado na thread principal)"""
-        try:
-            mensagens_novas = []
-            # Pegar todas as mensagens disponíveis
-            while not self.log_queue.empty():
-                try:
-                    msg = self.log_queue.get_nowait()
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    mensagens_novas.append(f"[{timestamp}] {msg}")
-                except queue.Empty:
-                    break
-            
-            if mensagens_novas:
-                # Adicionar ao log existente
-                linhas_atuais = self.log_text.value.split('\n') if self.log_text.value else []
-                linhas_atuais.extend(mensagens_novas)
-                
-                # Manter últimas 500 linhas
-                if len(linhas_atuais) > 500:
-                    linhas_atuais = linhas_atuais[-500:]
-                
-                self.log_text.value = '\n'.join(linhas_atuais)
-                self.page.update()
-            
-            # Continuar processando se scraper ainda está rodando
-            if self.scraper_running:
-                self.log_timer = threading.Timer(0.5, self.processar_fila_log)
-                self.log_timer.start()
-        except Exception as e:
-            print(f"Erro ao processar log: {e}")
+        self.log.adicionar(mensagem)
 
     def limpar_log(self):
         """Limpa o conteúdo do log"""
-        self.log_text.value = ""
-        self.page.update()
+        self.log.limpar()
+        self.log_text.update()
 
 
 def main(page: ft.Page):